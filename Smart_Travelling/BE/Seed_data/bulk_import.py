@@ -0,0 +1,410 @@
+"""
+Import bulk cho places.tsv / food.tsv (dùng chung cho import_places.py và import_food.py với cờ --bulk).
+
+- Đọc TSV theo kiểu stream, parse + validate theo từng batch (không giữ cả file trong bộ nhớ)
+- Mỗi batch: 1 lệnh executemany cho addresses, 1 lệnh SELECT lấy id địa chỉ, 1 lệnh executemany cho spot
+  (pymysql gộp executemany thành INSERT nhiều dòng => vài round-trip cho mỗi batch)
+- Toàn bộ file nằm trong 1 transaction: lỗi giữa chừng thì rollback, DB giữ nguyên dữ liệu cũ
+- Upsert theo external_key (DB/9_external_keys.sql) nên chạy lại nhiều lần vẫn an toàn;
+  dòng do importer cũ tạo (external_key NULL) được gán key trước khi so diff (adopt_legacy_rows)
+- city_norm được tính luôn lúc import (cùng city registry với BE, xem DB/8_addresses_city_norm.sql)
+- Import theo diff (DB/10_row_hash.sql): so hash từng dòng với row_hash đang lưu,
+  chỉ ghi dòng thêm mới / thay đổi, xóa dòng không còn trong file khi bật --prune
+  (chỉ trong các thành phố có mặt trong file => file của 1 vùng không xóa dữ liệu vùng khác),
+  rồi ghi change set (thành phố + id bị ảnh hưởng) ra data/catalog_changes/
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import pymysql
+
+# Cho phép import app.utils.* khi chạy script từ thư mục Seed_data
+BE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BE_DIR not in sys.path:
+    sys.path.insert(0, BE_DIR)
+
+from app.utils.city_registry import canonical_city_key  # noqa: E402
+from app.utils.normalize_text import normalize_text  # noqa: E402
+
+
+BATCH_SIZE = 2000
+CHANGESET_DIR = os.path.join(BE_DIR, "data", "catalog_changes")
+
+ADDRESS_COLUMNS = ["external_key", "house_number", "street", "ward", "district", "city", "city_norm", "lat", "lng"]
+
+SPOT_COLUMNS = {
+    "places": [
+        "external_key", "row_hash", "name", "priceVND", "summary", "description",
+        "openTime", "closeTime", "phone", "rating", "reviewCount",
+        "popularity", "image_url", "tags", "category", "dwell", "address_id",
+    ],
+    "food": [
+        "external_key", "row_hash", "name", "priceVND", "summary", "description",
+        "openTime", "closeTime", "phone", "rating", "reviewCount",
+        "popularity", "image_url", "tags", "category", "cuisine_type", "menu_url", "address_id",
+    ],
+}
+
+
+def _content_key(prefix: str, row: dict) -> str:
+    raw = "|".join(
+        normalize_text(row.get(field) or "")
+        for field in ("name", "city", "street", "house_number")
+    )
+    return f"{prefix}:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def place_external_key(row: dict) -> str:
+    """Cột id trong places.tsv bị trùng (nhiều địa điểm khác nhau cùng id) => key theo tên + địa chỉ như food."""
+    return _content_key("place", row)
+
+
+def food_external_key(row: dict) -> str:
+    """Cột id trong food.tsv bị trùng => lấy hash của tên + địa chỉ làm key ổn định."""
+    return _content_key("food", row)
+
+
+def row_hash(row: dict) -> str:
+    """
+    Hash nội dung đã parse của 1 dòng (đã bỏ khoảng trắng thừa, "NULL", ...),
+    nên sửa định dạng file mà dữ liệu không đổi thì hash cũng không đổi.
+    Cột id của file không được ghi (id do DB cấp) nên cũng không tính vào hash.
+    """
+    content = {
+        k: v for k, v in row.items()
+        if k not in ("id", "line_no", "external_key", "row_hash", "address_id")
+    }
+    raw = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def validate_row(row: dict) -> Optional[str]:
+    """Kiểm tra các ràng buộc CHECK của bảng trước khi ghi, trả về lý do lỗi (None nếu hợp lệ)."""
+    if not row.get("name"):
+        return "thiếu tên"
+    if len(row["name"]) > 255:
+        return "tên dài quá 255 ký tự"
+    if row.get("rating") is not None and not 0 <= row["rating"] <= 5:
+        return f"rating ngoài khoảng 0..5 ({row['rating']})"
+    if row.get("popularity") is not None and not 0 <= row["popularity"] <= 100:
+        return f"popularity ngoài khoảng 0..100 ({row['popularity']})"
+    if row.get("reviewCount") is not None and row["reviewCount"] < 0:
+        return "reviewCount âm"
+    if row.get("priceVND") is not None and row["priceVND"] < 0:
+        return "priceVND âm"
+    if row.get("dwell") is not None and row["dwell"] < 0:
+        return "dwell âm"
+    return None
+
+
+def stream_batches(
+    path: str,
+    parse_line: Callable[[str], Optional[dict]],
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Tuple[List[dict], List[Tuple[int, str]]]]:
+    """
+    Đọc TSV từng dòng, trả về từng batch (các dòng hợp lệ, [(số dòng, lý do lỗi)]).
+    Bỏ qua dòng header và dòng trống.
+    """
+    batch: List[dict] = []
+    rejected: List[Tuple[int, str]] = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no == 1 and "name" in line.lower():
+                continue
+            line = line.strip()
+            if not line:
+                continue
+
+            row = parse_line(line)
+            if row is None:
+                rejected.append((line_no, "không parse được"))
+                continue
+
+            reason = validate_row(row)
+            if reason:
+                rejected.append((line_no, reason))
+                continue
+
+            row["line_no"] = line_no
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                yield batch, rejected
+                batch, rejected = [], []
+
+    if batch or rejected:
+        yield batch, rejected
+
+
+def _upsert_sql(table: str, columns: List[str]) -> str:
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE cho mọi cột trừ id.
+    external_key chỉ được điền khi đang trống (trùng id với dòng do importer cũ tạo ra).
+    """
+    col_list = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    updates = ", ".join(
+        "external_key = COALESCE(external_key, VALUES(external_key))" if c == "external_key"
+        else f"{c} = VALUES({c})"
+        for c in columns if c != "id"
+    )
+    return (
+        f"INSERT INTO {table} ({col_list}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def _spot_params(table: str, row: dict, address_id: Optional[int]) -> tuple:
+    values = dict(row)
+    values["address_id"] = address_id
+    values["tags"] = json.dumps(row["tags"], ensure_ascii=False) if row.get("tags") else None
+    values.setdefault("category", "eat" if table == "food" else "visit")
+    return tuple(values.get(c) for c in SPOT_COLUMNS[table])
+
+
+def write_batch(cursor, table: str, rows: List[dict]) -> int:
+    """Upsert 1 batch addresses + spots, trả về số spot đã ghi."""
+    if not rows:
+        return 0
+
+    # 1) addresses (mỗi spot 1 địa chỉ, cùng external_key)
+    address_params = []
+    for row in rows:
+        if not any(row.get(c) for c in ("house_number", "street", "ward", "district", "city")):
+            continue
+        address_params.append((
+            row["external_key"],
+            row.get("house_number"),
+            row.get("street"),
+            row.get("ward"),
+            row.get("district"),
+            row.get("city"),
+            canonical_city_key(row.get("city")) or None,
+            row.get("lat"),
+            row.get("lng"),
+        ))
+    if address_params:
+        cursor.executemany(_upsert_sql("addresses", ADDRESS_COLUMNS), address_params)
+
+    # 2) map external_key -> address id cho cả batch bằng 1 truy vấn
+    address_ids = fetch_ids(cursor, "addresses", [p[0] for p in address_params])
+
+    # 3) spots
+    spot_params = [
+        _spot_params(table, row, address_ids.get(row["external_key"]))
+        for row in rows
+    ]
+    cursor.executemany(_upsert_sql(table, SPOT_COLUMNS[table]), spot_params)
+    return len(spot_params)
+
+
+def fetch_ids(cursor, table: str, keys: List[str]) -> Dict[str, int]:
+    """external_key -> id cho 1 nhóm key (1 truy vấn)."""
+    if not keys:
+        return {}
+    placeholders = ", ".join(["%s"] * len(keys))
+    cursor.execute(
+        f"SELECT id, external_key FROM {table} WHERE external_key IN ({placeholders})",
+        keys,
+    )
+    return {key: row_id for row_id, key in cursor.fetchall()}
+
+
+def adopt_legacy_rows(cursor, table: str, external_key: Callable[[dict], str]) -> int:
+    """
+    Gán external_key cho spot (và địa chỉ của nó) do importer cũ tạo ra (external_key còn NULL),
+    tính từ chính dữ liệu đang lưu (tên + địa chỉ) => load_existing nhận ra chúng,
+    import cập nhật tại chỗ (dùng lại address_id) thay vì insert dòng mới / địa chỉ mồ côi.
+    """
+    cursor.execute(
+        f"""
+        SELECT s.id, s.name, s.address_id, a.city, a.street, a.house_number, a.external_key
+        FROM {table} s
+        LEFT JOIN addresses a ON s.address_id = a.id
+        WHERE s.external_key IS NULL
+        """
+    )
+    legacy = cursor.fetchall()
+    if not legacy:
+        return 0
+
+    cursor.execute(f"SELECT external_key FROM {table} WHERE external_key IS NOT NULL")
+    taken = {key for (key,) in cursor.fetchall()}
+    spot_params, address_params = [], []
+    for spot_id, name, address_id, city, street, house_number, address_key in legacy:
+        key = external_key({"name": name, "city": city, "street": street, "house_number": house_number})
+        if key in taken:
+            continue    # trùng key (dữ liệu cũ bị lặp): để nguyên, không đoán
+        taken.add(key)
+        spot_params.append((key, spot_id))
+        if address_id is not None and address_key is None:
+            address_params.append((key, address_id))
+
+    cursor.executemany(f"UPDATE {table} SET external_key = %s WHERE id = %s", spot_params)
+    if address_params:
+        cursor.executemany("UPDATE addresses SET external_key = %s WHERE id = %s", address_params)
+    return len(spot_params)
+
+
+def load_existing(cursor, table: str) -> Dict[str, Tuple[int, Optional[str], Optional[str]]]:
+    """external_key -> (id, row_hash, city_norm) của các spot đã import trước đó."""
+    cursor.execute(
+        f"""
+        SELECT s.id, s.external_key, s.row_hash, a.city_norm
+        FROM {table} s
+        LEFT JOIN addresses a ON s.address_id = a.id
+        WHERE s.external_key IS NOT NULL
+        """
+    )
+    return {key: (spot_id, hash_, city_norm) for spot_id, key, hash_, city_norm in cursor.fetchall()}
+
+
+def delete_by_keys(cursor, table: str, keys: List[str], batch_size: int = BATCH_SIZE) -> None:
+    """Xóa spot + địa chỉ đi kèm (cùng external_key)."""
+    for i in range(0, len(keys), batch_size):
+        chunk = keys[i:i + batch_size]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"DELETE FROM {table} WHERE external_key IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM addresses WHERE external_key IN ({placeholders})", chunk)
+
+
+def write_change_set(change_set: dict) -> str:
+    """Ghi change set ra data/catalog_changes/<table>_<thời gian>.json, trả về đường dẫn."""
+    os.makedirs(CHANGESET_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(CHANGESET_DIR, f"{change_set['table']}_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(change_set, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def bulk_import(
+    db_config: dict,
+    path: str,
+    table: str,
+    parse_line: Callable[[str], Optional[dict]],
+    external_key: Callable[[dict], str],
+    batch_size: int = BATCH_SIZE,
+    prune: bool = False,
+) -> dict:
+    """
+    Import cả file TSV vào `table` ("places" | "food") trong 1 transaction, theo diff:
+      - key chưa có trong DB                   -> insert
+      - key có nhưng row_hash khác              -> update
+      - key có và row_hash giống                -> bỏ qua (không ghi gì)
+      - key trong DB nhưng không có trong file  -> delete (nếu prune, chỉ spot thuộc thành phố có trong file)
+    Trả về change set: id + thành phố (city_norm) bị ảnh hưởng.
+    """
+    if table not in SPOT_COLUMNS:
+        raise ValueError(f"Bảng không hỗ trợ import bulk: {table}")
+
+    started = time.perf_counter()
+    conn = pymysql.connect(**db_config, autocommit=False)
+    cursor = conn.cursor()
+
+    rejected: List[Tuple[int, str]] = []
+    seen_keys: Set[str] = set()
+    inserted: List[int] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+    cities: Set[str] = set()
+    file_cities: Set[str] = set()
+    unchanged = 0
+
+    try:
+        adopted = adopt_legacy_rows(cursor, table, external_key)
+        if adopted:
+            print(f"Gán external_key cho {adopted} dòng {table} cũ")
+        existing = load_existing(cursor, table)
+
+        for batch, batch_rejected in stream_batches(path, parse_line, batch_size):
+            rejected.extend(batch_rejected)
+
+            changed_rows = []
+            new_keys = []
+            for row in batch:
+                key = external_key(row)
+                # Dòng trùng key trong cùng file: giữ dòng đầu tiên
+                if key in seen_keys:
+                    rejected.append((row["line_no"], f"trùng key {key}"))
+                    continue
+                seen_keys.add(key)
+
+                row["external_key"] = key
+                row["row_hash"] = row_hash(row)
+                file_cities.add(canonical_city_key(row.get("city")))
+                old = existing.get(key)
+                if old is not None and old[1] == row["row_hash"]:
+                    unchanged += 1
+                    continue
+
+                changed_rows.append(row)
+                new_city = canonical_city_key(row.get("city"))
+                if new_city:
+                    cities.add(new_city)
+                if old is None:
+                    new_keys.append(key)
+                else:
+                    updated.append(old[0])
+                    if old[2]:
+                        cities.add(old[2])   # đổi thành phố thì city cũ cũng bị ảnh hưởng
+
+            write_batch(cursor, table, changed_rows)
+            inserted.extend(fetch_ids(cursor, table, new_keys).values())
+
+        removed_keys = [
+            key for key, (_, _, city_norm) in existing.items()
+            if key not in seen_keys and city_norm and city_norm in file_cities
+        ]
+        if prune and removed_keys:
+            # File rỗng / lỗi parse hết thì không xóa sạch bảng
+            if not seen_keys:
+                raise RuntimeError("File không có dòng hợp lệ nào, dừng để tránh xóa toàn bộ dữ liệu")
+            delete_by_keys(cursor, table, removed_keys, batch_size)
+            for key in removed_keys:
+                spot_id, _, city_norm = existing[key]
+                deleted.append(spot_id)
+                if city_norm:
+                    cities.add(city_norm)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    change_set = {
+        "table": table,
+        "source": os.path.basename(path),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "cities": sorted(cities),
+        "inserted": sorted(inserted),
+        "updated": sorted(updated),
+        "deleted": sorted(deleted),
+        "unchanged": unchanged,
+        "rejected": len(rejected),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+    for line_no, reason in rejected[:20]:
+        print(f"  Dòng {line_no}: {reason}")
+    if len(rejected) > 20:
+        print(f"  ... và {len(rejected) - 20} dòng lỗi khác")
+    print(
+        f"Import {table}: +{len(inserted)} ~{len(updated)} -{len(deleted)}, "
+        f"giữ nguyên {unchanged}, bỏ qua {len(rejected)}, {change_set['seconds']}s"
+    )
+
+    if inserted or updated or deleted:
+        print(f"Change set: {write_change_set(change_set)}")
+    return change_set
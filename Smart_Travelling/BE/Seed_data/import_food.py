@@ -1,5 +1,6 @@
 # ...existing code...
 import os
+import sys
 import json
 import re
 from typing import Optional, Tuple, List
@@ -7,6 +8,9 @@ from typing import Optional, Tuple, List
 import pymysql
 from dotenv import load_dotenv
 
+from bulk_import import bulk_import, food_external_key
+from app.utils.city_registry import canonical_city_key
+
 load_dotenv()
 
 DB_CONFIG = {
@@ -111,8 +115,8 @@ def create_address(cursor, address_id: int, house_number: str, street: str, ward
                    district: str, city: str, lat: float, lng: float) -> bool:
     try:
         sql = """
-            INSERT INTO addresses (id, house_number, street, ward, district, city, lat, lng)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO addresses (id, house_number, street, ward, district, city, city_norm, lat, lng)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         cursor.execute(sql, (
             address_id,
@@ -121,6 +125,7 @@ def create_address(cursor, address_id: int, house_number: str, street: str, ward
             ward,
             district,
             city or "Hồ Chí Minh",
+            canonical_city_key(city or "Hồ Chí Minh"),
             lat,
             lng
         ))
@@ -305,11 +310,26 @@ def import_data(data_lines: list):
     print(f"Errors: {error}")
 
 
+def parse_line_bulk(line: str) -> Optional[dict]:
+    """parse_line + city mặc định giống create_address (dùng cho --bulk)."""
+    food_data = parse_line(line)
+    if food_data is not None:
+        food_data["city"] = food_data["city"] or "Hồ Chí Minh"
+    return food_data
+
+
 def main():
     data_file = "food.tsv"
     if not os.path.exists(data_file):
         print(f"File {data_file} not found!")
         return
+
+    # python import_food.py --bulk : chỉ ghi dòng thêm / sửa / xóa so với DB (xem bulk_import.py)
+    # thêm --prune để xóa các dòng không còn trong file (chỉ trong các thành phố có mặt trong file)
+    if "--bulk" in sys.argv:
+        bulk_import(DB_CONFIG, data_file, "food", parse_line_bulk, food_external_key, prune="--prune" in sys.argv)
+        return
+
     with open(data_file, "r", encoding="utf-8") as f:
         lines = f.readlines()
     import_data(lines)
@@ -3,6 +3,10 @@ from typing import Optional
 import pymysql
 from dotenv import load_dotenv
 import os
+import sys
+
+from bulk_import import bulk_import, place_external_key
+from app.utils.city_registry import canonical_city_key
 
 load_dotenv()
 
@@ -68,10 +72,12 @@ def create_address(cursor, house_number: str, street: str, ward: str,
     
     try:
         sql = """
-            INSERT INTO addresses (house_number, street, ward, district, city, lat, lng)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO addresses (house_number, street, ward, district, city, city_norm, lat, lng)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(sql, (house_number, street, ward, district, city, lat, lng))
+        cursor.execute(sql, (
+            house_number, street, ward, district, city, canonical_city_key(city) or None, lat, lng,
+        ))
         return cursor.lastrowid
     except Exception as e:
         print(f"Error creating address: {e}")
@@ -80,36 +86,20 @@ def create_address(cursor, house_number: str, street: str, ward: str,
 
 def create_place(cursor, place_data: dict) -> bool:
     try:
+        # Không ghi cột id của file (nhiều địa điểm khác nhau trùng id), id do DB cấp
         sql = """
             INSERT INTO places (
-                id, name, priceVND, summary, description, 
+                name, priceVND, summary, description, 
                 openTime, closeTime, phone, rating, reviewCount, 
                 popularity, image_url, tags, category, dwell, address_id
             ) VALUES (
                 %s, %s, %s, %s, %s, 
                 %s, %s, %s, %s, %s, 
-                %s, %s, %s, %s, %s, %s
+                %s, %s, %s, %s, %s
             )
-            ON DUPLICATE KEY UPDATE
-                name = VALUES(name),
-                priceVND = VALUES(priceVND),
-                summary = VALUES(summary),
-                description = VALUES(description),
-                openTime = VALUES(openTime),
-                closeTime = VALUES(closeTime),
-                phone = VALUES(phone),
-                rating = VALUES(rating),
-                reviewCount = VALUES(reviewCount),
-                popularity = VALUES(popularity),
-                image_url = VALUES(image_url),
-                tags = VALUES(tags),
-                category = VALUES(category),
-                dwell = VALUES(dwell),
-                address_id = VALUES(address_id)
         """
         
         cursor.execute(sql, (
-            place_data["id"],
             place_data["name"],
             place_data["priceVND"],
             place_data["summary"],
@@ -239,6 +229,8 @@ def import_data(data_lines: list):
     
     success_count = 0
     error_count = 0
+    # Cùng 1 địa điểm (tên + địa chỉ) lặp lại trong file: giữ dòng đầu tiên như import bulk
+    seen_keys = set()
     
     for line in data_lines:
         line = line.strip()
@@ -248,6 +240,10 @@ def import_data(data_lines: list):
         place_data = parse_line(line)
         if not place_data:
             continue
+        key = place_external_key(place_data)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
         
         # Create address first
         address_id = create_address(
@@ -279,6 +275,15 @@ def import_data(data_lines: list):
 
 def main():
     data_file = "places.tsv"
+
+    # python import_places.py --bulk : chỉ ghi dòng thêm / sửa / xóa so với DB (xem bulk_import.py)
+    # thêm --prune để xóa các dòng không còn trong file (chỉ trong các thành phố có mặt trong file)
+    if "--bulk" in sys.argv:
+        if not os.path.exists(data_file):
+            print(f"❌ File {data_file} not found!")
+            return
+        bulk_import(DB_CONFIG, data_file, "places", parse_line, place_external_key, prune="--prune" in sys.argv)
+        return
     
     if os.path.exists(data_file):
         with open(data_file, "r", encoding="utf-8") as f:
@@ -2,6 +2,7 @@ import json
 from typing import List
 from app.domain.entities.accommodation import Accommodation
 from app.infrastructure.database.connectdb import get_db
+from app.utils.city_registry import canonical_city_key
 from app.domain.entities.Address import Address
 from app.domain.entities.nightstay import NightStay
 
@@ -70,10 +71,10 @@ def fetch_accommodations_by_city(city: str) -> List[Accommodation]:
         a.lng
     FROM accommodation h
     JOIN addresses a ON h.address_id = a.id
-    WHERE a.city = %s
+    WHERE a.city_norm = %s
       AND h.category = 'hotel';
     """
-    cursor.execute(sql, (city,))
+    cursor.execute(sql, (canonical_city_key(city),))
 
     rows = cursor.fetchall()
 
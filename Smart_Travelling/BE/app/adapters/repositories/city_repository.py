@@ -0,0 +1,25 @@
+from typing import List
+
+from app.infrastructure.database.connectdb import get_db
+
+
+def fetch_all_city_names() -> List[str]:
+    """Lấy tên các thành phố đang có dữ liệu (addresses + events) để nạp city registry."""
+    db = get_db()
+    if db is None:
+        return []
+
+    cursor = db.cursor(dictionary=True)
+
+    sql = """
+    SELECT DISTINCT city FROM addresses WHERE city IS NOT NULL
+    UNION
+    SELECT DISTINCT city FROM events WHERE city IS NOT NULL;
+    """
+    cursor.execute(sql)
+    rows = cursor.fetchall()
+
+    cursor.close()
+    db.close()
+
+    return [row["city"] for row in rows]
@@ -8,6 +8,7 @@ from app.infrastructure.database.connectdb import get_db
 
 # 👇 THÊM IMPORT NÀY (sửa lại path cho đúng file của bạn nếu khác)
 from app.utils.normalize_text import normalize_text
+from app.utils.city_registry import canonical_city_key
 
 
 def _parse_activities(raw_value: Optional[str]) -> List[str]:
@@ -27,7 +28,7 @@ def _parse_activities(raw_value: Optional[str]) -> List[str]:
         return []
 
 
-def _row_to_event(row: Dict[str, Any]) -> Event:
+def row_to_event(row: Dict[str, Any]) -> Event:
     """
     Helper chuyển 1 dòng dữ liệu (dict) từ DB về object Event.
     """
@@ -68,14 +69,14 @@ class MySQLEventRepository(EventRepository):
 
     #     sql = """
     #     INSERT INTO events (
-    #         external_id, name, city, region,
+    #         external_id, name, city, city_norm, region,
     #         lat, lng,
     #         start_datetime, end_datetime, session,
     #         summary, activities, image_url, price_vnd, popularity,
             
     #     )
     #     VALUES (
-    #         %(external_id)s, %(name)s, %(city)s, %(region)s,
+    #         %(external_id)s, %(name)s, %(city)s, %(city_norm)s, %(region)s,
     #         %(lat)s, %(lng)s,
     #         %(start_datetime)s, %(end_datetime)s, %(session)s,
     #         %(summary)s, CAST(%(activities)s AS JSON), %(image_url)s, %(price_vnd)s, %(popularity)s
@@ -83,6 +84,7 @@ class MySQLEventRepository(EventRepository):
     #     ON DUPLICATE KEY UPDATE
     #         name           = VALUES(name),
     #         city           = VALUES(city),
+    #         city_norm      = VALUES(city_norm),
     #         region         = VALUES(region),
     #         lat            = VALUES(lat),
     #         lng            = VALUES(lng),
@@ -104,6 +106,7 @@ class MySQLEventRepository(EventRepository):
     #                 "external_id": e.external_id,
     #                 "name": e.name,
     #                 "city": e.city,
+    #                 "city_norm": canonical_city_key(e.city),
     #                 "region": e.region,
     #                 "lat": e.lat,
     #                 "lng": e.lng,
@@ -141,8 +144,10 @@ class MySQLEventRepository(EventRepository):
 
         LƯU Ý:
         - Để hỗ trợ gõ city có dấu / không dấu:
-          + Không filter city trực tiếp trong SQL nữa.
-          + Lọc theo city bằng Python với normalize_text().
+          + City người dùng nhập được đổi về canonical key 1 lần
+            (city registry: bỏ dấu + alias như "TP.HCM", "Sài Gòn").
+          + So khớp với cột city_norm (đã chuẩn hóa sẵn khi ghi),
+            dùng index idx_events_citynorm_date (city_norm, start, end).
         """
         db = get_db()
         if db is None:
@@ -151,7 +156,9 @@ class MySQLEventRepository(EventRepository):
         start_of_day = datetime.combine(target_date, datetime.min.time())
         end_of_day = start_of_day + timedelta(days=1)
 
-        # BỎ ĐIỀU KIỆN city = %s TRONG SQL, chỉ lọc theo ngày + session
+        # Đổi city user nhập vào về canonical key (chỉ 1 lần cho cả request)
+        target_city_norm = canonical_city_key(city)
+
         sql = """
         SELECT
             id, external_id, name, city, region,
@@ -159,10 +166,11 @@ class MySQLEventRepository(EventRepository):
             start_datetime, end_datetime, session,
             summary, activities, image_url, price_vnd, popularity
         FROM events
-        WHERE start_datetime < %s
+        WHERE city_norm = %s
+          AND start_datetime < %s
           AND end_datetime > %s
         """
-        params: List[Any] = [end_of_day, start_of_day]
+        params: List[Any] = [target_city_norm, end_of_day, start_of_day]
 
         if session:
             sql += " AND (session = %s OR session IS NULL)"
@@ -175,17 +183,7 @@ class MySQLEventRepository(EventRepository):
         cursor.close()
         db.close()
 
-        # Normalize city user nhập vào
-        target_city_norm = normalize_text(city)
-
-        events: List[Event] = []
-        for row in rows:
-            # Normalize city từ DB để so sánh
-            db_city_norm = normalize_text(row["city"] or "")
-            if db_city_norm == target_city_norm:
-                events.append(_row_to_event(row))
-
-        return events
+        return [row_to_event(row) for row in rows]
 
     def get_by_id(self, event_id: int) -> Optional[Event]:
         """
@@ -216,23 +214,16 @@ class MySQLEventRepository(EventRepository):
         if not row:
             return None
 
-        return _row_to_event(row)
+        return row_to_event(row)
     
-    def search_events_by_name(self, keyword: str, limit: int = 5) -> List[Event]:
+    def get_all_events(self) -> List[Event]:
         """
-        Tìm event theo tên / city / region, cho phép gõ không dấu.
-        Đơn giản: load toàn bộ events, filter bằng normalize_text trong Python.
-        Dataset của bạn nhỏ nên cách này ổn.
+        Lấy toàn bộ events (dùng khi build catalog / search index lúc khởi động).
         """
-        if not keyword:
-            return []
-
         db = get_db()
         if db is None:
             return []
 
-        cursor = db.cursor(dictionary=True)
-
         sql = """
         SELECT
             id, external_id, name, city, region,
@@ -241,17 +232,29 @@ class MySQLEventRepository(EventRepository):
             summary, activities, image_url, price_vnd, popularity
         FROM events
         """
+
+        cursor = db.cursor(dictionary=True)
         cursor.execute(sql)
         rows = cursor.fetchall()
 
         cursor.close()
         db.close()
 
+        return [row_to_event(row) for row in rows]
+
+    def search_events_by_name(self, keyword: str, limit: int = 5) -> List[Event]:
+        """
+        Tìm event theo tên / city / region, cho phép gõ không dấu.
+        Bản quét toàn bảng, chỉ dùng làm fallback khi search index chưa được build
+        (EventService ưu tiên tra trong SearchIndex của catalog_service).
+        """
+        if not keyword:
+            return []
+
         norm_kw = normalize_text(keyword)
         results: List[Event] = []
 
-        for row in rows:
-            e = _row_to_event(row)
+        for e in self.get_all_events():
             haystack = " ".join(
                 [
                     normalize_text(e.name),
@@ -265,4 +268,3 @@ class MySQLEventRepository(EventRepository):
                     break
 
         return results
-
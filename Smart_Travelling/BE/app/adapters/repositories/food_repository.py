@@ -3,6 +3,7 @@ from typing import List
 from app.domain.entities.food_place import FoodPlace
 from app.domain.entities.Address import Address
 from app.infrastructure.database.connectdb import get_db
+from app.utils.city_registry import canonical_city_key
 from app.config.setting import IMAGE_BASE_URL
 
 def row_to_food_place(row) -> FoodPlace:
@@ -75,10 +76,10 @@ def fetch_food_places_by_city(city: str) -> List[FoodPlace]:
         a.lng
     FROM food f
     JOIN addresses a ON f.address_id = a.id
-    WHERE a.city = %s
+    WHERE a.city_norm = %s
       AND f.category = 'eat';
     """
-    cursor.execute(sql, (city,))
+    cursor.execute(sql, (canonical_city_key(city),))
 
     rows = cursor.fetchall()
     
@@ -86,3 +87,48 @@ def fetch_food_places_by_city(city: str) -> List[FoodPlace]:
     db.close()
     
     return [row_to_food_place(r) for r in rows]
+
+
+def fetch_all_food_places() -> List[FoodPlace]:
+    """Lấy toàn bộ quán ăn (dùng khi build catalog / search index lúc khởi động)."""
+    db = get_db()
+    if db is None:
+        return []
+
+    cursor = db.cursor(dictionary=True)
+
+    sql = """
+    SELECT
+        f.id,
+        f.name,
+        f.priceVND,
+        f.summary,
+        f.description,
+        f.rating,
+        f.openTime,
+        f.closeTime,
+        f.phone,
+        f.reviewCount,
+        f.popularity,
+        f.image_url,
+        f.tags,
+        f.category,
+        f.cuisine_type,
+        a.house_number,
+        a.street,
+        a.ward,
+        a.district,
+        a.city,
+        a.lat,
+        a.lng
+    FROM food f
+    JOIN addresses a ON f.address_id = a.id
+    WHERE f.category = 'eat';
+    """
+    cursor.execute(sql)
+    rows = cursor.fetchall()
+
+    cursor.close()
+    db.close()
+
+    return [row_to_food_place(r) for r in rows]
@@ -3,6 +3,7 @@ import json
 from app.domain.entities.place_lite import PlaceLite
 from app.domain.entities.Address import Address
 from app.infrastructure.database.connectdb import get_db
+from app.utils.city_registry import canonical_city_key
 from app.config.setting import IMAGE_BASE_URL
 
 
@@ -82,12 +83,12 @@ def fetch_place_lites_by_city(city: str) -> List[PlaceLite]:
         a.lng
     FROM places p
     JOIN addresses a ON p.address_id = a.id
-    WHERE a.city = %s
+    WHERE a.city_norm = %s
       AND p.category = 'visit';
     """
 
     # 3. Thực thi query
-    cursor.execute(sql, (city,))
+    cursor.execute(sql, (canonical_city_key(city),))
     rows = cursor.fetchall()
 
     # 4. Đóng cursor + connection
@@ -64,6 +64,4 @@ def fetch_tags_by_data() -> List[str]:
 
     cursor.close()
     db.close()
-    for tag in all_tags:
-        print("Tag fetched:", tag)
-    return all_tags
\ No newline at end of file
+    return all_tags
@@ -1,9 +1,50 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from app.infrastructure.database.connectdb import get_db
+from app.config.setting import USER_CACHE_MAX, USER_CACHE_TTL_SECONDS
+from app.utils.ttl_cache import TTLCache
 from datetime import datetime, timezone
 import json
 
 
+# Cache trong bộ nhớ cho get_user_by_id (dòng users) và get_user_tags (tags đã parse),
+# các hàm ghi bên dưới cập nhật luôn vào cache (write-through), xóa user thì bỏ khỏi cache.
+# TTL ngắn: nhiều worker / process mỗi nơi 1 cache, sau tối đa TTL sẽ đọc lại từ DB.
+_user_cache = TTLCache(maxsize=USER_CACHE_MAX, ttl=USER_CACHE_TTL_SECONDS)
+_tags_cache = TTLCache(maxsize=USER_CACHE_MAX, ttl=USER_CACHE_TTL_SECONDS)
+
+
+def _parse_tags(tags) -> List[str]:
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except json.JSONDecodeError:
+            tags = []
+    return tags if isinstance(tags, list) else []
+
+
+def _cache_write(user_id: int, **fields) -> None:
+    """Ghi xuyên: user đang có trong cache thì cập nhật các cột vừa ghi xuống DB."""
+    row = _user_cache.peek(user_id)
+    if row is not None:
+        _user_cache.set(user_id, {**row, **fields})
+    if "tags" in fields:
+        _tags_cache.set(user_id, _parse_tags(fields["tags"]))
+
+
+def _cache_evict(user_id: int) -> None:
+    _user_cache.pop(user_id)
+    _tags_cache.pop(user_id)
+
+
+def clear_user_cache() -> None:
+    _user_cache.clear()
+    _tags_cache.clear()
+
+
+def user_cache_stats() -> Dict:
+    return {"users": _user_cache.stats(), "tags": _tags_cache.stats()}
+
+
 
 # Tạo tài khoản
 
@@ -136,6 +177,10 @@ def get_user_by_phone(phone: str) -> Optional[Dict]:
 
 # Lấy tài khoản bằng id của user, tương tự như username
 def get_user_by_id(user_id: int) -> Optional[Dict]:
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)     # trả bản sao, nơi gọi có thể sửa dict (vd pop hashed_password)
+
     db = get_db()
     if db is None:
         return None
@@ -150,6 +195,9 @@ def get_user_by_id(user_id: int) -> Optional[Dict]:
     cursor.close()
     db.close()
 
+    if result is not None:
+        _user_cache.set(user_id, result)
+        return dict(result)
     return result
 
 # lấy tags của user theo id
@@ -158,6 +206,16 @@ def get_user_tags(user_id: int) -> Optional[List[str]]:
     Lấy danh sách tags của user.
     Trả về List[str] hoặc None nếu user không có tags.
     """
+    cached = _tags_cache.get(user_id)
+    if cached is not None:
+        return list(cached)
+
+    row = _user_cache.peek(user_id)
+    if row is not None:
+        tags = _parse_tags(row.get("tags"))
+        _tags_cache.set(user_id, tags)
+        return list(tags)
+
     db = get_db()
     if db is None:
         return None
@@ -173,15 +231,9 @@ def get_user_tags(user_id: int) -> Optional[List[str]]:
     if result is None:
         return None
 
-    tags = result.get("tags")
-    if isinstance(tags, str):
-        try:
-            import json
-            tags = json.loads(tags)
-        except json.JSONDecodeError:
-            tags = []
-    
-    return tags if isinstance(tags, list) else []
+    tags = _parse_tags(result.get("tags"))
+    _tags_cache.set(user_id, tags)
+    return list(tags)
 
 
 # Update các trường hợp
@@ -198,6 +250,7 @@ def update_user_email(user_id: int, new_email: str) -> bool:
     cursor.execute(sql, (new_email, user_id))
     
     db.commit()
+    _cache_write(user_id, email=new_email)
 
     updated = cursor.rowcount > 0       # phần này để kiểm tra số dòng thay đổi
 
@@ -219,6 +272,7 @@ def update_user_phone(user_id: int, phone: str) -> bool:
     sql = "UPDATE users SET phone_number = %s WHERE id = %s"
     cursor.execute(sql, (phone, user_id))
     db.commit()
+    _cache_write(user_id, phone_number=phone)
 
     updated = cursor.rowcount > 0
 
@@ -241,6 +295,7 @@ def update_user_password(user_id: int, hashed_password: str) -> bool:
     sql = "UPDATE users SET hashed_password = %s WHERE id = %s"
     cursor.execute(sql, (hashed_password, user_id))
     db.commit()
+    _cache_write(user_id, hashed_password=hashed_password)
 
     updated = cursor.rowcount > 0
 
@@ -269,6 +324,7 @@ def update_failed_attempts(user_id: int, attempts: int) -> bool:
 
     cursor.execute(sql, (attempts, user_id))
     db.commit()
+    _cache_write(user_id, failed_attempts=attempts)
 
     updated = cursor.rowcount > 0
 
@@ -291,6 +347,7 @@ def reset_failed_attempts(user_id: int) -> bool:
     sql = "UPDATE users SET failed_attempts = 0 WHERE id = %s"
     cursor.execute(sql, (user_id,))
     db.commit()
+    _cache_write(user_id, failed_attempts=0)
 
     updated = cursor.rowcount > 0
 
@@ -304,6 +361,57 @@ def reset_failed_attempts(user_id: int) -> bool:
 
 
 
+# ghi thay đổi đăng nhập của nhiều user cùng lúc: 1 connection, 1 commit
+# (login_throttle gom các lần đăng nhập sai / đúng rồi gọi hàm này theo lô)
+# changes: (user_id, reset, delta) - reset: đặt failed_attempts = delta, không thì cộng thêm delta.
+# Khóa tài khoản tính ngay trong SQL trên giá trị DB => nhiều worker cùng ghi vẫn khóa đúng.
+# is_active đứng trước failed_attempts: MySQL gán lần lượt từ trái sang, nên CASE đọc giá trị cũ.
+def apply_login_changes(changes: List[Tuple[int, bool, int]], max_failed_attempts: int) -> bool:
+    if not changes:
+        return True
+
+    db = get_db()
+    if db is None:
+        return False
+
+    cursor = db.cursor()
+    now = datetime.now(timezone.utc)
+    increments = [(delta, max_failed_attempts, delta, now, user_id) for user_id, reset, delta in changes if not reset]
+    if increments:
+        cursor.executemany(
+            """
+            UPDATE users
+            SET is_active = CASE WHEN failed_attempts + %s >= %s THEN FALSE ELSE is_active END,
+                failed_attempts = failed_attempts + %s,
+                updated_at = %s
+            WHERE id = %s
+            """,
+            increments,
+        )
+    resets = [(delta, max_failed_attempts, delta, now, user_id) for user_id, reset, delta in changes if reset]
+    if resets:
+        cursor.executemany(
+            """
+            UPDATE users
+            SET is_active = CASE WHEN %s >= %s THEN FALSE ELSE is_active END,
+                failed_attempts = %s,
+                updated_at = %s
+            WHERE id = %s
+            """,
+            resets,
+        )
+    db.commit()
+
+    # Giá trị mới do DB tính => bỏ khỏi cache, lần đọc sau lấy lại
+    for user_id, _, _ in changes:
+        _cache_evict(user_id)
+
+    cursor.close()
+    db.close()
+
+    return True
+
+
 # đây là hàm mình set nó về false -> tài khoản không thể đăng nhập được nữa
 def deactivate_user(user_id: int) -> bool:
     return set_active(user_id, False)
@@ -324,6 +432,7 @@ def set_active(user_id: int, active: bool) -> bool:
     sql = "UPDATE users SET is_active = %s WHERE id = %s"
     cursor.execute(sql, (active, user_id))
     db.commit()
+    _cache_write(user_id, is_active=active)
 
     updated = cursor.rowcount > 0
 
@@ -351,6 +460,7 @@ def update_timestamp(user_id: int) -> bool:
 
     cursor.execute(sql, (now, user_id))
     db.commit()
+    _cache_write(user_id, updated_at=now)
 
     updated = cursor.rowcount > 0
 
@@ -381,6 +491,7 @@ def update_user_tags(user_id: int, tags: List[str]) -> bool:
     sql = "UPDATE users SET tags = %s WHERE id = %s"
     cursor.execute(sql, (tags_json, user_id))
     db.commit()
+    _cache_write(user_id, tags=tags_json)
 
     updated = cursor.rowcount > 0
 
@@ -403,6 +514,7 @@ def delete_user(user_id: int) -> bool:
     sql = "DELETE FROM users WHERE id = %s"
     cursor.execute(sql, (user_id,))
     db.commit()
+    _cache_evict(user_id)
 
     deleted = cursor.rowcount > 0
 
@@ -413,6 +525,80 @@ def delete_user(user_id: int) -> bool:
 
 
 
+# Các cột admin được chọn khi liệt kê user (không bao giờ có hashed_password)
+USER_LIST_COLUMNS = (
+    "id", "username", "email", "phone_number", "role",
+    "is_active", "failed_attempts", "tags", "created_at", "updated_at",
+)
+
+
+def _list_users_sql(columns: List[str], is_active: Optional[bool], role: Optional[str]) -> Tuple[str, List]:
+    cols = [c for c in columns if c in USER_LIST_COLUMNS] or list(USER_LIST_COLUMNS)
+    if "id" not in cols:
+        cols.insert(0, "id")     # cần id làm mốc trang sau
+    where, params = ["id > %s"], []
+    if role is not None:
+        where.append("role = %s")
+        params.append(role)
+    if is_active is not None:
+        where.append("is_active = %s")
+        params.append(is_active)
+    sql = f"SELECT {', '.join(cols)} FROM users WHERE {' AND '.join(where)} ORDER BY id ASC LIMIT %s"
+    return sql, params
+
+
+# liệt kê user theo trang (keyset theo id: WHERE id > after_id ORDER BY id, dùng index (role, id))
+def list_users_page(
+    after_id: int = 0,
+    limit: int = 50,
+    columns: Optional[List[str]] = None,
+    is_active: Optional[bool] = None,
+    role: Optional[str] = "user",
+) -> List[Dict]:
+    db = get_db()
+    if db is None:
+        return []
+
+    cursor = db.cursor(dictionary=True)
+    sql, params = _list_users_sql(columns or [], is_active, role)
+    cursor.execute(sql, (after_id, *params, limit))
+    results = cursor.fetchall()
+
+    cursor.close()
+    db.close()
+
+    return results
+
+
+# duyệt toàn bộ user theo từng lô keyset trên 1 connection, mỗi lần chỉ giữ tối đa batch_size dòng
+def iter_users(
+    columns: Optional[List[str]] = None,
+    is_active: Optional[bool] = None,
+    role: Optional[str] = "user",
+    batch_size: int = 500,
+):
+    db = get_db()
+    if db is None:
+        return
+
+    cursor = db.cursor(dictionary=True)
+    sql, params = _list_users_sql(columns or [], is_active, role)
+    after_id = 0
+    try:
+        while True:
+            cursor.execute(sql, (after_id, *params, batch_size))
+            count = 0
+            for row in cursor:      # đọc dần từng dòng từ cursor
+                count += 1
+                after_id = row["id"]
+                yield row
+            if count < batch_size:
+                return
+    finally:
+        cursor.close()
+        db.close()
+
+
 # lấy tất cả user, không lấy admin
 def get_all_users() -> List[Dict]:
     db = get_db()
@@ -429,4 +615,4 @@ def get_all_users() -> List[Dict]:
     cursor.close()
     db.close()
 
-    return results
\ No newline at end of file
+    return results
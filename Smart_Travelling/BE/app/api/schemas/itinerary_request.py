@@ -1,7 +1,9 @@
 from datetime import date, time
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
+from app.config.setting import ITINERARY_VARIANTS_MAX
+
 
 """ Cấu hình thời gian cho 1 khung trong ngày (buổi sáng, trưa, chiều, tối) """
 class BlockTimeConfig(BaseModel):
@@ -30,6 +32,14 @@ class ItineraryRequest(BaseModel):
     must_visit_place_ids: List[int] = []
     avoid_place_ids: List[int] = []
 
+    # Sắp lại thứ tự tham quan trong block để giảm quãng đường (None = theo ROUTE_OPT_ENABLED)
+    optimize_route: Optional[bool] = None
+    # Chia địa điểm thành cụm địa lý theo ngày (None = theo DAY_CLUSTERING_ENABLED)
+    cluster_days: Optional[bool] = None
+    # Số phương án build rồi chọn phương án điểm cao nhất ("best") hoặc trả về tất cả ("all")
+    variants: int = Field(1, ge=1, le=ITINERARY_VARIANTS_MAX)
+    variants_mode: Literal["best", "all"] = "best"
+
     """ Cấu hình thời gian cho các khung trong ngày """
     morning: BlockTimeConfig = BlockTimeConfig()
     lunch: BlockTimeConfig   = BlockTimeConfig()
@@ -1,6 +1,11 @@
-from fastapi import APIRouter
-from app.application.services import user_service
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.application.services import user_service, catalog_service, trip_history_writer, trip_stats_service
+from app.adapters.repositories import user_repository
 from app.utils.response_format import success, error
+from app.config.setting import ADMIN_USERS_PAGE_DEFAULT
 
 
 router = APIRouter(
@@ -9,14 +14,43 @@ router = APIRouter(
 )
 
 
-# ADMIN – XEM DANH SÁCH USER
+# ADMIN – XEM DANH SÁCH USER (keyset theo id; format=ndjson => stream toàn bộ, mỗi dòng 1 user)
 @router.get("/users")
-def list_users():
-    users = user_service.admin_list_all_users()
-    return success("Lấy danh sách người dùng thành công!", data=users)
+def list_users(
+    after: int = Query(0, ge=0, description="next_after của trang trước"),
+    limit: int = Query(ADMIN_USERS_PAGE_DEFAULT, ge=1),
+    fields: Optional[str] = Query(None, description="Các cột cần lấy, cách nhau bởi dấu phẩy"),
+    active: Optional[bool] = Query(None),
+    role: str = Query("user", pattern="^(user|admin|all)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    columns = [c.strip() for c in fields.split(",") if c.strip()] if fields else None
+    role_filter = None if role == "all" else role
+    try:
+        user_service.check_user_columns(columns)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=error(str(e)))
+
+    if format == "ndjson":
+        return StreamingResponse(
+            user_service.admin_export_users_ndjson(columns, active, role_filter),
+            media_type="application/x-ndjson",
+        )
+
+    users, next_after = user_service.admin_list_users(after, limit, columns, active, role_filter)
+    return success(
+        "Lấy danh sách người dùng thành công!",
+        data={"users": users, "next_after": next_after},
+    )
 
 
 
+# ADMIN – HIT RATE CỦA CACHE PROFILE / TAGS USER
+@router.get("/users/cache")
+def user_cache_stats():
+    return success("Trạng thái cache user", data=user_repository.user_cache_stats())
+
+
 # ADMIN – KHÓA USER
 @router.post("/users/deactivate/{user_id}")
 def deactivate_user(user_id: int):
@@ -47,3 +81,37 @@ def delete_user(user_id: int):
         return success("Xóa người dùng thành công")
     except ValueError as e:
         return error(str(e))
+
+
+
+# ADMIN – BUILD LẠI CATALOG + SEARCH INDEX (sau khi import / sửa dữ liệu)
+@router.post("/catalog/refresh")
+def refresh_catalog():
+    try:
+        stats = catalog_service.refresh_catalog()
+        return success("Đã cập nhật catalog và search index", data=stats)
+    except Exception as e:
+        return error(f"Không cập nhật được catalog: {e}")
+
+
+# ADMIN – TRẠNG THÁI THREAD GHI LỊCH SỬ TRIP (hàng đợi, số lô, số lần phải ghi đồng bộ)
+@router.get("/trip-history/writer")
+def trip_history_writer_stats():
+    stats = trip_history_writer.get_stats()
+    if stats is None:
+        return error("Writer lịch sử trip chưa chạy")
+    return success("Trạng thái writer lịch sử trip", data=stats)
+
+
+# ADMIN – THỐNG KÊ TRIP ĐÃ TẠO (cộng dồn khi lưu trip, không quét lịch sử)
+@router.get("/trip-stats")
+def trip_stats_overview(top: int = Query(10, ge=1)):
+    return success("Thống kê trip", data=trip_stats_service.get_overview(top))
+
+
+@router.get("/trip-stats/{city}")
+def trip_stats_city(city: str, top: int = Query(10, ge=1)):
+    stats = trip_stats_service.get_city_stats(city, top)
+    if stats is None:
+        return error("Chưa có trip nào cho thành phố này", 404)
+    return success("Thống kê trip theo thành phố", data=stats)
@@ -14,9 +14,9 @@ router = APIRouter(
 
 # ĐĂNG KÝ USER
 @router.post("/register")
-def register_user(data: Dict):
+async def register_user(data: Dict):
     try:
-        user_service.register_user(data)
+        await user_service.register_user(data)
         return success("Đăng ký thành công. Vui lòng đăng nhập!")
     except ValueError as e:
         return error(str(e))
@@ -24,9 +24,9 @@ def register_user(data: Dict):
 
 # ĐĂNG NHẬP USER
 @router.post("/login")
-def login(data: Dict):
+async def login(data: Dict):
     try:
-        user = user_service.login(
+        user = await user_service.login(
             username=data["username"],
             password=data["password"]
         )
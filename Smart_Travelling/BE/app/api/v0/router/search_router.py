@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Query
+
+from app.application.services import catalog_service
+from app.config.setting import (
+    SEARCH_LIMIT_DEFAULT,
+    SEARCH_LIMIT_MAX,
+    SUGGEST_LIMIT_DEFAULT,
+    SUGGEST_TOP_K,
+)
+from app.utils.response_format import success, error
+
+
+router = APIRouter(tags=["Search"])
+
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1, description="Từ khóa, gõ có dấu hoặc không dấu", examples=["ho guom"]),
+    kind: Optional[List[str]] = Query(None, description="place | food | event"),
+    city: Optional[str] = Query(None, examples=["Hà Nội"]),
+    limit: int = Query(SEARCH_LIMIT_DEFAULT, ge=1, le=SEARCH_LIMIT_MAX),
+) -> Dict:
+    """
+    Tìm chung places + food + events trên search index trong bộ nhớ, kết quả đã xếp hạng.
+    """
+    if catalog_service.get_search_index() is None:
+        return error("Search index chưa sẵn sàng")
+
+    hits = catalog_service.search(q, kinds=kind, city=city, limit=limit)
+    data = [
+        {
+            "kind": hit.doc.kind,
+            "id": hit.doc.id,
+            "name": hit.doc.name,
+            "city": hit.doc.city,
+            "popularity": hit.doc.popularity,
+            "image_url": getattr(hit.doc.ref, "image_url", None),
+            "score": hit.score,
+        }
+        for hit in hits
+    ]
+    return success("Tìm kiếm thành công", data=data)
+
+
+@router.get("/suggest")
+def suggest(
+    q: str = Query(..., min_length=1, description="Phần đầu của tên đang gõ", examples=["ho g"]),
+    kind: Optional[List[str]] = Query(None, description="city | place | food | event"),
+    limit: int = Query(SUGGEST_LIMIT_DEFAULT, ge=1, le=SUGGEST_TOP_K),
+) -> Dict:
+    """
+    Gợi ý typeahead cho ô nhập city / địa điểm / sự kiện, tra trên trie trong bộ nhớ.
+    """
+    if catalog_service.get_suggest_index() is None:
+        return error("Suggest index chưa sẵn sàng")
+
+    items = catalog_service.suggest(q, kinds=kind, limit=limit)
+    data = [
+        {"kind": s.kind, "id": s.id, "name": s.name, "city": s.city}
+        for s in items
+    ]
+    return success("Lấy gợi ý thành công", data=data)
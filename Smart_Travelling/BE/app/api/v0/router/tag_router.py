@@ -1,5 +1,5 @@
-from fastapi import APIRouter
-from typing import Dict, List
+from fastapi import APIRouter, Query, Request, Response
+from typing import Dict, List, Optional
 
 from app.application.services import tag_service
 from app.utils.response_format import success, error
@@ -12,9 +12,22 @@ router = APIRouter(
 
 
 @router.get("/items") 
-def get_all_tag():
-    tags = tag_service.get_all_places_by_tag()
+def get_all_tag(
+    request: Request,
+    response: Response,
+    city: Optional[str] = Query(None, description="Chỉ lấy tag có trong thành phố này", examples=["Hà Nội"]),
+    category: Optional[str] = Query(None, description="visit | eat"),
+    counts: bool = Query(False, description="Trả kèm số địa điểm của mỗi tag"),
+):
+    tags, etag = tag_service.get_tags(city=city, category=category, with_counts=counts)
     if tags is None:
         return error("Tag không có tồn tại")
-    return success("Lấy danh sách tags thành công!", data=tags)
 
+    # Registry chỉ đổi khi catalog build lại => client gửi If-None-Match thì trả 304
+    if etag is not None:
+        etag = f'"{etag}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return success("Lấy danh sách tags thành công!", data=tags)
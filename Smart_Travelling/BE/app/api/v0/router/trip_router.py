@@ -1,9 +1,10 @@
-from fastapi import APIRouter
-from typing import Dict, List
+from datetime import date
+from fastapi import APIRouter, Query, Request, Response
+from typing import Dict, List, Optional
 
 from app.api.schemas.itinerary_request import ItineraryRequest
 from app.utils.response_format import success, error
-from app.application.services import trip_service, trip_history_file_service
+from app.application.services import trip_service, trip_history_file_service, trip_history_writer
 router = APIRouter(
     prefix="/recommand",
     tags=["recommand"]
@@ -27,24 +28,9 @@ def Recommnad_trip(req: ItineraryRequest) -> Dict:
             elif "total_attraction_cost_vnd" in cost_summary:
                 total_cost += cost_summary["total_attraction_cost_vnd"]
 
-        # ===== TẠO LIST PLACES ĐƠN GIẢN ĐỂ HIỂN THỊ LỊCH SỬ =====
-        summary_places: List[Dict[str, Any]] = []
-        for day in days:
-            date = day.get("date")
-            for block_name, block_places in (day.get("blocks") or {}).items():
-                for p in block_places:
-                    summary_places.append({
-                        "name": p.get("name"),
-                        "type": p.get("type"),
-                        "day": date,
-                        "block": block_name,
-                        "price_vnd": p.get("price_vnd", 0),
-                        "image_url": p.get("image_url")
-                    })
-        
-        # ✅ Lưu vào file nếu FE gửi user_id
+        # ✅ Lưu vào file nếu FE gửi user_id (ghi ở background, không chờ đĩa)
         if req.user_id:
-            trip_history_file_service.save_trip_to_file(
+            trip_history_writer.submit_trip(
                 user_id=req.user_id,
                 trip_data={
                     "city": req.city,
@@ -52,12 +38,12 @@ def Recommnad_trip(req: ItineraryRequest) -> Dict:
                     "num_days": req.num_days,
                     "num_people": req.num_people,
                     "total_cost": total_cost,
-                    "places": summary_places,
+                    # Không lưu thêm list places phẳng: suy ra được từ trip_data.days[].blocks
                     "tags": getattr(req, "preferred_tags", []) or [],
-                    "trip_data": data
+                    # Chỉ lưu phương án được chọn
+                    "trip_data": {k: v for k, v in data.items() if k != "alternatives"}
                 }
             )
-            print(f"✅ Saved trip history for user {req.user_id}")
         
         
         
@@ -66,16 +52,30 @@ def Recommnad_trip(req: ItineraryRequest) -> Dict:
         return error(str(e))
     
 @router.get("/history/{user_id}")
-def get_trip_history(user_id: int) -> Dict:
-    """Lấy lịch sử trip của user gom nhóm theo ngày"""
+def get_trip_history(
+    user_id: int,
+    limit: Optional[int] = Query(None, ge=1, description="Số trip mỗi trang (bỏ trống = lấy hết)"),
+    before: Optional[int] = Query(None, description="next_before của trang trước"),
+    date_from: Optional[date] = Query(None, description="Lọc theo ngày tạo, từ ngày"),
+    date_to: Optional[date] = Query(None, description="Lọc theo ngày tạo, đến ngày"),
+    city: Optional[str] = Query(None),
+) -> Dict:
+    """Lấy lịch sử trip của user gom nhóm theo ngày (chỉ đọc index tóm tắt, không mở file trip)"""
     if not user_id:
         return error("Vui lòng cung cấp user_id", code=400)
     
-    trips = trip_history_file_service.load_trip_history(user_id)
+    trips, total, next_before = trip_history_file_service.list_trip_summaries(
+        user_id,
+        before_id=before,
+        limit=limit,
+        date_from=date_from,
+        date_to=date_to,
+        city=city,
+    )
     
     trips_by_date = {}
     for trip in trips:
-        created_at = trip.get("created_at", "")
+        created_at = trip.get("created_at") or ""
         date_key = created_at[:10]
         
         if date_key not in trips_by_date:
@@ -94,22 +94,32 @@ def get_trip_history(user_id: int) -> Dict:
         "Lấy lịch sử thành công",
         data={
             "trips_by_date": trips_by_date,
-            "total_trips": len(trips)
+            "total_trips": total,
+            "next_before": next_before,
         }
     )
     
 @router.get("/history/{user_id}/{trip_id}")
-def get_trip_detail(user_id: int, trip_id: int) -> Dict:
-    """Lấy chi tiết 1 trip (KHÔNG đổi id nữa)"""
+def get_trip_detail(user_id: int, trip_id: int, request: Request):
+    """Lấy chi tiết 1 trip (KHÔNG đổi id nữa, chỉ ghi accessed_at vào index cho retention)"""
+    trip_history_file_service.update_trip_access_time(user_id, trip_id)
+
+    # File trip đã lưu sẵn dạng gzip của đúng body response => client nhận gzip thì gửi thẳng
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        raw = trip_history_file_service.get_trip_detail_gzip(user_id, trip_id)
+        if raw is not None:
+            return Response(
+                content=raw,
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+
     trip = trip_history_file_service.get_trip_detail(user_id, trip_id)
 
     if not trip:
         return error("Không tìm thấy trip", 404)
 
-    # Không cần update_access_time nữa
-    # trip_history_file_service.update_trip_access_time(user_id, trip_id)
-
-    return success("Lấy chi tiết trip thành công", trip)
+    return success(trip_history_file_service.TRIP_DETAIL_MESSAGE, trip)
 
 @router.delete("/history/{user_id}/{trip_id}")
 def delete_trip(trip_id: int, user_id: int) -> Dict:
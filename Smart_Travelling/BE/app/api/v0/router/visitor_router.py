@@ -20,9 +20,13 @@ def recommend_places(data: Dict):
     {
       "city": "Ho Chi Minh",
       "user_id": 5  #user id để llaasy tag sở thích
-      "seen_ids": [1, 2, 3],   # optional – danh sách id đã gợi ý trước đó
+      "cursor": "abc...",      # optional – token lần trước trả về (null ở lần đầu)
+      "seen_ids": [1, 2, 3],   # optional – cách cũ: danh sách id đã gợi ý trước đó
       "k": 5                   # optional – số lượng cần gợi ý, mặc định 5
     }
+
+    Có trường "cursor" => server giữ state, response trả "cursor" thay cho "seen_ids"
+    (body không lớn dần theo số lần cuộn).
     """
 
     try:
@@ -31,6 +35,23 @@ def recommend_places(data: Dict):
 
         # seen_ids: danh sách id đã xem (optional)
         user_id = data.get("user_id")  # ✅ THÊM
+
+        if "cursor" in data:
+            places, cursor = visitor_service.recommend_with_cursor(
+                city=city,
+                user_id=user_id,
+                cursor=data.get("cursor"),
+                k=5,
+            )
+            return success(
+                "Gợi ý địa điểm tham quan thành công!",
+                data={
+                    "city": city,
+                    "places": [p.model_dump() for p in places],
+                    "cursor": cursor,  # FE lưu lại để lần sau gửi lên
+                },
+            )
+
         raw_seen: List[int] = data.get("seen_ids", []) or []
         seen_ids: Set[int] = set(raw_seen)
 
@@ -24,4 +24,9 @@ class EventRepository(ABC):
     @abstractmethod
     def search_events_by_name(self, keyword: str, limit: int = 5) -> List[Event]:
         """Tìm các event theo tên (có thể gõ không dấu)."""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_events(self) -> List[Event]:
+        """Lấy toàn bộ events (dùng để build search index)."""
+        raise NotImplementedError
@@ -0,0 +1,171 @@
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from app.domain.entities.itinerary_spot import ItinerarySpot
+
+
+"""
+Chia địa điểm của thành phố thành num_days cụm gần nhau (k-means có cân bằng số lượng) trước khi lập lịch:
+mỗi ngày chỉ chọn trong cụm của mình (+ vài điểm gần nhất nếu cụm quá ít) => ít ứng viên hơn,
+các ngày không chạy ngang dọc cả thành phố.
+- Toạ độ chiếu phẳng: x = lng * cos(lat trung bình), y = lat (đủ chính xác trong 1 thành phố)
+- Khởi tạo tâm bằng farthest-point (xác định, không dùng random => cùng dữ liệu ra cùng cụm)
+- Gán điểm theo "regret" (chênh lệch tâm gần nhất và nhì) vào cụm gần nhất còn chỗ,
+  sức chứa mỗi cụm = ceil(n / k * (1 + slack))
+- Điểm quá xa trung tâm (vd đảo / ngoại thành, > OUTLIER_FACTOR lần khoảng cách trung vị)
+  không được chia cụm, giữ ở mọi ngày như trước (greedy tự lọc theo khoảng cách)
+"""
+
+OUTLIER_FACTOR = 4.0
+
+Point = Tuple[float, float]
+
+
+def _lng_scale(spots: Sequence[ItinerarySpot]) -> float:
+    mean_lat = sum(s.lat for s in spots) / len(spots)
+    return math.cos(math.radians(mean_lat))
+
+
+def _project(spots: Sequence[ItinerarySpot], scale: float) -> List[Point]:
+    return [(s.lng * scale, s.lat) for s in spots]
+
+
+def _d2(a: Point, b: Point) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2
+
+
+def _split_outliers(points: List[Point]) -> Tuple[List[int], List[int]]:
+    """(chỉ số điểm thuộc trung tâm, chỉ số điểm ngoại lai) theo khoảng cách tới trung vị toạ độ."""
+    xs = sorted(p[0] for p in points)
+    ys = sorted(p[1] for p in points)
+    median = (xs[len(xs) // 2], ys[len(ys) // 2])
+    d2 = [_d2(p, median) for p in points]
+    limit = sorted(d2)[len(d2) // 2] * OUTLIER_FACTOR ** 2
+    core = [i for i, d in enumerate(d2) if d <= limit]
+    return core, [i for i, d in enumerate(d2) if d > limit]
+
+
+def _init_centers(points: List[Point], k: int) -> List[Point]:
+    cx = sum(p[0] for p in points) / len(points)
+    cy = sum(p[1] for p in points) / len(points)
+    first = min(range(len(points)), key=lambda i: _d2(points[i], (cx, cy)))
+    centers = [points[first]]
+    nearest = [_d2(p, centers[0]) for p in points]
+    while len(centers) < k:
+        far = max(range(len(points)), key=nearest.__getitem__)
+        centers.append(points[far])
+        nearest = [min(d, _d2(p, points[far])) for d, p in zip(nearest, points)]
+    return centers
+
+
+def _assign_balanced(points: List[Point], centers: List[Point], capacity: int) -> List[int]:
+    k = len(centers)
+    dists = [[_d2(p, c) for c in centers] for p in points]
+
+    def regret(i: int) -> float:
+        if k == 1:
+            return 0.0
+        first, second = sorted(dists[i])[:2]
+        return second - first
+
+    labels = [0] * len(points)
+    load = [0] * k
+    for i in sorted(range(len(points)), key=regret, reverse=True):
+        for c in sorted(range(k), key=dists[i].__getitem__):
+            if load[c] < capacity:
+                labels[i] = c
+                load[c] += 1
+                break
+    return labels
+
+
+def balanced_kmeans(points: List[Point], k: int, slack: float = 0.2, iterations: int = 10) -> Tuple[List[int], List[Point]]:
+    """Trả về (nhãn cụm của từng điểm, tâm cụm)."""
+    k = max(1, min(k, len(points)))
+    capacity = math.ceil(len(points) / k * (1 + slack))
+    centers = _init_centers(points, k)
+    labels = _assign_balanced(points, centers, capacity)
+
+    for _ in range(iterations):
+        new_centers = []
+        for c in range(k):
+            members = [p for p, label in zip(points, labels) if label == c]
+            if members:
+                new_centers.append((
+                    sum(p[0] for p in members) / len(members),
+                    sum(p[1] for p in members) / len(members),
+                ))
+            else:
+                new_centers.append(centers[c])
+        new_labels = _assign_balanced(points, new_centers, capacity)
+        centers = new_centers
+        if new_labels == labels:
+            break
+        labels = new_labels
+    return labels, centers
+
+
+def _pool_for_day(
+    spots: List[ItinerarySpot],
+    points: List[Point],
+    members: List[int],
+    center: Point,
+    min_size: int,
+) -> List[ItinerarySpot]:
+    chosen = set(members)
+    if len(chosen) < min_size:
+        # Cụm ít điểm (thành phố nhỏ / lọc tag chặt) => lấy thêm các điểm gần tâm cụm nhất
+        others = sorted(
+            (i for i in range(len(spots)) if i not in chosen),
+            key=lambda i: _d2(points[i], center),
+        )
+        chosen.update(others[:min_size - len(chosen)])
+    return [spots[i] for i in sorted(chosen)]
+
+
+def plan_day_pools(
+    visit_spots: List[ItinerarySpot],
+    food_spots: List[ItinerarySpot],
+    num_days: int,
+    min_visit_pool: int,
+    min_food_pool: int,
+) -> Optional[List[Tuple[List[ItinerarySpot], List[ItinerarySpot]]]]:
+    """
+    [(visit_spots, food_spots)] cho từng ngày, None nếu không đủ dữ liệu để chia
+    (cần ít nhất min_visit_pool địa điểm mỗi ngày sau khi bỏ điểm ngoại lai).
+    Quán ăn không chia theo sức chứa: gán vào tâm gần nhất (vẫn bổ sung cho đủ min_food_pool).
+    Điểm không có toạ độ / ngoại lai được giữ ở mọi ngày.
+    """
+    located = [s for s in visit_spots if s.lat is not None and s.lng is not None]
+    if num_days < 2 or not located:
+        return None
+
+    scale = _lng_scale(located)
+    core, outliers = _split_outliers(_project(located, scale))
+    if len(core) < num_days * min_visit_pool:
+        # Thành phố ít địa điểm: chia ra mỗi ngày quá ít lựa chọn, lịch trình kém hơn => không chia
+        return None
+    unlocated_visits = [located[i] for i in outliers] + [s for s in visit_spots if s.lat is None or s.lng is None]
+    located = [located[i] for i in core]
+    visit_points = _project(located, scale)
+    labels, centers = balanced_kmeans(visit_points, num_days)
+
+    located_foods = [s for s in food_spots if s.lat is not None and s.lng is not None]
+    unlocated_foods = [s for s in food_spots if s.lat is None or s.lng is None]
+    food_points = _project(located_foods, scale)
+    food_labels: List[int] = []
+    if located_foods:
+        food_labels = [
+            min(range(len(centers)), key=lambda c: _d2(p, centers[c])) for p in food_points
+        ]
+
+    pools = []
+    for day, center in enumerate(centers):
+        visits = _pool_for_day(
+            located, visit_points, [i for i, label in enumerate(labels) if label == day], center, min_visit_pool,
+        )
+        foods = _pool_for_day(
+            located_foods, food_points, [i for i, label in enumerate(food_labels) if label == day], center, min_food_pool,
+        ) if located_foods else []
+        pools.append((visits + unlocated_visits, foods + unlocated_foods))
+    return pools
@@ -3,12 +3,21 @@ from typing import List, Set, Optional, Tuple , Dict
 from datetime import timedelta
 from app.domain.entities.nightstay import NightStay
 from app.utils.tag_utils import apply_tag_filter, tag_score
+from app.utils.tag_vocab import count_common
 from app.application.itinerary.trip_context import TripContext, UserPreferences
 from app.utils.geo_utils import haversine_km, estimate_travel_minutes
 from app.utils.time_utils import min_to_time_str
 from app.domain.entities.itinerary_spot import ItinerarySpot
 from app.api.schemas.itinerary_request import ItineraryRequest
-from app.config.setting import IMAGE_BASE_URL
+from app.config.setting import (
+    IMAGE_BASE_URL,
+    ROUTE_OPT_TIME_BUDGET_MS,
+    DAY_CLUSTERING_ENABLED,
+    DAY_CLUSTER_MIN_VISIT_SPOTS,
+    DAY_CLUSTER_MIN_FOOD_SPOTS,
+)
+from app.application.itinerary.route_optimizer import optimize_day_route
+from app.application.itinerary.day_clustering import plan_day_pools
 from app.api.schemas.itinerary_response import DayItineraryResponse, BlockItemResponse, CostSummaryResponse
 from app.application.ai.hybrid import HybridRecommender, HybridConfig
 from app.application.itinerary.trip_context import UserPreferences
@@ -42,7 +51,8 @@ def calculate_spot_weight(
     selected_spots: List[ItinerarySpot] = None,
     distance_from_prev: float = 0.0,
     max_leg_km: float = 5.0,
-    randomness: float = 0.5
+    randomness: float = 0.5,
+    rng=random,
 ) -> float:
     """
     Tính trọng số cho địa điểm với yếu tố:
@@ -66,11 +76,8 @@ def calculate_spot_weight(
     
     # tính điểm dựa trên tag của người dùng (rule_based khác với cái ai)
     t_score = 0.0
-    if prefs:
-        spot_tags = set(getattr(spot, 'tags', None) or [])
-        pref_tags = set(getattr(prefs, 'tags', None) or getattr(prefs, 'preferred_tags', None) or [])
-        if spot_tags and pref_tags:
-            t_score = len(spot_tags & pref_tags) / max(len(pref_tags), 1)
+    if prefs and prefs.preferred_mask:
+        t_score = count_common(spot.tag_mask, prefs.preferred_mask) / max(prefs.preferred_count, 1)
     
     # Lọc địa điểm phải đi (Chưa sài đâu)
     must_bonus = 2.0 if spot.id in must_ids else 0.0
@@ -114,7 +121,7 @@ def calculate_spot_weight(
         )
     
     # random ngẫu nhiên để tăng tính đa dạng các địa điểm
-    random_factor = random.uniform(1 - randomness, 1 + randomness)
+    random_factor = rng.uniform(1 - randomness, 1 + randomness)
     
     return deterministic_score * random_factor
 
@@ -126,7 +133,8 @@ def sort_spots_diverse(
     selected_in_trip: List[ItinerarySpot] = None,
     anchor_spot: ItinerarySpot = None,
     max_leg_km: float = 5.0,
-    randomness: float = 0.5
+    randomness: float = 0.5,
+    rng=random,
 ) -> list[ItinerarySpot]:
     """
     Sắp xếp địa điểm với:
@@ -155,7 +163,8 @@ def sort_spots_diverse(
             selected_spots=selected_in_trip,
             distance_from_prev=dist,
             max_leg_km=max_leg_km,
-            randomness=randomness
+            randomness=randomness,
+            rng=rng,
         )
         weighted.append((spot, weight))
     
@@ -184,11 +193,8 @@ def visit_sort_key(spot: ItinerarySpot, prefs: UserPreferences, must_ids, use_ai
     
     # Tính tag_score như cũ
     t_score = 0
-    if prefs:
-        spot_tags = set(getattr(spot, 'tags', None) or [])
-        pref_tags = set(getattr(prefs, 'tags', None) or getattr(prefs, 'preferred_tags', None) or [])
-        if spot_tags and pref_tags:
-            t_score = len(spot_tags & pref_tags)
+    if prefs and prefs.preferred_mask:
+        t_score = count_common(spot.tag_mask, prefs.preferred_mask)
     
     return (
         1 if spot.id in must_ids else 0,
@@ -358,7 +364,8 @@ def pick_meal_block(
         selected_in_trip=selected_in_trip,
         anchor_spot=anchor,
         max_leg_km=context.max_leg_distance_km,
-        randomness=0.5
+        randomness=0.5,
+        rng=context.rng,
     )
     if not sorted_foods:
         return items, None
@@ -402,7 +409,7 @@ def pick_meal_block(
         return items, None
 
     # Chọn ngẫu nhiên từ top 3 valid (đã được sort theo weight)
-    chosen = random.choice(valid_foods[:min(3, len(valid_foods))])
+    chosen = context.rng.choice(valid_foods[:min(3, len(valid_foods))])
     food_spot = chosen['spot']
     
     start_min = block_start_min + chosen['travel_min']
@@ -536,6 +543,7 @@ def build_visit_block(
         anchor_spot=anchor_spot,
         max_leg_km=max_leg_km,
         randomness=0.5,
+        rng=context.rng,
     )
 
     # Pool động (xóa dần các spot đã chọn)
@@ -662,7 +670,7 @@ def build_visit_block(
                 score += 15.0
 
             # Thêm random factor để tăng đa dạng (±30%)
-            random_factor = random.uniform(0.7, 1.3)
+            random_factor = context.rng.uniform(0.7, 1.3)
             score *= random_factor
 
             # Thu thập candidate
@@ -691,7 +699,7 @@ def build_visit_block(
         # Sort theo score và chọn random từ top N
         top_candidates.sort(key=lambda x: x["score"], reverse=True)
         top_n = min(5, len(top_candidates))  # Lấy top 5 hoặc ít hơn
-        best = random.choice(top_candidates[:top_n])
+        best = context.rng.choice(top_candidates[:top_n])
 
         chosen = best["spot"]
         item = BlockItem(
@@ -952,6 +960,20 @@ def build_day_itinerary(
             if spot:
                 selected_today.append(spot)
 
+    # === TỐI ƯU THỨ TỰ THAM QUAN TRONG BLOCK (2-opt / or-opt, giữ nguyên bữa trưa / tối) ===
+    if context.optimize_route:
+        optimize_day_route(
+            [
+                ("morning", morning_items, context.morning_start, context.morning_end),
+                ("lunch", lunch_items, context.lunch_start, context.lunch_end),
+                ("afternoon", afternoon_items, context.afternoon_start, context.afternoon_end),
+                ("dinner", dinner_items, context.dinner_start, context.dinner_end),
+                ("evening", evening_items, context.evening_start, context.evening_end),
+            ],
+            windows={s.id: (s.open_time_min, s.close_time_min) for s in selected_today},
+            budget_ms=ROUTE_OPT_TIME_BUDGET_MS,
+        )
+
     # === TÍNH CHI PHÍ ===
     all_items = morning_items + lunch_items + afternoon_items + dinner_items + evening_items
     
@@ -992,13 +1014,48 @@ def build_trip_itinerary(
     Xây dựng lịch trình cho toàn bộ chuyến đi nhiều ngày.
     Không lặp lại cùng 1 địa điểm (theo name) ở các NGÀY KHÁC NHAU.
     """
+    day_pools = prepare_trip(req, visit_spots, food_spots)
+    return build_trip_from_pools(req, visit_spots, food_spots, day_pools)
+
+""" Phần chuẩn bị dùng chung cho mọi phương án lịch trình của 1 request """
+def prepare_trip(
+    req: ItineraryRequest,
+    visit_spots: list[ItinerarySpot],
+    food_spots: list[ItinerarySpot],
+):
+    """
+    - Preload AI score cho tất cả spots (1 lần)
+    - Chia địa điểm thành num_days cụm gần nhau (xác định, không random)
+    Trả về day_pools (None = mỗi ngày dùng toàn bộ địa điểm).
+    """
     preferred_tags = req.preferred_tags
             
     if preferred_tags:
         # Preload scores cho tất cả spots
         all_spots = visit_spots + food_spots
         preload_ai_scores(all_spots, preferred_tags)
-    
+
+    """ Chia địa điểm thành num_days cụm gần nhau, mỗi ngày lập lịch trong cụm của mình """
+    day_pools = None
+    if DAY_CLUSTERING_ENABLED if req.cluster_days is None else req.cluster_days:
+        day_pools = plan_day_pools(
+            visit_spots,
+            food_spots,
+            req.num_days,
+            min_visit_pool=DAY_CLUSTER_MIN_VISIT_SPOTS,
+            min_food_pool=DAY_CLUSTER_MIN_FOOD_SPOTS,
+        )
+    return day_pools
+
+""" Build 1 phương án lịch trình (phần có random) từ kết quả prepare_trip """
+def build_trip_from_pools(
+    req: ItineraryRequest,
+    visit_spots: list[ItinerarySpot],
+    food_spots: list[ItinerarySpot],
+    day_pools,
+    rng=random,
+) -> dict:
+    """rng: nguồn random của phương án (random.Random(seed)), mặc định random toàn cục."""
     days: List[DayItineraryResponse] = []
 
     """ Theo dõi tên địa điểm đã dùng để tránh lặp lại giữa các ngày """
@@ -1012,14 +1069,17 @@ def build_trip_itinerary(
 
         context = TripContext.from_request(req)
         context.date = date_i
+        context.rng = rng
+
+        day_visit_spots, day_food_spots = day_pools[i] if day_pools else (visit_spots, food_spots)
 
         # Lọc địa điểm chưa dùng
         filtered_visit_spots = [
-            s for s in visit_spots
+            s for s in day_visit_spots
             if getattr(s, "name", None) not in used_visit_names
         ]
         filtered_food_spots = [
-            s for s in food_spots
+            s for s in day_food_spots
             if getattr(s, "name", None) not in used_food_names
         ]
 
@@ -1096,17 +1156,28 @@ def get_ai_score(place_id: int, preferred_tags: List[str]) -> float:
     """Lấy AI score cho 1 địa điểm."""
     global _ai_scores_cache
     
-    if not is_ai_ready():
-        return 0.0
-    
+    # Tra cache trước: process con của trip_variants không có recommender, chỉ có score được gửi sang
     cache_key = f"{place_id}:{','.join(sorted(preferred_tags))}"
     if cache_key in _ai_scores_cache:
         return _ai_scores_cache[cache_key]
     
+    if not is_ai_ready():
+        return 0.0
+    
     score = _ai_recommender.get_place_score(place_id, preferred_tags)
     _ai_scores_cache[cache_key] = score
     return score
 
+""" AI score đã tính của các spots (để chuyển sang process khác) """
+def get_cached_ai_scores(spots: list, preferred_tags: List[str]) -> Dict[str, float]:
+    suffix = ','.join(sorted(preferred_tags or []))
+    keys = (f"{s.id}:{suffix}" for s in spots)
+    return {k: _ai_scores_cache[k] for k in keys if k in _ai_scores_cache}
+
+""" Nạp AI score tính sẵn (process con của trip_variants) """
+def seed_ai_scores(scores: Dict[str, float]):
+    _ai_scores_cache.update(scores)
+
 """ Xóa cache AI scores """
 def clear_ai_cache():
     """Xóa cache AI scores."""
@@ -0,0 +1,182 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.utils.geo_utils import haversine_km, estimate_travel_minutes
+
+
+"""
+Tối ưu thứ tự tham quan trong từng block sau khi build_visit_block (greedy có random) đã chọn xong địa điểm:
+- 2-opt (đảo 1 đoạn) và or-opt (dời 1 đoạn 1-3 điểm sang chỗ khác) để giảm tổng km di chuyển
+- 2 đầu của block cố định: điểm ngay trước (vd quán ăn trưa) và điểm ngay sau (vd quán ăn tối, giờ đến không đổi)
+- khoảng cách tính sẵn 1 lần thành ma trận => mỗi nước đi tính chênh lệch O(1),
+  chỉ nước đi làm giảm km mới kiểm tra giờ mở / đóng cửa và giờ kết thúc block (O(số điểm))
+- dừng khi hết thời gian cho phép (budget) hoặc không cải thiện được nữa
+"""
+
+# Giống build_visit_block: chờ mở cửa tối đa 45 phút
+MAX_WAIT_MIN = 45
+EPS_KM = 1e-6
+
+# (giờ mở, giờ đóng) theo phút trong ngày
+Window = Tuple[int, int]
+
+
+class _Block:
+    """Ma trận khoảng cách / thời gian cho 1 block: node 0 = điểm trước, 1..n = các item, n+1 = điểm sau."""
+
+    def __init__(self, items, prev_item, next_item, free_at: int, block_end: int, windows: Dict[int, Window]):
+        self.items = items
+        self.n = len(items)
+        self.free_at = free_at
+        self.block_end = block_end
+        self.next_start = next_item.start_min if next_item is not None else None
+
+        points = [prev_item] + list(items) + [next_item]
+        size = self.n + 2
+        self.dist = [[0.0] * size for _ in range(size)]
+        self.travel = [[0] * size for _ in range(size)]
+        for a in range(size):
+            for b in range(a + 1, size):
+                pa, pb = points[a], points[b]
+                if pa is None or pb is None or None in (pa.lat, pa.lng, pb.lat, pb.lng):
+                    continue    # không có điểm trước / sau => chặng ảo, bằng 0
+                d = haversine_km(pa.lat, pa.lng, pb.lat, pb.lng)
+                self.dist[a][b] = self.dist[b][a] = d
+                self.travel[a][b] = self.travel[b][a] = estimate_travel_minutes(d)
+
+        self.windows = []
+        for item in items:
+            open_min, close_min = windows.get(item.place_id, (None, None))
+            self.windows.append((
+                open_min if open_min is not None else 0,
+                close_min if close_min is not None else 1439,
+            ))
+
+    def route_km(self, perm: Sequence[int]) -> float:
+        route = [0, *perm, self.n + 1]
+        return sum(self.dist[a][b] for a, b in zip(route, route[1:]))
+
+    def schedule(self, perm: Sequence[int]) -> Optional[List[Tuple[int, int]]]:
+        """(start, end) của từng item theo thứ tự perm, None nếu vi phạm giờ mở cửa / block / điểm sau."""
+        t, prev, times = self.free_at, 0, []
+        for node in perm:
+            item = self.items[node - 1]
+            open_min, close_min = self.windows[node - 1]
+            arrive = t + self.travel[prev][node]
+            start = max(arrive, open_min)
+            end = start + item.dwell_min
+            if start - arrive > MAX_WAIT_MIN or end > min(close_min, self.block_end):
+                return None
+            times.append((start, end))
+            t, prev = end, node
+        if self.next_start is not None and t + self.travel[prev][self.n + 1] > self.next_start:
+            return None
+        return times
+
+
+def _improve(block: _Block, perm: List[int], deadline: float) -> Tuple[List[int], List[Tuple[int, int]]]:
+    dist, n = block.dist, block.n
+    times = block.schedule(perm)
+    if times is None:
+        return perm, None
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        route = [0, *perm, n + 1]
+
+        # 2-opt: đảo đoạn route[i..j]
+        for i in range(1, n):
+            for j in range(i + 1, n + 1):
+                a, b, c, d = route[i - 1], route[i], route[j], route[j + 1]
+                delta = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if delta < -EPS_KM:
+                    cand = perm[:i - 1] + perm[i - 1:j][::-1] + perm[j:]
+                    cand_times = block.schedule(cand)
+                    if cand_times is not None:
+                        perm, times, improved = cand, cand_times, True
+                        break
+            if improved:
+                break
+        if improved:
+            continue
+
+        # or-opt: dời đoạn route[i..i+L-1] vào giữa route[p] và route[p+1]
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 2):
+                s0, s1 = route[i], route[i + length - 1]
+                a, b = route[i - 1], route[i + length]
+                removed = dist[a][s0] + dist[s1][b] - dist[a][b]
+                for p in range(0, n + 1):
+                    if i - 1 <= p <= i + length - 1:
+                        continue
+                    x, y = route[p], route[p + 1]
+                    delta = dist[x][s0] + dist[s1][y] - dist[x][y] - removed
+                    if delta < -EPS_KM:
+                        segment = route[i:i + length]
+                        rest = route[:i] + route[i + length:]
+                        pos = p + 1 if p < i else p + 1 - length
+                        cand = (rest[:pos] + segment + rest[pos:])[1:-1]
+                        cand_times = block.schedule(cand)
+                        if cand_times is not None:
+                            perm, times, improved = cand, cand_times, True
+                            break
+                if improved:
+                    break
+            if improved:
+                break
+
+    return perm, times
+
+
+def optimize_day_route(
+    blocks: List[Tuple[str, List, int, Optional[int]]],
+    windows: Dict[int, Window],
+    budget_ms: float,
+) -> Dict[str, float]:
+    """
+    blocks: [(tên block, items, giờ bắt đầu block, giờ kết thúc block)] theo thứ tự trong ngày.
+    Chỉ đổi thứ tự các item "visit" trong từng block (sửa tại chỗ start/end/order/khoảng cách),
+    item đầu của block sau được cập nhật lại khoảng cách từ điểm cuối mới.
+    Trả về km trước / sau để đo hiệu quả.
+    """
+    deadline = time.perf_counter() + budget_ms / 1000.0
+    non_empty = [b for b in blocks if b[1]]
+    km_before = km_after = 0.0
+    prev_item = None
+
+    for idx, (_, items, block_start, block_end) in enumerate(non_empty):
+        next_item = non_empty[idx + 1][1][0] if idx + 1 < len(non_empty) else None
+        visit_block = all(it.type == "visit" for it in items) and block_end is not None
+
+        if visit_block:
+            free_at = prev_item.end_min if prev_item is not None else block_start
+            block = _Block(items, prev_item, next_item, free_at, block_end, windows)
+            perm = list(range(1, block.n + 1))
+            before = block.route_km(perm)
+            km_before += before
+
+            new_perm, times = perm, None
+            if block.n >= 2 and time.perf_counter() < deadline:
+                new_perm, times = _improve(block, perm, deadline)
+
+            if times is not None and new_perm != perm:
+                km_after += block.route_km(new_perm)
+                reordered = [items[node - 1] for node in new_perm]
+                prev_node = 0
+                for order, (node, item, (start, end)) in enumerate(zip(new_perm, reordered, times), start=1):
+                    item.order = order
+                    item.start_min, item.end_min = start, end
+                    item.distance_from_prev_km = round(block.dist[prev_node][node], 2)
+                    item.travel_from_prev_min = block.travel[prev_node][node]
+                    prev_node = node
+                items[:] = reordered
+                if next_item is not None and prev_node and block.dist[prev_node][block.n + 1]:
+                    next_item.distance_from_prev_km = round(block.dist[prev_node][block.n + 1], 2)
+                    next_item.travel_from_prev_min = block.travel[prev_node][block.n + 1]
+            else:
+                km_after += before
+
+        prev_item = items[-1]
+
+    return {"km_before": round(km_before, 3), "km_after": round(km_after, 3)}
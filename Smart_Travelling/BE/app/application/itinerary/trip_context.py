@@ -1,11 +1,14 @@
-from dataclasses import dataclass
+import random
+from dataclasses import dataclass, field
 from datetime import date
 from typing import List, Optional   
 from app.api.schemas.itinerary_request import ItineraryRequest
 from app.utils.time_utils import time_to_min
+from app.utils import tag_vocab
 from app.config.setting import (
     MAX_PLACES_PER_BLOCK_DEFAULT,
     MAX_LEG_DISTANCE_KM_DEFAULT,
+    ROUTE_OPT_ENABLED,
 )
 """ tag cho địa điểm """
 @dataclass
@@ -13,6 +16,19 @@ class UserPreferences:
     preferred_tags: List[str]
     avoid_tags: List[str]
 
+    # Bitset theo tag_vocab, tính 1 lần cho cả request.
+    # Chỉ tra (lookup_mask), không thêm tag của request vào vocab dùng chung (không bao giờ bị xóa):
+    # spot đã đăng ký tag của nó lúc tạo ItinerarySpot, tag không spot nào có thì đằng nào cũng không khớp
+    preferred_mask: int = field(init=False, default=0)
+    avoid_mask: int = field(init=False, default=0)
+    # Số tag sở thích khác nhau (kể cả tag không spot nào có) để chuẩn hóa điểm
+    preferred_count: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.preferred_mask = tag_vocab.lookup_mask(self.preferred_tags)
+        self.avoid_mask = tag_vocab.lookup_mask(self.avoid_tags)
+        self.preferred_count = len(set(self.preferred_tags or []))
+
 @dataclass
 class TripContext:
     city: str
@@ -39,6 +55,12 @@ class TripContext:
     preferences: Optional[UserPreferences]
     must_visit_place_ids: List[int]
     avoid_place_ids: List[int]
+
+    """ Tối ưu thứ tự tham quan trong block sau khi chọn (route_optimizer) """
+    optimize_route: bool = False
+
+    """ Nguồn random khi chọn địa điểm (mỗi phương án 1 random.Random(seed) riêng) """
+    rng: random.Random = field(default=random, repr=False)
     
 
     """ Tạo TripContext từ ItineraryRequest """
@@ -84,4 +106,5 @@ class TripContext:
             preferences=prefs,
             must_visit_place_ids=req.must_visit_place_ids,
             avoid_place_ids=req.avoid_place_ids,
+            optimize_route=ROUTE_OPT_ENABLED if req.optimize_route is None else req.optimize_route,
         )
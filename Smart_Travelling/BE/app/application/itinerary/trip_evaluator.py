@@ -0,0 +1,224 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.entities.itinerary_spot import ItinerarySpot
+from app.utils.tag_vocab import lookup_mask
+
+
+"""
+Đánh giá chất lượng lịch trình đã build (dict trả về của build_trip_itinerary), chạy theo lô:
+- duyệt item của tất cả trip 1 lần để trải phẳng ra mảng numpy (trip, ngày, spot, giờ, km, toạ độ...)
+- mọi chỉ số tính bằng phép toán mảng + np.bincount theo trip => vài nghìn trip / giây
+- spot (giờ mở cửa, rating, tag) được tra qua bảng dựng sẵn 1 lần cho city (TripEvaluator)
+Dùng để xếp hạng phương án (trip_variants), test hồi quy và báo cáo benchmark.
+
+Chỉ số mỗi trip:
+    visits / meals          số điểm tham quan / bữa ăn xếp được
+    travel_km / travel_min  tổng quãng đường / thời gian di chuyển
+    idle_min                tổng thời gian chờ giữa 2 item liên tiếp trong ngày (trừ di chuyển)
+    hour_violations         số item nằm ngoài giờ mở cửa của spot
+    tag_coverage            tỉ lệ preferred_tags có ít nhất 1 điểm tham quan khớp (không có tag => 1)
+    tag_hits                tổng số tag khớp trên các điểm tham quan
+    rating_mean / low_rating_ratio   rating trung bình / tỉ lệ điểm rating < LOW_RATING
+    cost_vnd                tổng chi phí (cost_summary từng ngày, giống trip_router)
+    repeated_area_ratio     tỉ lệ điểm tham quan nằm trong ô lưới đã đi ở ngày trước đó
+"""
+
+LOW_RATING = 4.0
+AREA_CELL_DEG = 0.01        # ~1.1 km
+
+W_VISIT = 10.0
+W_MEAL = 6.0
+W_RATING = 2.0              # mỗi sao của mỗi điểm tham quan
+W_TAG = 4.0                 # mỗi tag khớp
+W_TRAVEL = 0.3              # mỗi phút di chuyển
+W_IDLE = 0.05               # mỗi phút chờ
+W_VIOLATION = 15.0          # mỗi item ngoài giờ mở cửa
+W_REPEAT_AREA = 20.0        # nhân với repeated_area_ratio
+
+METRICS = (
+    "visits", "meals", "travel_km", "travel_min", "idle_min", "hour_violations",
+    "tag_coverage", "tag_hits", "rating_mean", "low_rating_ratio", "cost_vnd", "repeated_area_ratio",
+)
+
+
+def _minutes(hhmm: str) -> int:
+    hour, minute = hhmm.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+class TripEvaluator:
+    """Bảng spot của 1 city (visit + food) và tag người dùng, dựng 1 lần rồi đánh giá nhiều trip."""
+
+    def __init__(
+        self,
+        visit_spots: Sequence[ItinerarySpot],
+        food_spots: Sequence[ItinerarySpot] = (),
+        preferred_tags: Optional[List[str]] = None,
+    ):
+        spots = list(visit_spots) + list(food_spots)
+        self._visit_index = {s.id: i for i, s in enumerate(visit_spots) if s.id is not None}
+        self._food_index = {s.id: len(visit_spots) + i for i, s in enumerate(food_spots) if s.id is not None}
+
+        open_min = np.array([s.open_time_min if s.open_time_min is not None else 0 for s in spots], dtype=np.int32)
+        close_min = np.array([s.close_time_min if s.close_time_min is not None else 1440 for s in spots], dtype=np.int32)
+        # Đóng cửa sau nửa đêm (vd 18:00 - 02:00)
+        self._open = open_min
+        self._close = np.where(close_min <= open_min, close_min + 1440, close_min)
+        self._rating = np.array([s.rating if s.rating is not None else np.nan for s in spots], dtype=np.float64)
+
+        mask = lookup_mask(preferred_tags)
+        bits = [b for b in range(mask.bit_length()) if mask >> b & 1]
+        self._num_tags = len(bits)
+        # spot x preferred tag (0/1)
+        self._spot_tags = np.array(
+            [[s.tag_mask >> b & 1 for b in bits] for s in spots], dtype=np.int32,
+        ).reshape(len(spots), len(bits))
+
+    def _flatten(self, trips: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        trip_idx, day_idx, spot_idx, is_visit = [], [], [], []
+        start, end, travel_min, travel_km, lat, lng = [], [], [], [], [], []
+        cost = np.zeros(len(trips), dtype=np.float64)
+
+        day_no = 0
+        for t, trip in enumerate(trips):
+            for day in trip.get("days") or []:
+                summary = day.get("cost_summary") or {}
+                cost[t] += summary.get("total_trip_cost_vnd", summary.get("total_attraction_cost_vnd", 0)) or 0
+                for items in (day.get("blocks") or {}).values():
+                    for item in items or []:
+                        visit = item.get("type") != "eat"
+                        index = self._visit_index if visit else self._food_index
+                        trip_idx.append(t)
+                        day_idx.append(day_no)
+                        spot_idx.append(index.get(item.get("place_id"), -1))
+                        is_visit.append(visit)
+                        start.append(_minutes(item["start"]))
+                        end.append(_minutes(item["end"]))
+                        travel_min.append(item.get("travel_from_prev_min") or 0)
+                        travel_km.append(item.get("distance_from_prev_km") or 0.0)
+                        lat.append(item["lat"] if item.get("lat") is not None else np.nan)
+                        lng.append(item["lng"] if item.get("lng") is not None else np.nan)
+                day_no += 1
+
+        return {
+            "trip": np.array(trip_idx, dtype=np.int64),
+            "day": np.array(day_idx, dtype=np.int64),
+            "spot": np.array(spot_idx, dtype=np.int64),
+            "visit": np.array(is_visit, dtype=bool),
+            "start": np.array(start, dtype=np.int32),
+            "end": np.array(end, dtype=np.int32),
+            "travel_min": np.array(travel_min, dtype=np.float64),
+            "travel_km": np.array(travel_km, dtype=np.float64),
+            "lat": np.array(lat, dtype=np.float64),
+            "lng": np.array(lng, dtype=np.float64),
+            "cost": cost,
+        }
+
+    def evaluate(self, trips: Sequence[Dict]) -> Dict[str, np.ndarray]:
+        """{tên chỉ số: mảng độ dài len(trips)} (xem METRICS)."""
+        n = len(trips)
+        f = self._flatten(trips)
+        trip, day, spot, visit = f["trip"], f["day"], f["spot"], f["visit"]
+
+        def per_trip(weights=None, where=None) -> np.ndarray:
+            idx = trip if where is None else trip[where]
+            w = weights if where is None or weights is None else weights[where]
+            return np.bincount(idx, weights=w, minlength=n).astype(np.float64)
+
+        visits = per_trip(where=visit)
+        meals = per_trip(where=~visit)
+
+        # Chờ giữa 2 item liên tiếp cùng ngày: giờ bắt đầu - giờ kết thúc item trước - di chuyển
+        same_day = np.zeros(len(day), dtype=bool)
+        same_day[1:] = day[1:] == day[:-1]
+        gap = np.zeros(len(day), dtype=np.float64)
+        gap[1:] = f["start"][1:] - f["end"][:-1] - f["travel_min"][1:]
+        idle = per_trip(np.clip(gap, 0, None), same_day)
+
+        known = spot >= 0
+        known_spot = spot[known]
+        start, end = f["start"][known], f["end"][known]
+        violation = np.zeros(len(spot), dtype=bool)
+        violation[known] = (start < self._open[known_spot]) | (end > self._close[known_spot])
+
+        rating = np.full(len(spot), np.nan)
+        rating[known] = self._rating[known_spot]
+        rated = visit & ~np.isnan(rating)
+        rated_count = per_trip(where=rated)
+        rating_sum = per_trip(np.nan_to_num(rating), rated)
+        low_count = per_trip(where=rated & (rating < LOW_RATING))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rating_mean = np.where(rated_count > 0, rating_sum / rated_count, 0.0)
+            low_ratio = np.where(rated_count > 0, low_count / rated_count, 0.0)
+
+        tag_hits = np.zeros(n)
+        tag_coverage = np.ones(n)
+        if self._num_tags:
+            matched = visit & known
+            hits = np.zeros((n, self._num_tags), dtype=np.int64)
+            np.add.at(hits, trip[matched], self._spot_tags[spot[matched]])
+            tag_hits = hits.sum(axis=1).astype(np.float64)
+            tag_coverage = (hits > 0).sum(axis=1) / self._num_tags
+
+        return {
+            "visits": visits,
+            "meals": meals,
+            "travel_km": per_trip(f["travel_km"]),
+            "travel_min": per_trip(f["travel_min"]),
+            "idle_min": idle,
+            "hour_violations": per_trip(where=violation),
+            "tag_coverage": tag_coverage,
+            "tag_hits": tag_hits,
+            "rating_mean": rating_mean,
+            "low_rating_ratio": low_ratio,
+            "cost_vnd": f["cost"],
+            "repeated_area_ratio": self._repeated_area_ratio(f, n, visits),
+        }
+
+    @staticmethod
+    def _repeated_area_ratio(f: Dict[str, np.ndarray], n: int, visits: np.ndarray) -> np.ndarray:
+        """Điểm tham quan trong ô lưới mà trip đã đi ở 1 ngày trước đó / tổng điểm tham quan."""
+        located = f["visit"] & ~np.isnan(f["lat"]) & ~np.isnan(f["lng"])
+        trip, day = f["trip"][located], f["day"][located]
+        if not len(trip):
+            return np.zeros(n)
+        cell_y = np.floor(f["lat"][located] / AREA_CELL_DEG).astype(np.int64)
+        cell_x = np.floor(f["lng"][located] / AREA_CELL_DEG).astype(np.int64)
+
+        # Nhóm theo (trip, ô), trong nhóm sắp theo ngày => ngày đầu tiên của nhóm là phần tử đầu
+        order = np.lexsort((day, cell_x, cell_y, trip))
+        trip, day, cell_y, cell_x = trip[order], day[order], cell_y[order], cell_x[order]
+        new_group = np.ones(len(trip), dtype=bool)
+        new_group[1:] = (trip[1:] != trip[:-1]) | (cell_y[1:] != cell_y[:-1]) | (cell_x[1:] != cell_x[:-1])
+        group_first_day = day[new_group][np.cumsum(new_group) - 1]
+        repeated = np.bincount(trip[day > group_first_day], minlength=n).astype(np.float64)
+        return np.where(visits > 0, repeated / np.maximum(visits, 1), 0.0)
+
+    def scores(self, trips: Sequence[Dict], metrics: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        m = metrics if metrics is not None else self.evaluate(trips)
+        score = (
+            W_VISIT * m["visits"]
+            + W_MEAL * m["meals"]
+            + W_RATING * m["rating_mean"] * m["visits"]
+            + W_TAG * m["tag_hits"]
+            - W_TRAVEL * m["travel_min"]
+            - W_IDLE * m["idle_min"]
+            - W_VIOLATION * m["hour_violations"]
+            - W_REPEAT_AREA * m["repeated_area_ratio"]
+        )
+        return np.round(score, 2)
+
+
+def rank_trips(
+    trips: Iterable[Dict],
+    visit_spots: Sequence[ItinerarySpot],
+    food_spots: Sequence[ItinerarySpot] = (),
+    preferred_tags: Optional[List[str]] = None,
+) -> List[Tuple[float, Dict]]:
+    """[(điểm, trip)] sắp giảm dần theo điểm (cùng điểm giữ thứ tự build)."""
+    trips = list(trips)
+    scores = TripEvaluator(visit_spots, food_spots, preferred_tags).scores(trips)
+    order = np.argsort(-scores, kind="stable")
+    return [(float(scores[i]), trips[i]) for i in order]
@@ -0,0 +1,91 @@
+import multiprocessing
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.api.schemas.itinerary_request import ItineraryRequest
+from app.application.itinerary.itineray_engine import (
+    build_trip_from_pools,
+    get_cached_ai_scores,
+    prepare_trip,
+    seed_ai_scores,
+)
+from app.config.setting import ITINERARY_VARIANT_PROCESSES
+from app.domain.entities.itinerary_spot import ItinerarySpot
+from app.utils import tag_vocab
+
+
+"""
+Build N phương án lịch trình cho cùng 1 request:
+- phần xác định làm 1 lần: catalog -> spots (trip_service), AI score, chia cụm theo ngày (prepare_trip)
+- mỗi phương án chỉ chạy phần greedy có random, với random.Random(seed) riêng (seed lấy từ random
+  toàn cục => random.seed cố định thì kết quả vẫn lặp lại được, không đụng tới random toàn cục)
+- tùy chọn chạy song song trong process pool (spawn: không fork process đang có thread của server),
+  mỗi task gửi kèm tag vocab (để bitset tag của spot / sở thích cùng id) và AI score của request
+  (process con không có AI recommender)
+"""
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(processes: int) -> ProcessPoolExecutor:
+    """Pool dùng chung, tạo lúc cần."""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None and _pool_size != processes:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = processes
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _build_variant(
+    req: ItineraryRequest,
+    visit_spots: List[ItinerarySpot],
+    food_spots: List[ItinerarySpot],
+    day_pools,
+    seed: int,
+    ai_scores: Optional[Dict[str, float]] = None,
+    vocab: Optional[List[str]] = None,
+) -> dict:
+    if vocab:
+        tag_vocab.register_tags(vocab)
+    if ai_scores:
+        seed_ai_scores(ai_scores)
+    return build_trip_from_pools(req, visit_spots, food_spots, day_pools, random.Random(seed))
+
+
+def build_trip_variants(
+    req: ItineraryRequest,
+    visit_spots: List[ItinerarySpot],
+    food_spots: List[ItinerarySpot],
+    n: int,
+    processes: int = ITINERARY_VARIANT_PROCESSES,
+) -> List[dict]:
+    day_pools = prepare_trip(req, visit_spots, food_spots)
+    seeds = [random.getrandbits(64) for _ in range(n)]
+
+    if processes > 1 and n > 1:
+        pool = _get_pool(processes)
+        ai_scores = get_cached_ai_scores(visit_spots + food_spots, req.preferred_tags) if req.preferred_tags else None
+        vocab = tag_vocab.snapshot()
+        futures = [
+            pool.submit(_build_variant, req, visit_spots, food_spots, day_pools, seed, ai_scores, vocab)
+            for seed in seeds
+        ]
+        return [f.result() for f in futures]
+
+    return [_build_variant(req, visit_spots, food_spots, day_pools, seed) for seed in seeds]
@@ -0,0 +1,15 @@
+from .search_index import SearchIndex, SearchDocument, SearchHit, tokenize, trigrams
+from .suggest_index import SuggestIndex, Suggestion
+from .tag_registry import TagRegistry, TagStats
+
+__all__ = [
+    "SearchIndex",
+    "SearchDocument",
+    "SearchHit",
+    "tokenize",
+    "trigrams",
+    "SuggestIndex",
+    "Suggestion",
+    "TagRegistry",
+    "TagStats",
+]
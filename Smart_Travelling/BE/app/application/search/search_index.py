@@ -0,0 +1,168 @@
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.utils.normalize_text import normalize_text
+from app.utils.city_registry import canonical_city_key
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Bỏ dấu + chữ thường rồi tách thành các token chữ/số."""
+    return _TOKEN_RE.findall(normalize_text(text or ""))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Tạo tập trigram từ chuỗi đã chuẩn hóa (có đệm khoảng trắng 2 đầu)."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class SearchDocument:
+    """1 bản ghi được index: địa điểm tham quan, quán ăn hoặc sự kiện"""
+    kind: str                   # "place" | "food" | "event"
+    id: Optional[int]
+    name: str
+    city: Optional[str] = None
+    region: Optional[str] = None
+    popularity: float = 0.0
+    ref: Any = None             # entity gốc (PlaceLite / FoodPlace / Event)
+
+    name_norm: str = field(default="", init=False)
+    city_norm: str = field(default="", init=False)
+
+    def __post_init__(self):
+        self.name_norm = " ".join(tokenize(self.name))
+        self.city_norm = canonical_city_key(self.city)
+
+
+@dataclass
+class SearchHit:
+    doc: SearchDocument
+    score: float
+
+
+class SearchIndex:
+    """
+    Index tìm kiếm không dấu trong bộ nhớ cho places, food và events.
+
+    - Token (đã bỏ dấu) của tên  -> khớp chính xác / khớp tiền tố
+    - Token của city / region    -> khớp ngữ cảnh (điểm thấp hơn)
+    - Trigram của tên            -> khớp gần đúng khi gõ sai / thiếu chữ
+
+    Mỗi truy vấn chỉ duyệt các posting list của token / trigram trong câu tìm kiếm,
+    nên độ trễ không phụ thuộc vào kích thước bảng.
+    """
+
+    EXACT_WEIGHT = 3.0
+    PREFIX_WEIGHT = 2.0
+    CONTEXT_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 2.0
+    POPULARITY_WEIGHT = 0.5
+    MIN_TRIGRAM_SIMILARITY = 0.35
+
+    def __init__(self, documents: Iterable[SearchDocument] = ()):
+        self.docs: List[SearchDocument] = []
+        self.name_postings: Dict[str, Set[int]] = {}
+        self.context_postings: Dict[str, Set[int]] = {}
+        self.trigram_postings: Dict[str, Set[int]] = {}
+        self.trigram_counts: List[int] = []
+        self.sorted_tokens: List[str] = []
+
+        for doc in documents:
+            self._add(doc)
+        self.sorted_tokens = sorted(self.name_postings)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _add(self, doc: SearchDocument) -> None:
+        idx = len(self.docs)
+        self.docs.append(doc)
+
+        for token in doc.name_norm.split():
+            self.name_postings.setdefault(token, set()).add(idx)
+
+        for token in tokenize(doc.city) + tokenize(doc.region):
+            self.context_postings.setdefault(token, set()).add(idx)
+
+        grams = trigrams(doc.name_norm)
+        for gram in grams:
+            self.trigram_postings.setdefault(gram, set()).add(idx)
+        self.trigram_counts.append(len(grams))
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        """Các token trong từ điển bắt đầu bằng prefix (tìm nhị phân trên list đã sort)."""
+        start = bisect_left(self.sorted_tokens, prefix)
+        result = []
+        for i in range(start, len(self.sorted_tokens)):
+            token = self.sorted_tokens[i]
+            if not token.startswith(prefix):
+                break
+            result.append(token)
+        return result
+
+    def search(
+        self,
+        query: str,
+        kinds: Optional[Iterable[str]] = None,
+        city: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[SearchHit]:
+        """Tìm và xếp hạng theo điểm khớp (cao -> thấp), hòa điểm thì ưu tiên popularity."""
+        tokens = tokenize(query)
+        if not tokens or not self.docs:
+            return []
+
+        allowed_kinds = set(kinds) if kinds else None
+        city_norm = canonical_city_key(city) if city else None
+
+        scores: Dict[int, float] = {}
+
+        def bump(idx: int, value: float) -> None:
+            scores[idx] = scores.get(idx, 0.0) + value
+
+        for token in tokens:
+            # Mỗi token của câu tìm kiếm tính 1 lần cho mỗi bản ghi: max(khớp chính xác, khớp tiền tố),
+            # tên có nhiều token cùng tiền tố không vượt được tên khớp chính xác
+            name_match: Dict[int, float] = {}
+            for prefix_token in self._prefix_tokens(token):
+                if prefix_token == token:
+                    continue
+                for idx in self.name_postings[prefix_token]:
+                    name_match[idx] = self.PREFIX_WEIGHT
+            for idx in self.name_postings.get(token, ()):
+                name_match[idx] = self.EXACT_WEIGHT
+            for idx, value in name_match.items():
+                bump(idx, value)
+
+            for idx in self.context_postings.get(token, ()):
+                bump(idx, self.CONTEXT_WEIGHT)
+
+        # Khớp gần đúng theo trigram của cả câu tìm kiếm
+        query_grams = trigrams(" ".join(tokens))
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for idx in self.trigram_postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        for idx, count in shared.items():
+            similarity = count / (len(query_grams) + self.trigram_counts[idx] - count)
+            if similarity >= self.MIN_TRIGRAM_SIMILARITY:
+                bump(idx, similarity * self.TRIGRAM_WEIGHT)
+
+        hits: List[Tuple[float, float, int]] = []
+        for idx, score in scores.items():
+            doc = self.docs[idx]
+            if allowed_kinds and doc.kind not in allowed_kinds:
+                continue
+            if city_norm and doc.city_norm != city_norm:
+                continue
+            popularity = min(max(doc.popularity or 0.0, 0.0), 100.0) / 100.0
+            hits.append((score + popularity * self.POPULARITY_WEIGHT, popularity, idx))
+
+        hits.sort(reverse=True)
+        return [SearchHit(doc=self.docs[idx], score=round(score, 4)) for score, _, idx in hits[:limit]]
@@ -0,0 +1,90 @@
+import heapq
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+from .search_index import tokenize
+
+
+@dataclass
+class Suggestion:
+    """1 gợi ý typeahead: tên thành phố / địa điểm / quán ăn / sự kiện"""
+    kind: str                   # "city" | "place" | "food" | "event"
+    id: Optional[int]
+    name: str
+    city: Optional[str] = None
+    weight: float = 0.0
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[int] = []            # index các Suggestion tốt nhất đi qua node này
+
+
+class SuggestIndex:
+    """
+    Trie trên tên đã bỏ dấu, mỗi node lưu sẵn top-K gợi ý (theo weight).
+
+    - Mỗi tên được chèn theo từng hậu tố bắt đầu ở đầu 1 từ
+      ("ho hoan kiem", "hoan kiem", "kiem") => gõ "kiem" vẫn ra Hồ Hoàn Kiếm.
+    - Chèn theo thứ tự weight giảm dần nên node chỉ cần append tới khi đủ K.
+    - Có 1 trie chung ("*") và 1 trie riêng cho từng kind, để lọc theo kind
+      không bị hụt kết quả vì top-K chung toàn là kind khác
+      (lọc nhiều kind => trộn top của trie từng kind).
+    - Truy vấn chỉ đi xuống len(prefix) node rồi trả top có sẵn: O(len(prefix)).
+    """
+
+    ALL = "*"
+
+    def __init__(self, suggestions: Iterable[Suggestion] = (), top_k: int = 10):
+        self.top_k = top_k
+        self.items: List[Suggestion] = sorted(suggestions, key=lambda s: -s.weight)
+        self.roots: Dict[str, _TrieNode] = {self.ALL: _TrieNode()}
+
+        for idx, item in enumerate(self.items):
+            kind_root = self.roots.setdefault(item.kind, _TrieNode())
+            tokens = tokenize(item.name)
+            for start in range(len(tokens)):
+                key = " ".join(tokens[start:])
+                self._insert(self.roots[self.ALL], key, idx)
+                self._insert(kind_root, key, idx)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _insert(self, node: _TrieNode, key: str, idx: int) -> None:
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+            # cùng 1 item có thể đi qua 1 node nhiều lần (tên lặp từ) => bỏ trùng
+            if len(node.top) < self.top_k and (not node.top or node.top[-1] != idx):
+                node.top.append(idx)
+
+    def suggest(
+        self,
+        prefix: str,
+        kinds: Optional[Iterable[str]] = None,
+        limit: int = 8,
+    ) -> List[Suggestion]:
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+        # gõ xong 1 từ ("ha ") thì chỉ gợi ý tên có từ "ha" trọn vẹn
+        if prefix[-1:].isspace():
+            key += " "
+
+        roots = [self.roots[k] for k in set(kinds) if k in self.roots] if kinds else [self.roots[self.ALL]]
+
+        tops = []
+        for node in roots:
+            for ch in key:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+            if node is not None:
+                tops.append(node.top)
+
+        # index nhỏ = weight cao và top của mỗi node đã tăng dần => trộn các list đã sắp
+        return [self.items[idx] for idx in islice(heapq.merge(*tops), limit)]
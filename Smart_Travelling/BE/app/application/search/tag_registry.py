@@ -0,0 +1,93 @@
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.city_registry import canonical_city_key
+
+
+@dataclass
+class TagStats:
+    """Số spot có 1 tag, chia theo (city key, category)."""
+    tag: str
+    total: int = 0
+    by_city_category: Counter = field(default_factory=Counter)
+
+    def count(self, city_key: Optional[str] = None, category: Optional[str] = None) -> int:
+        if city_key is None and category is None:
+            return self.total
+        return sum(
+            n for (c, cat), n in self.by_city_category.items()
+            if (city_key is None or c == city_key) and (category is None or cat == category)
+        )
+
+    def by_category(self, city_key: Optional[str] = None) -> Dict[str, int]:
+        result: Counter = Counter()
+        for (c, cat), n in self.by_city_category.items():
+            if city_key is None or c == city_key:
+                result[cat] += n
+        return dict(result)
+
+
+class TagRegistry:
+    """
+    Danh sách tag + số lượng spot theo city / category, build 1 lần từ catalog
+    (thay cho SELECT DISTINCT tags trên places + food rồi json.loads từng dòng mỗi request).
+
+    - tags(city, category): tag có trong city, xếp theo số spot giảm dần
+    - etag: hash nội dung, không đổi nếu catalog build lại mà tag / số lượng không đổi
+    """
+
+    def __init__(self, spots: Iterable[Tuple[Optional[str], Optional[str], Iterable[str]]]):
+        """spots: (city, category, tags) của từng place / food."""
+        self._stats: Dict[str, TagStats] = {}
+        # city key -> tag -> số spot, để trả lời "tag trong city X" mà không quét hết registry
+        self._by_city: Dict[str, Counter] = {}
+
+        for city, category, tags in spots:
+            city_key = canonical_city_key(city)
+            for tag in set(t.strip() for t in (tags or []) if t and t.strip()):
+                stats = self._stats.get(tag)
+                if stats is None:
+                    stats = self._stats[tag] = TagStats(tag)
+                stats.total += 1
+                stats.by_city_category[(city_key, category or "")] += 1
+                self._by_city.setdefault(city_key, Counter())[tag] += 1
+
+        self.etag = self._compute_etag()
+
+    def _compute_etag(self) -> str:
+        h = hashlib.sha1()
+        for tag in sorted(self._stats):
+            stats = self._stats[tag]
+            h.update(tag.encode("utf-8"))
+            for key in sorted(stats.by_city_category):
+                h.update(f"|{key[0]}:{key[1]}={stats.by_city_category[key]}".encode("utf-8"))
+            h.update(b"\n")
+        return h.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def stats(self, tag: str) -> Optional[TagStats]:
+        return self._stats.get(tag)
+
+    def tags(self, city: Optional[str] = None, category: Optional[str] = None) -> List[TagStats]:
+        """Tag (kèm số lượng) trong city / category, nhiều spot nhất đứng trước."""
+        city_key = canonical_city_key(city) if city else None
+
+        if city_key is not None and category is None:
+            counts = self._by_city.get(city_key, Counter())
+            ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+            return [self._stats[tag] for tag, _ in ranked]
+
+        result = []
+        for stats in self._stats.values():
+            n = stats.count(city_key, category)
+            if n > 0:
+                result.append((n, stats))
+        result.sort(key=lambda x: (-x[0], x[1].tag))
+        return [stats for _, stats in result]
+
+    def tag_names(self, city: Optional[str] = None, category: Optional[str] = None) -> List[str]:
+        return [stats.tag for stats in self.tags(city, category)]
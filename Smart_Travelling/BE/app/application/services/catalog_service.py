@@ -0,0 +1,341 @@
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.adapters.repositories.places_repository import fetch_all_places, row_to_place_lite
+from app.adapters.repositories.food_repository import fetch_all_food_places, row_to_food_place
+from app.adapters.repositories.event_repository import MySQLEventRepository, row_to_event
+from app.infrastructure import catalog_snapshot
+from app.application.search import SearchIndex, SearchDocument, SearchHit, SuggestIndex, Suggestion, TagRegistry
+from app.domain.entities.place_lite import PlaceLite
+from app.domain.entities.food_place import FoodPlace
+from app.domain.entities.event import Event
+from app.config.setting import (
+    SEARCH_LIMIT_DEFAULT,
+    SUGGEST_LIMIT_DEFAULT,
+    SUGGEST_TOP_K,
+    CATALOG_SNAPSHOT_DIR,
+    CATALOG_SNAPSHOT_KEEP,
+)
+from app.utils import city_registry, tag_vocab
+
+
+# Catalog dùng chung cho cả app, load 1 lần lúc khởi động (lifespan)
+# và build lại khi dữ liệu thay đổi (refresh_catalog)
+_places: List[PlaceLite] = []
+_foods: List[FoodPlace] = []
+_events: List[Event] = []
+_search_index: Optional[SearchIndex] = None
+_suggest_index: Optional[SuggestIndex] = None
+_tag_registry: Optional[TagRegistry] = None
+# canonical city key -> spot của thành phố đó (thay cho query DB mỗi request tạo lịch trình)
+_places_by_city: Dict[str, List[PlaceLite]] = {}
+_foods_by_city: Dict[str, List[FoodPlace]] = {}
+# canonical city key -> (place, tag_mask) đã xếp theo popularity giảm dần (gợi ý "5 địa điểm")
+_ranked_places_by_city: Dict[str, List[Tuple[PlaceLite, int]]] = {}
+# (loại spot, id) -> bitset tag (tag_vocab) của spot trong catalog, tính 1 lần lúc load
+_tag_masks: Dict[tuple, int] = {}
+# Nguồn của catalog đang dùng: "db" hoặc version của snapshot
+_source: Optional[str] = None
+# Version snapshot mới nhất mà catalog đang dùng đã bao gồm (load từ snapshot đó,
+# hoặc snapshot đã có trên đĩa lúc load từ DB) => watcher chỉ load snapshot mới hơn
+_snapshot_version: Optional[str] = None
+
+
+def build_search_index(
+    places: List[PlaceLite],
+    foods: List[FoodPlace],
+    events: List[Event],
+) -> SearchIndex:
+    """Gom places + food + events thành 1 SearchIndex duy nhất."""
+    docs: List[SearchDocument] = []
+
+    for p in places:
+        docs.append(SearchDocument(
+            kind="place",
+            id=p.id,
+            name=p.name,
+            city=p.address.city if p.address else None,
+            region=p.address.district if p.address else None,
+            popularity=p.popularity or 0,
+            ref=p,
+        ))
+
+    for f in foods:
+        docs.append(SearchDocument(
+            kind="food",
+            id=f.id,
+            name=f.name,
+            city=f.address.city if f.address else None,
+            region=f.address.district if f.address else None,
+            popularity=f.popularity or 0,
+            ref=f,
+        ))
+
+    for e in events:
+        docs.append(SearchDocument(
+            kind="event",
+            id=e.id,
+            name=e.name,
+            city=e.city,
+            region=e.region,
+            popularity=e.popularity or 0,
+            ref=e,
+        ))
+
+    return SearchIndex(docs)
+
+
+def build_suggest_index(index: SearchIndex) -> SuggestIndex:
+    """
+    Build trie gợi ý từ các document đã có trong search index + danh sách thành phố.
+    Thành phố được cộng thêm 100 (popularity tối đa của 1 địa điểm)
+    để khi gõ "ha" thì "Hà Nội" đứng trước các địa điểm.
+    """
+    suggestions: List[Suggestion] = []
+    city_counts: Counter = Counter()
+    city_names: Dict[str, Counter] = {}
+
+    for doc in index.docs:
+        suggestions.append(Suggestion(
+            kind=doc.kind,
+            id=doc.id,
+            name=doc.name,
+            city=doc.city,
+            weight=float(doc.popularity or 0),
+        ))
+        if doc.city_norm:
+            city_counts[doc.city_norm] += 1
+            city_names.setdefault(doc.city_norm, Counter())[doc.city] += 1
+
+    for city_norm, count in city_counts.items():
+        # Nhiều cách viết cho cùng 1 city thì lấy cách viết phổ biến nhất
+        display = city_names[city_norm].most_common(1)[0][0]
+        suggestions.append(Suggestion(kind="city", id=None, name=display, weight=100.0 + count))
+
+    return SuggestIndex(suggestions, top_k=SUGGEST_TOP_K)
+
+
+def build_tag_registry(places: List[PlaceLite], foods: List[FoodPlace]) -> TagRegistry:
+    """Đếm tag theo city / category cho /tags/items."""
+    spots = [
+        (p.address.city if p.address else None, p.category or "visit", p.tags)
+        for p in places
+    ] + [
+        (f.address.city if f.address else None, f.category or "eat", f.tags)
+        for f in foods
+    ]
+    return TagRegistry(spots)
+
+
+def rank_by_popularity(places: List[PlaceLite]) -> List[Tuple[PlaceLite, int]]:
+    """(place, tag_mask) xếp theo popularity giảm dần (sort ổn định, giữ thứ tự gốc khi bằng nhau)."""
+    ranked = [(p, get_tag_mask(p)) for p in places]
+    ranked.sort(key=lambda pm: pm[0].popularity or 0, reverse=True)
+    return ranked
+
+
+def _group_by_city(spots: list) -> Dict[str, list]:
+    groups: Dict[str, list] = {}
+    for spot in spots:
+        if spot.address and spot.address.city:
+            groups.setdefault(city_registry.canonical_city_key(spot.address.city), []).append(spot)
+    return groups
+
+
+def _mask_key(spot) -> tuple:
+    # places và food có id riêng theo bảng => kèm loại để không đụng nhau
+    return (type(spot).__name__, spot.id)
+
+
+def _install_catalog(
+    places: List[PlaceLite],
+    foods: List[FoodPlace],
+    events: List[Event],
+    source: str,
+) -> SearchIndex:
+    """Build index / nhóm theo city cho catalog mới rồi mới thay catalog cũ."""
+    global _places, _foods, _events, _search_index, _suggest_index, _tag_registry
+    global _places_by_city, _foods_by_city, _ranked_places_by_city, _tag_masks, _source
+
+    # City mới xuất hiện sau khi import cũng được đăng ký vào registry
+    city_registry.register_cities(
+        [p.address.city for p in places if p.address]
+        + [f.address.city for f in foods if f.address]
+        + [e.city for e in events]
+    )
+
+    # Vocab tag dùng chung cho cả engine: mỗi tag -> 1 bit
+    tag_masks: Dict[tuple, int] = {}
+    for spot in [*places, *foods]:
+        tag_masks[_mask_key(spot)] = tag_vocab.tag_mask(spot.tags)
+
+    # Build xong mới gán => request đang chạy vẫn đọc được index cũ
+    index = build_search_index(places, foods, events)
+    suggest_index = build_suggest_index(index)
+    tag_registry = build_tag_registry(places, foods)
+    places_by_city = _group_by_city([p for p in places if p.category == "visit"])
+    foods_by_city = _group_by_city(foods)
+    ranked_places_by_city = {
+        city: sorted(
+            ((p, tag_masks[_mask_key(p)]) for p in city_places),
+            key=lambda pm: pm[0].popularity or 0,
+            reverse=True,
+        )
+        for city, city_places in places_by_city.items()
+    }
+
+    _places, _foods, _events = places, foods, events
+    _search_index = index
+    _suggest_index = suggest_index
+    _tag_registry = tag_registry
+    _places_by_city, _foods_by_city = places_by_city, foods_by_city
+    _ranked_places_by_city = ranked_places_by_city
+    _tag_masks = tag_masks
+    _source = source
+
+    print(
+        f"Đã build catalog ({source}): {len(places)} places, {len(foods)} food, "
+        f"{len(events)} events, {tag_vocab.vocab_size()} tags"
+    )
+    return index
+
+
+def load_catalog() -> SearchIndex:
+    """Load toàn bộ catalog từ DB rồi build lại search index."""
+    global _snapshot_version
+    # Snapshot đã có trước lúc đọc DB thì cũ hơn dữ liệu DB => không để watcher load đè lên
+    on_disk = catalog_snapshot.current_version(str(CATALOG_SNAPSHOT_DIR))
+    places = fetch_all_places()
+    foods = fetch_all_food_places()
+    events = MySQLEventRepository().get_all_events()
+    index = _install_catalog(places, foods, events, source="db")
+    _snapshot_version = max(filter(None, (_snapshot_version, on_disk)), default=None)
+    return index
+
+
+def load_catalog_from_snapshot(version: Optional[str] = None) -> bool:
+    """
+    Load catalog từ snapshot nhị phân (không cần DB).
+    Trả về False nếu chưa có snapshot / snapshot hỏng để caller fallback về DB.
+    """
+    global _snapshot_version
+    try:
+        result = catalog_snapshot.read_snapshot(str(CATALOG_SNAPSHOT_DIR), version)
+    except Exception as e:
+        print(f"Không đọc được catalog snapshot: {e}")
+        return False
+    if result is None:
+        return False
+
+    version, tables = result
+    places = [row_to_place_lite(r) for r in tables.get("places", [])]
+    foods = [row_to_food_place(r) for r in tables.get("food", [])]
+    events = [row_to_event(r) for r in tables.get("events", [])]
+    _install_catalog(places, foods, events, source=version)
+    _snapshot_version = version
+    return True
+
+
+def refresh_from_snapshot_if_newer() -> bool:
+    """
+    Có snapshot mới hơn (version là thời gian UTC, so sánh chuỗi được) snapshot đã load / đã có
+    lúc load từ DB thì load lại (gọi định kỳ ở background).
+    Catalog vừa refresh từ DB không bị snapshot cũ ghi đè, chỉ khi export snapshot mới.
+    """
+    version = catalog_snapshot.current_version(str(CATALOG_SNAPSHOT_DIR))
+    if version is None or (_snapshot_version is not None and version <= _snapshot_version):
+        return False
+    return load_catalog_from_snapshot(version)
+
+
+def export_snapshot() -> str:
+    """Đọc catalog từ DB và ghi ra 1 version snapshot mới, trả về tên version."""
+    tables = {
+        "places": [catalog_snapshot.place_to_row(p) for p in fetch_all_places()],
+        "food": [catalog_snapshot.food_to_row(f) for f in fetch_all_food_places()],
+        "events": [catalog_snapshot.event_to_row(e) for e in MySQLEventRepository().get_all_events()],
+    }
+    return catalog_snapshot.write_snapshot(str(CATALOG_SNAPSHOT_DIR), tables, keep=CATALOG_SNAPSHOT_KEEP)
+
+
+def refresh_catalog() -> dict:
+    """Build lại catalog khi dữ liệu thay đổi (admin gọi sau khi import)."""
+    index = load_catalog()
+    return {
+        "places": len(_places),
+        "food": len(_foods),
+        "events": len(_events),
+        "documents": len(index),
+    }
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    return _search_index
+
+
+def get_suggest_index() -> Optional[SuggestIndex]:
+    return _suggest_index
+
+
+def get_tag_registry() -> Optional[TagRegistry]:
+    return _tag_registry
+
+
+def get_catalog_places() -> List[PlaceLite]:
+    return _places
+
+
+def get_catalog_source() -> Optional[str]:
+    return _source
+
+
+def get_city_places(city: str) -> Optional[List[PlaceLite]]:
+    """Địa điểm tham quan (category 'visit') của 1 thành phố; None nếu catalog chưa được load."""
+    if _source is None:
+        return None
+    return _places_by_city.get(city_registry.canonical_city_key(city), [])
+
+
+def get_city_ranked_places(city: str) -> Optional[List[Tuple[PlaceLite, int]]]:
+    """(place, tag_mask) của 1 thành phố theo popularity giảm dần; None nếu catalog chưa được load."""
+    if _source is None:
+        return None
+    return _ranked_places_by_city.get(city_registry.canonical_city_key(city), [])
+
+
+def get_city_foods(city: str) -> Optional[List[FoodPlace]]:
+    """Quán ăn của 1 thành phố; None nếu catalog chưa được load."""
+    if _source is None:
+        return None
+    return _foods_by_city.get(city_registry.canonical_city_key(city), [])
+
+
+def get_tag_mask(spot) -> int:
+    """Bitset tag của 1 place/food; spot không thuộc catalog thì tính trực tiếp."""
+    mask = _tag_masks.get(_mask_key(spot))
+    if mask is None:
+        mask = tag_vocab.tag_mask(spot.tags)
+    return mask
+
+
+def search(
+    query: str,
+    kinds: Optional[List[str]] = None,
+    city: Optional[str] = None,
+    limit: int = SEARCH_LIMIT_DEFAULT,
+) -> List[SearchHit]:
+    """Tìm trong search index; trả [] nếu index chưa được build."""
+    if _search_index is None:
+        return []
+    return _search_index.search(query, kinds=kinds, city=city, limit=limit)
+
+
+def suggest(
+    prefix: str,
+    kinds: Optional[List[str]] = None,
+    limit: int = SUGGEST_LIMIT_DEFAULT,
+) -> List[Suggestion]:
+    """Gợi ý typeahead theo tiền tố; trả [] nếu index chưa được build."""
+    if _suggest_index is None:
+        return []
+    return _suggest_index.suggest(prefix, kinds=kinds, limit=limit)
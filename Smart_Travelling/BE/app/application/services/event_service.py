@@ -5,6 +5,7 @@ from app.domain.entities.event import Event
 from app.application.interfaces.EventRepository import EventRepository
 from app.utils.geo_utils import haversine_km
 from app.config.setting import MAX_LEG_DISTANCE_KM_DEFAULT
+from app.application.services import catalog_service
 
 
 class EventService:
@@ -104,4 +105,12 @@ class EventService:
         return self.repo.get_by_id(event_id)
 
     def search_events_by_name(self, keyword: str, limit: int = 5) -> List[Event]:
-        return self.repo.search_events_by_name(keyword=keyword, limit=limit)
+        """
+        Tra trong search index của catalog (không phụ thuộc kích thước bảng events).
+        Index chưa được build (DB lỗi lúc khởi động) thì fallback về repo.
+        """
+        if catalog_service.get_search_index() is None:
+            return self.repo.search_events_by_name(keyword=keyword, limit=limit)
+
+        hits = catalog_service.search(keyword, kinds=["event"], limit=limit)
+        return [hit.doc.ref for hit in hits]
@@ -1,25 +1,93 @@
-from app.adapters.repositories.places_repository import fetch_all_places
+import asyncio
+
+from app.application.services import (
+    catalog_service,
+    login_throttle,
+    trip_history_writer,
+    trip_history_file_service,
+    trip_stats_service,
+)
+from app.adapters.repositories.city_repository import fetch_all_city_names
+from app.utils import city_registry
 from app.application.itinerary.itineray_engine import init_ai_recommender
+from app.application.itinerary import trip_variants
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.domain.entities.place_lite import PlaceLite
+from app.config.setting import (
+    CATALOG_SNAPSHOT_POLL_SECONDS,
+    TRIP_HISTORY_COMPACT_INTERVAL_SECONDS,
+    TRIP_STATS_FLUSH_SECONDS,
+    LOGIN_THROTTLE_FLUSH_SECONDS,
+)
 
 
 
-# Load places từ DB để khởi tạo module hybrid recommender
+# Load catalog (places + food + events) và build search index:
+# ưu tiên snapshot nhị phân (không cần DB), chưa có snapshot thì đọc từ DB.
+# Places trong catalog được dùng lại để khởi tạo module hybrid recommender
 async def load_places_for_ai() -> list[PlaceLite]:
     
     try:
-        places = fetch_all_places()
-        return places
+        if not catalog_service.load_catalog_from_snapshot():
+            catalog_service.load_catalog()
+        return catalog_service.get_catalog_places()
     except Exception as e:
         print(f" Không load được dữ liệu cho hybrid {e}")
         return []
 
+
+# Định kỳ kiểm tra snapshot mới (export_catalog_snapshot) rồi load lại ở thread riêng
+async def watch_catalog_snapshot():
+    while True:
+        await asyncio.sleep(CATALOG_SNAPSHOT_POLL_SECONDS)
+        try:
+            if await asyncio.to_thread(catalog_service.refresh_from_snapshot_if_newer):
+                init_ai_recommender(catalog_service.get_catalog_places())
+        except Exception as e:
+            print(f"Không cập nhật được catalog snapshot: {e}")
+
+
+# Định kỳ áp retention (số trip / tuổi) + gộp file lịch sử trip cho các user không còn ghi thêm
+async def compact_trip_history_periodically():
+    while True:
+        await asyncio.sleep(TRIP_HISTORY_COMPACT_INTERVAL_SECONDS)
+        try:
+            results = await asyncio.to_thread(trip_history_file_service.compact_all_users)
+            if results:
+                print(f"Đã compact lịch sử trip của {len(results)} user")
+        except Exception as e:
+            print(f"Không compact được lịch sử trip: {e}")
+
+# Định kỳ ghi thống kê trip (chỉ ghi khi có trip mới)
+async def flush_trip_stats_periodically():
+    while True:
+        await asyncio.sleep(TRIP_STATS_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(trip_stats_service.save_stats)
+        except Exception as e:
+            print(f"Không ghi được thống kê trip: {e}")
+
+# Ghi số lần đăng nhập sai / reset đang giữ trong bộ nhớ xuống DB theo lô
+async def flush_login_throttle_periodically():
+    while True:
+        await asyncio.sleep(LOGIN_THROTTLE_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(login_throttle.flush)
+        except Exception as e:
+            print(f"Không ghi được trạng thái đăng nhập: {e}")
+
 # 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Nạp city registry (alias tĩnh đã có sẵn, bổ sung các city có trong DB)
+    try:
+        count = city_registry.register_cities(fetch_all_city_names())
+        print(f"Đã nạp {count} thành phố vào city registry")
+    except Exception as e:
+        print(f"Không nạp được city registry: {e}")
+
     # Load places và init AI
     try:
         places = await load_places_for_ai() 
@@ -29,8 +97,37 @@ async def lifespan(app: FastAPI):
             print("Không thể load dược địa điểm để khởi tạo AI recommender.")
     except Exception as e:
         print(f"Không thể khởi tạo module recommender: {e}")
+
+    watcher = asyncio.create_task(watch_catalog_snapshot())
+
+    # Thống kê trip đã lưu lần trước (cộng tiếp khi ghi trip mới)
+    try:
+        trip_stats_service.load_stats()
+    except Exception as e:
+        print(f"Không đọc được thống kê trip: {e}")
+
+    # Thread ghi lịch sử trip ở background
+    trip_history_writer.start_writer()
+    compactor = asyncio.create_task(compact_trip_history_periodically())
+    stats_flusher = asyncio.create_task(flush_trip_stats_periodically())
+    login_flusher = asyncio.create_task(flush_login_throttle_periodically())
     
     yield
     
     # ===== SHUTDOWN =====
+    watcher.cancel()
+    compactor.cancel()
+    stats_flusher.cancel()
+    login_flusher.cancel()
+    try:
+        await asyncio.to_thread(login_throttle.flush)
+    except Exception as e:
+        print(f"Không ghi được trạng thái đăng nhập: {e}")
+    # Ghi nốt lịch sử trip còn trong hàng đợi rồi ghi thống kê
+    await asyncio.to_thread(trip_history_writer.stop_writer)
+    try:
+        await asyncio.to_thread(trip_stats_service.save_stats)
+    except Exception as e:
+        print(f"Không ghi được thống kê trip: {e}")
+    trip_variants.shutdown_pool()
     print("Tắt sever")
@@ -0,0 +1,113 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.adapters.repositories import user_repository
+from app.domain.entities.user_entity import UserEntity
+
+
+# Lần đăng nhập sai / đúng giữ trong bộ nhớ, ghi xuống DB theo lô (1 connection, 1 commit).
+# Ghi dạng CHÊNH LỆCH (failed_attempts = failed_attempts + n) và khóa tài khoản ngay trong câu SQL
+# => nhiều worker cùng ghi không đè số lần sai của nhau, rải lần thử qua nhiều worker vẫn bị khóa.
+#   user_id -> (reset, delta, locked)
+#     reset : đã đăng nhập đúng => failed_attempts về 0 trước khi cộng delta
+#     delta : số lần sai chưa ghi
+#     locked: worker này đã thấy đủ số lần sai để khóa (ghi ngay, không chờ lô)
+# Khi đọc user từ DB, phần chưa ghi ở đây được cộng thêm (DB có thể chưa kịp cập nhật).
+
+State = Tuple[bool, int, bool]
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_pending: Dict[int, State] = {}
+# Lô đang ghi xuống DB (vẫn tính vào current_state cho tới khi ghi xong)
+_inflight: Dict[int, State] = {}
+
+
+def _combine(first: Optional[State], then: Optional[State]) -> Optional[State]:
+    """Trạng thái sau khi áp `first` rồi tới `then`."""
+    if first is None or then is None:
+        return then or first
+    if then[0]:
+        return then
+    return first[0], first[1] + then[1], first[2] or then[2]
+
+
+def current_state(user_id: int, failed_attempts: int, is_active: bool) -> Tuple[int, bool]:
+    """(failed_attempts, is_active) mới nhất: giá trị DB + phần chưa ghi trong bộ nhớ."""
+    with _lock:
+        state = _combine(_inflight.get(user_id), _pending.get(user_id))
+    if state is None:
+        return failed_attempts, is_active
+    reset, delta, locked = state
+    return (0 if reset else failed_attempts) + delta, is_active and not locked
+
+
+def record_failure(user_id: int, locked: bool = False) -> None:
+    with _lock:
+        _pending[user_id] = _combine(_pending.get(user_id), (False, 1, locked))
+    if locked:
+        try:
+            flush()
+        except Exception as e:
+            # DB không ghi được: vẫn nằm trong hàng chờ (worker này vẫn thấy bị khóa), lô sau ghi lại
+            print(f"Không ghi được trạng thái khóa tài khoản {user_id}: {e}")
+
+
+def record_success(user_id: int) -> None:
+    with _lock:
+        _pending[user_id] = (True, 0, False)
+
+
+def forget(user_id: int) -> None:
+    """
+    Bỏ trạng thái chưa ghi (admin sắp đặt lại trực tiếp trong DB).
+    Chờ lô đang ghi (nếu có) xong trước => lô đó không ghi đè lên thay đổi của admin
+    và không được trả lại hàng chờ nếu ghi lỗi.
+    """
+    with _flush_lock, _lock:
+        _pending.pop(user_id, None)
+        _inflight.pop(user_id, None)
+
+
+def pending_count() -> int:
+    return len(_pending)
+
+
+def flush() -> int:
+    """Ghi các thay đổi đang chờ xuống DB, trả về số user đã ghi."""
+    with _flush_lock:
+        return _flush()
+
+
+def _requeue(batch: Dict[int, State]) -> None:
+    """Ghi lỗi: trả lô lại hàng chờ (trước những gì mới phát sinh trong lúc ghi)."""
+    with _lock:
+        for user_id, state in batch.items():
+            _pending[user_id] = _combine(state, _pending.get(user_id))
+        _inflight.clear()
+
+
+def _flush() -> int:
+    global _pending
+    with _lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+        _inflight.update(batch)
+
+    try:
+        written = user_repository.apply_login_changes(
+            [(user_id, reset, delta) for user_id, (reset, delta, _) in batch.items()],
+            UserEntity.MAX_FAILED_ATTEMPTS,
+        )
+    except Exception:
+        _requeue(batch)
+        raise
+    if not written:
+        # Không lấy được connection (get_db() = None): lô chưa được ghi
+        _requeue(batch)
+        raise RuntimeError("Không kết nối được DB")
+
+    with _lock:
+        _inflight.clear()
+    return len(batch)
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.config.setting import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WAIT_SECONDS,
+)
+from app.domain.entities.user_entity import pwd_context
+
+
+# bcrypt tốn CPU (~vài chục ms / lần): chạy trên executor riêng, ít worker, có giới hạn số việc chờ
+# => 1 đợt đăng nhập dồn dập không chiếm hết threadpool đang phục vụ tạo lịch trình.
+# Hết chỗ (chờ quá PASSWORD_HASH_WAIT_SECONDS) thì báo bận thay vì xếp hàng vô hạn.
+
+BUSY_MESSAGE = "Hệ thống đang bận, vui lòng thử lại sau giây lát."
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(timeout=PASSWORD_HASH_WAIT_SECONDS):
+        raise ValueError(BUSY_MESSAGE)
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return _submit(pwd_context.verify, password, hashed_password).result()
+
+
+def hash_password(password: str) -> str:
+    return _submit(pwd_context.hash, password).result()
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Dùng trong route async: chờ kết quả mà không giữ thread nào của event loop / threadpool."""
+    future = await asyncio.to_thread(_submit, pwd_context.verify, password, hashed_password)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    future = await asyncio.to_thread(_submit, pwd_context.hash, password)
+    return await asyncio.wrap_future(future)
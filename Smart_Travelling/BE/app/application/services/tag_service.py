@@ -1,6 +1,39 @@
-from typing import List
+from typing import List, Optional, Tuple
 from app.adapters.repositories import tag_repository
+from app.application.services import catalog_service
+from app.utils.city_registry import canonical_city_key
 
 # Lấy tất cả địa điểm theo tag
 def get_all_places_by_tag() -> List[dict]:
-    return tag_repository.fetch_tags_by_data()
\ No newline at end of file
+    registry = catalog_service.get_tag_registry()
+    if registry is not None:
+        return registry.tag_names()
+    return tag_repository.fetch_tags_by_data()
+
+
+def get_tags(
+    city: Optional[str] = None,
+    category: Optional[str] = None,
+    with_counts: bool = False,
+) -> Tuple[Optional[list], Optional[str]]:
+    """
+    Danh sách tag từ registry trong bộ nhớ (lọc theo city / category), kèm etag của registry.
+    Catalog chưa load thì query DB như cũ (không lọc được, etag = None).
+    """
+    registry = catalog_service.get_tag_registry()
+    if registry is None:
+        return tag_repository.fetch_tags_by_data(), None
+
+    if not with_counts:
+        return registry.tag_names(city, category), registry.etag
+
+    city_key = canonical_city_key(city) if city else None
+    data = [
+        {
+            "tag": stats.tag,
+            "count": stats.count(city_key, category),
+            "by_category": stats.by_category(city_key),
+        }
+        for stats in registry.tags(city, category)
+    ]
+    return data, registry.etag
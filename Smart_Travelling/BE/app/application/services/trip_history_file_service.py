@@ -1,13 +1,57 @@
 import os
+import gzip
 import json
-from datetime import datetime, timezone
+import threading
+import zlib
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Dict
-from app.config.setting import BASE_DIR
+from typing import List, Optional, Dict, Tuple
+from app.config.setting import (
+    BASE_DIR,
+    TRIP_HISTORY_PAGE_MAX,
+    TRIP_HISTORY_FSYNC,
+    TRIP_HISTORY_MAX_TRIPS_PER_USER,
+    TRIP_HISTORY_MAX_AGE_DAYS,
+    TRIP_HISTORY_COMPACT_MIN_FILES,
+    TRIP_HISTORY_SEGMENT_MAX_GARBAGE,
+)
+from app.application.services import trip_stats_service
+from app.utils.city_registry import canonical_city_key
+from app.utils.response_format import success
 
 
 TRIP_HISTORY_DIR = os.path.join(BASE_DIR, "data", "trip_history")
 
+# index.json của mỗi user: tóm tắt các trip (mới nhất trước) để liệt kê lịch sử
+# mà không phải mở các file trip (chứa cả trip_data rất lớn)
+INDEX_FILE = "index.json"
+SUMMARY_FIELDS = ("id", "city", "start_date", "num_days", "num_people", "total_cost", "created_at")
+
+# File trip mới: trip_<id>.json.gz = gzip(JSON gọn) của đúng body response GET /history/{user_id}/{trip_id}
+# => client nhận gzip thì trả thẳng bytes đã lưu, không giải nén / nén lại.
+# File trip_<id>.json (pretty-print, định dạng cũ) vẫn đọc được.
+TRIP_DETAIL_MESSAGE = "Lấy chi tiết trip thành công"
+GZIP_SUFFIX = ".json.gz"
+JSON_SUFFIX = ".json"
+
+# Compaction gộp các file trip lẻ của 1 user vào 1 file segment_<ts>.bin
+# (nối liền các bytes gzip ở trên); index.json lưu vị trí của trip trong segment:
+#   {"segment": "segment_<ts>.bin", "offset": ..., "length": ...}
+# => số file mỗi user luôn nhỏ (index + 1 segment + các trip mới từ lần compact trước).
+# Compaction chỉ nối file lẻ mới vào cuối segment; trip bị xóa khỏi segment được ghi tombstone
+# (tombstones.txt, mỗi dòng 1 id) để rebuild_index không lấy lại. Khi phần đã xóa chiếm quá
+# TRIP_HISTORY_SEGMENT_MAX_GARBAGE thì mới ghi lại segment mới và xóa tombstone.
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".bin"
+TOMBSTONE_FILE = "tombstones.txt"
+
+# Khóa theo user: save / delete cùng lúc không ghi đè index của nhau
+_index_locks: Dict[int, threading.RLock] = {}
+_index_locks_guard = threading.Lock()
+
+_trip_id_lock = threading.Lock()
+_last_trip_id = 0
+
 
 def ensure_user_history_dir(user_id: int) -> Path:
     """Tạo folder lưu lịch sử nếu chưa tồn tại."""
@@ -16,23 +60,324 @@ def ensure_user_history_dir(user_id: int) -> Path:
     return user_dir
 
 
-def save_trip_to_file(user_id: int, trip_data: Dict) -> bool:
-    """Lưu 1 trip vào file JSON với tên là timestamp."""
+def _index_lock(user_id: int) -> threading.RLock:
+    # RLock: thao tác giữ lock (vd delete_trip) gọi tiếp _update_index cũng lấy lock này
+    with _index_locks_guard:
+        lock = _index_locks.get(user_id)
+        if lock is None:
+            lock = _index_locks[user_id] = threading.RLock()
+        return lock
+
+
+def _trip_files(user_dir: Path) -> List[Path]:
+    """Tất cả file trip (gzip + định dạng cũ) của 1 user."""
+    return [p for p in user_dir.glob("trip_*") if p.name.endswith((GZIP_SUFFIX, JSON_SUFFIX))]
+
+
+def _trip_file(user_dir: Path, trip_id: int) -> Optional[Path]:
+    for suffix in (GZIP_SUFFIX, JSON_SUFFIX):
+        path = user_dir / f"trip_{trip_id}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def _read_trip_file(path: Path) -> Dict:
+    if path.name.endswith(GZIP_SUFFIX):
+        with open(path, "rb") as f:
+            return json.loads(gzip.decompress(f.read()))["data"]
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _encode_trip(trip: Dict) -> bytes:
+    body = json.dumps(
+        success(TRIP_DETAIL_MESSAGE, trip),
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    # mtime=0 => cùng nội dung thì cùng bytes
+    return gzip.compress(body.encode("utf-8"), compresslevel=6, mtime=0)
+
+
+def _decode_blob(blob: bytes) -> Dict:
+    return json.loads(gzip.decompress(blob))["data"]
+
+
+def _trip_id_of(path: Path) -> Optional[int]:
+    name = path.name[len("trip_"):]
+    for suffix in (GZIP_SUFFIX, JSON_SUFFIX):
+        if name.endswith(suffix):
+            try:
+                return int(name[: -len(suffix)])
+            except ValueError:
+                return None
+    return None
+
+
+def _segment_files(user_dir: Path) -> List[Path]:
+    return sorted(user_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+
+def _read_segment_blob(user_dir: Path, entry: Dict) -> Optional[bytes]:
+    segment = entry.get("segment")
+    if not segment:
+        return None
+    try:
+        with open(user_dir / segment, "rb") as f:
+            f.seek(entry["offset"])
+            return f.read(entry["length"])
+    except FileNotFoundError:
+        return None
+
+
+def _scan_segment(path: Path):
+    """Đọc lần lượt các trip trong 1 segment (dùng khi phải build lại index): (offset, length, trip)."""
+    data = memoryview(path.read_bytes())
+    offset = 0
+    while offset < len(data):
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = d.decompress(data[offset:]) + d.flush()
+        length = len(data) - offset - len(d.unused_data)
+        yield offset, length, json.loads(body)["data"]
+        offset += length
+
+
+def _read_tombstones(user_dir: Path) -> set:
+    try:
+        with open(user_dir / TOMBSTONE_FILE, "r", encoding="utf-8") as f:
+            return {int(line) for line in f if line.strip().isdigit()}
+    except FileNotFoundError:
+        return set()
+
+
+def _add_tombstones(user_dir: Path, trip_ids: List[int], fsync: bool = TRIP_HISTORY_FSYNC) -> None:
+    """Ghi id trip đã xóa (nối thêm) trước khi bỏ khỏi index => index mất / hỏng cũng không hiện lại."""
+    if not trip_ids:
+        return
+    with open(user_dir / TOMBSTONE_FILE, "a", encoding="utf-8") as f:
+        f.write("".join(f"{trip_id}\n" for trip_id in trip_ids))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _fsync_dir(path: Path) -> None:
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def trip_summary(trip: Dict) -> Dict:
+    """Các trường hiển thị ở danh sách lịch sử."""
+    return {field: trip.get(field) for field in SUMMARY_FIELDS}
+
+
+def _write_index(user_dir: Path, summaries: List[Dict]) -> None:
+    """Ghi index ra file tạm rồi rename => không bao giờ đọc phải index ghi dở."""
+    tmp_file = user_dir / f"{INDEX_FILE}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"trips": summaries}, f, ensure_ascii=False, default=str)
+    os.replace(tmp_file, user_dir / INDEX_FILE)
+
+
+def rebuild_index(user_id: int) -> List[Dict]:
+    """
+    Build lại index từ segment + các file trip (index chưa có / bị hỏng, dữ liệu cũ),
+    bỏ qua trip đã xóa / bị retention dọn (tombstone).
+    """
+    user_dir = ensure_user_history_dir(user_id)
+    deleted = _read_tombstones(user_dir)
+    by_id: Dict[int, Dict] = {}
+    for segment in _segment_files(user_dir):
+        try:
+            for offset, length, trip in _scan_segment(segment):
+                if trip.get("id") in deleted:
+                    continue
+                entry = trip_summary(trip)
+                entry.update(segment=segment.name, offset=offset, length=length)
+                by_id[entry.get("id")] = entry
+        except (zlib.error, json.JSONDecodeError, KeyError, OSError):
+            print(f"⚠️ Invalid segment: {segment}")
+    for trip_file in _trip_files(user_dir):
+        try:
+            entry = trip_summary(_read_trip_file(trip_file))
+            if entry.get("id") in deleted:
+                continue
+            by_id[entry.get("id")] = entry
+        except (json.JSONDecodeError, OSError, KeyError):
+            print(f"⚠️ Invalid trip file: {trip_file}")
+    summaries = sorted(by_id.values(), key=lambda t: t.get("id") or 0, reverse=True)
+    _write_index(user_dir, summaries)
+    return summaries
+
+
+def _read_index(user_dir: Path) -> Optional[List[Dict]]:
     try:
+        with open(user_dir / INDEX_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("trips", [])
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_index(user_id: int) -> List[Dict]:
+    """Tóm tắt các trip của user (mới nhất trước), chỉ đọc index.json."""
+    user_dir = ensure_user_history_dir(user_id)
+    summaries = _read_index(user_dir)
+    if summaries is None:
+        with _index_lock(user_id):
+            return rebuild_index(user_id)
+    return summaries
+
+
+def _index_entry(user_id: int, trip_id: int) -> Optional[Dict]:
+    for entry in load_index(user_id):
+        if entry.get("id") == trip_id:
+            return entry
+    return None
+
+
+def _update_index(
+    user_id: int,
+    add: Optional[Dict] = None,
+    remove_id: Optional[int] = None,
+    add_many: Optional[List[Dict]] = None,
+    touch_id: Optional[int] = None,
+) -> bool:
+    """Sửa index của 1 user; trả về False nếu trip cần xóa / touch không có trong index."""
+    with _index_lock(user_id):
         user_dir = ensure_user_history_dir(user_id)
-        timestamp = int(datetime.now(timezone.utc).timestamp() * 1000)
-        trip_file = user_dir / f"trip_{timestamp}.json"
-        
-        trip_with_meta = {
-            **trip_data,
-            "id": timestamp,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        
-        with open(trip_file, "w", encoding="utf-8") as f:
-            json.dump(trip_with_meta, f, ensure_ascii=False, indent=2, default=str,)
-        
-        print(f"✅ Saved trip for user {user_id} to {trip_file}")
+        summaries = _read_index(user_dir)
+        if summaries is None:
+            summaries = rebuild_index(user_id)
+
+        found = True
+        if remove_id is not None:
+            kept = [t for t in summaries if t.get("id") != remove_id]
+            found = len(kept) != len(summaries)
+            summaries = kept
+        if touch_id is not None:
+            found = False
+            for t in summaries:
+                if t.get("id") == touch_id:
+                    t["accessed_at"] = int(datetime.now(timezone.utc).timestamp() * 1000)
+                    found = True
+        adds = ([add] if add is not None else []) + (add_many or [])
+        if adds:
+            new_ids = {t.get("id") for t in adds}
+            summaries = [t for t in summaries if t.get("id") not in new_ids] + adds
+            summaries.sort(key=lambda t: t.get("id") or 0, reverse=True)
+        _write_index(user_dir, summaries)
+        return found
+
+
+def list_trip_summaries(
+    user_id: int,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    city: Optional[str] = None,
+) -> Tuple[List[Dict], int, Optional[int]]:
+    """
+    Liệt kê lịch sử từ index (keyset pagination theo id giảm dần).
+
+    - before_id: chỉ lấy trip có id < before_id (id = timestamp lúc lưu)
+    - date_from / date_to: lọc theo ngày tạo (created_at)
+    - city: lọc theo thành phố (so canonical key => alias / không dấu đều được)
+
+    Trả về:
+        (trang hiện tại, tổng số trip khớp bộ lọc, before_id cho trang sau hoặc None)
+    """
+    city_key = canonical_city_key(city) if city else None
+    date_from_str = date_from.isoformat() if date_from else None
+    date_to_str = date_to.isoformat() if date_to else None
+
+    matched = []
+    for t in load_index(user_id):
+        created = (t.get("created_at") or "")[:10]
+        if date_from_str and created < date_from_str:
+            continue
+        if date_to_str and created > date_to_str:
+            continue
+        if city_key and canonical_city_key(t.get("city")) != city_key:
+            continue
+        matched.append(t)
+
+    page = [t for t in matched if before_id is None or (t.get("id") or 0) < before_id]
+    if limit is not None:
+        limit = max(1, min(limit, TRIP_HISTORY_PAGE_MAX))
+        has_more = len(page) > limit
+        page = page[:limit]
+        next_before = page[-1].get("id") if has_more and page else None
+    else:
+        next_before = None
+    return page, len(matched), next_before
+
+
+def _next_trip_id(now: datetime) -> int:
+    """Timestamp ms, tăng dần trong process (2 trip cùng 1 ms không bị trùng id / trùng file)."""
+    global _last_trip_id
+    with _trip_id_lock:
+        _last_trip_id = max(int(now.timestamp() * 1000), _last_trip_id + 1)
+        return _last_trip_id
+
+
+def new_trip_record(trip_data: Dict) -> Dict:
+    """Gắn id (timestamp ms) + created_at cho trip sắp lưu."""
+    now = datetime.now(timezone.utc)
+    return {
+        **trip_data,
+        "id": _next_trip_id(now),
+        "created_at": now.isoformat(),
+    }
+
+
+def write_trip_files(items: List[Tuple[int, Dict]], fsync: bool = TRIP_HISTORY_FSYNC) -> None:
+    """
+    Ghi 1 lô trip (user_id, record) xuống đĩa:
+    ghi hết file tạm -> fsync 1 lượt -> rename -> fsync mỗi thư mục 1 lần -> cập nhật index mỗi user 1 lần
+    -> cộng vào thống kê (trip_stats_service).
+    Người đọc chỉ thấy file trip đã ghi đầy đủ (rename là atomic).
+    """
+    pending = []
+    for user_id, record in items:
+        user_dir = ensure_user_history_dir(user_id)
+        trip_file = user_dir / f"trip_{record['id']}{GZIP_SUFFIX}"
+        tmp_file = user_dir / f"{trip_file.name}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(_encode_trip(record))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        pending.append((user_id, user_dir, tmp_file, trip_file, record))
+
+    for _, _, tmp_file, trip_file, _ in pending:
+        os.replace(tmp_file, trip_file)
+
+    if fsync:
+        for user_dir in {entry[1] for entry in pending}:
+            _fsync_dir(user_dir)
+
+    by_user: Dict[int, List[Dict]] = {}
+    for user_id, _, _, _, record in pending:
+        by_user.setdefault(user_id, []).append(trip_summary(record))
+    for user_id, summaries in by_user.items():
+        _update_index(user_id, add_many=summaries)
+
+    trip_stats_service.record_trips(record for _, _, _, _, record in pending)
+
+
+def save_trip_to_file(user_id: int, trip_data: Dict) -> bool:
+    """Lưu 1 trip vào file JSON nén gzip với tên là timestamp (ghi ngay, chạy trên thread gọi)."""
+    try:
+        record = new_trip_record(trip_data)
+        write_trip_files([(user_id, record)])
+        print(f"✅ Saved trip {record['id']} for user {user_id}")
         return True
     except Exception as e:
         print(f"❌ Error saving trip: {e}")
@@ -40,21 +385,34 @@ def save_trip_to_file(user_id: int, trip_data: Dict) -> bool:
 
 
 def load_trip_history(user_id: int) -> List[Dict]:
-    """Lấy toàn bộ lịch sử trip của user từ thư mục (mới nhất trước)."""
+    """
+    Lấy toàn bộ lịch sử trip của user (mới nhất trước), gồm cả trip đã gộp vào segment.
+    Đọc index 1 lần, trip trong segment đọc thẳng theo offset của entry (mỗi segment mở 1 lần).
+    """
     try:
         user_dir = ensure_user_history_dir(user_id)
-        trip_files = sorted(user_dir.glob("trip_*.json"), reverse=True)
-        
         trips = []
-        for trip_file in trip_files:
-            try:
-                with open(trip_file, "r", encoding="utf-8") as f:
-                    trip = json.load(f)
-                    trips.append(trip)
-            except json.JSONDecodeError:
-                print(f"⚠️ Invalid JSON: {trip_file}")
-                continue
-        
+        segments = {}
+        try:
+            for entry in load_index(user_id):
+                trip_file = _trip_file(user_dir, entry.get("id"))
+                if trip_file is not None:
+                    trips.append(_read_trip_file(trip_file))
+                    continue
+                segment = entry.get("segment")
+                if not segment:
+                    continue
+                f = segments.get(segment)
+                if f is None:
+                    try:
+                        f = segments[segment] = open(user_dir / segment, "rb")
+                    except FileNotFoundError:
+                        continue
+                f.seek(entry["offset"])
+                trips.append(_decode_blob(f.read(entry["length"])))
+        finally:
+            for f in segments.values():
+                f.close()
         return trips
     except Exception as e:
         print(f"❌ Error loading trip history: {e}")
@@ -65,30 +423,56 @@ def get_trip_detail(user_id: int, trip_id: int) -> Optional[Dict]:
     """Lấy chi tiết 1 trip theo trip_id (timestamp)."""
     try:
         user_dir = ensure_user_history_dir(user_id)
-        trip_file = user_dir / f"trip_{trip_id}.json"
-        
-        if not trip_file.exists():
-            return None
-        
-        with open(trip_file, "r", encoding="utf-8") as f:
-            trip = json.load(f)
-        
-        return trip
+        trip_file = _trip_file(user_dir, trip_id)
+        if trip_file is not None:
+            return _read_trip_file(trip_file)
+
+        entry = _index_entry(user_id, trip_id)
+        blob = _read_segment_blob(user_dir, entry) if entry else None
+        return _decode_blob(blob) if blob else None
     except Exception as e:
         print(f"❌ Error getting trip detail: {e}")
         return None
 
 
+def get_trip_detail_gzip(user_id: int, trip_id: int) -> Optional[bytes]:
+    """
+    Bytes gzip đã lưu của 1 trip (chính là body response chi tiết trip, file lẻ hoặc 1 đoạn của segment),
+    None nếu trip không có / đang lưu ở định dạng cũ.
+    """
+    user_dir = ensure_user_history_dir(user_id)
+    try:
+        with open(user_dir / f"trip_{trip_id}{GZIP_SUFFIX}", "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    if _trip_file(user_dir, trip_id) is not None:
+        return None
+    entry = _index_entry(user_id, trip_id)
+    return _read_segment_blob(user_dir, entry) if entry else None
+
+
 def delete_trip(user_id: int, trip_id: int) -> bool:
-    """Xóa 1 trip file."""
+    """
+    Xóa 1 trip (file lẻ thì xóa file, trip trong segment thì ghi tombstone rồi bỏ khỏi index,
+    compaction sẽ dọn). Giữ lock index suốt thao tác => không chen vào giữa compaction.
+    """
     try:
         user_dir = ensure_user_history_dir(user_id)
-        trip_file = user_dir / f"trip_{trip_id}.json"
-        
-        if trip_file.exists():
-            trip_file.unlink()
-            print(f"✅ Deleted trip {trip_id} for user {user_id}")
-            return True
+        with _index_lock(user_id):
+            trip_file = _trip_file(user_dir, trip_id)
+            
+            if trip_file is not None:
+                trip_file.unlink()
+                _update_index(user_id, remove_id=trip_id)
+                print(f"✅ Deleted trip {trip_id} for user {user_id}")
+                return True
+            
+            if _segment_files(user_dir):
+                _add_tombstones(user_dir, [trip_id])
+            if _update_index(user_id, remove_id=trip_id):
+                print(f"✅ Deleted trip {trip_id} for user {user_id}")
+                return True
         
         return False
     except Exception as e:
@@ -101,8 +485,11 @@ def delete_all_trips(user_id: int) -> bool:
     try:
         user_dir = ensure_user_history_dir(user_id)
         
-        for trip_file in user_dir.glob("trip_*.json"):
-            trip_file.unlink()
+        with _index_lock(user_id):
+            for trip_file in _trip_files(user_dir) + _segment_files(user_dir):
+                trip_file.unlink()
+            _write_index(user_dir, [])
+            (user_dir / TOMBSTONE_FILE).unlink(missing_ok=True)
         
         print(f"✅ Deleted all trips for user {user_id}")
         return True
@@ -112,14 +499,187 @@ def delete_all_trips(user_id: int) -> bool:
 
 
 def update_trip_access_time(user_id: int, trip_id: int) -> bool:
-    """Cập nhật trip: xóa cũ, tạo mới với timestamp hiện tại (move lên top)."""
+    """
+    Đánh dấu trip vừa được mở (accessed_at trong index) thay vì xóa rồi ghi lại cả file.
+    Retention tính "mới dùng" theo accessed_at nên trip hay mở không bị dọn.
+    """
     try:
-        old_trip = get_trip_detail(user_id, trip_id)
-        if not old_trip:
-            return False
-        
-        delete_trip(user_id, trip_id)
-        return save_trip_to_file(user_id, old_trip)
+        return _update_index(user_id, touch_id=trip_id)
     except Exception as e:
         print(f"❌ Error updating trip access time: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+# ===== RETENTION + COMPACTION =====
+
+def _last_used_ms(entry: Dict) -> int:
+    return max(entry.get("accessed_at") or 0, entry.get("id") or 0)
+
+
+def needs_compaction(
+    summaries: List[Dict],
+    max_trips: Optional[int] = TRIP_HISTORY_MAX_TRIPS_PER_USER,
+    max_age_days: Optional[int] = TRIP_HISTORY_MAX_AGE_DAYS,
+    min_files: int = TRIP_HISTORY_COMPACT_MIN_FILES,
+) -> bool:
+    """Chỉ nhìn index: nhiều file lẻ, vượt số trip tối đa hoặc có trip quá hạn (retention bật)."""
+    if max_trips is not None and len(summaries) > max_trips:
+        return True
+    if sum(1 for t in summaries if not t.get("segment")) >= min_files:
+        return True
+    if max_age_days and summaries:
+        cutoff = int(datetime.now(timezone.utc).timestamp() * 1000) - max_age_days * 86_400_000
+        return min(_last_used_ms(t) for t in summaries) < cutoff
+    return False
+
+
+def _trip_blob(user_dir: Path, entry: Dict, loose: Dict[int, Path]) -> Optional[bytes]:
+    path = loose.get(entry.get("id"))
+    if path is not None and path.name.endswith(GZIP_SUFFIX):
+        return path.read_bytes()
+    if path is not None:
+        return _encode_trip(_read_trip_file(path))   # định dạng cũ => nén luôn
+    return _read_segment_blob(user_dir, entry)
+
+
+def _append_blobs(out, user_dir: Path, entries: List[Dict], loose: Dict[int, Path], segment_name: str) -> List[Dict]:
+    """Ghi blob của các trip vào cuối file segment đang mở, trả về entry index với vị trí mới."""
+    written = []
+    for entry in entries:
+        blob = _trip_blob(user_dir, entry, loose)
+        if not blob:
+            continue
+        entry = {k: v for k, v in entry.items() if k not in ("segment", "offset", "length")}
+        entry.update(segment=segment_name, offset=out.tell(), length=len(blob))
+        out.write(blob)
+        written.append(entry)
+    return written
+
+
+def compact_user_history(
+    user_id: int,
+    max_trips: Optional[int] = TRIP_HISTORY_MAX_TRIPS_PER_USER,
+    max_age_days: Optional[int] = TRIP_HISTORY_MAX_AGE_DAYS,
+    fsync: bool = TRIP_HISTORY_FSYNC,
+    max_garbage: float = TRIP_HISTORY_SEGMENT_MAX_GARBAGE,
+) -> Dict:
+    """
+    Retention + gộp file cho 1 user:
+    1. Retention (chỉ khi bật): giữ tối đa max_trips trip dùng gần nhất (accessed_at / id),
+       bỏ trip không dùng quá max_age_days. Trip bị bỏ nằm trong segment => ghi tombstone trước
+    2. Nối các file trip lẻ vào cuối segment hiện tại (fsync), cập nhật vị trí vào index, xóa file lẻ
+    3. Chỉ khi trip đã xóa chiếm quá max_garbage dung lượng segment (hoặc còn nhiều segment cũ)
+       mới ghi lại 1 segment mới (file tạm -> fsync -> rename), xóa segment cũ + tombstone
+
+    File trip được ghi xong nhưng chưa kịp vào index (writer đang chạy) thì không bị đụng tới.
+    """
+    with _index_lock(user_id):
+        user_dir = ensure_user_history_dir(user_id)
+        summaries = _read_index(user_dir)
+        if summaries is None:
+            summaries = rebuild_index(user_id)
+
+        now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        cutoff = now_ms - max_age_days * 86_400_000 if max_age_days else None
+        ranked = sorted(summaries, key=_last_used_ms, reverse=True)
+        keep = [t for t in ranked[:max_trips] if cutoff is None or _last_used_ms(t) >= cutoff]
+        keep.sort(key=lambda t: t.get("id") or 0, reverse=True)
+        keep_ids = {t.get("id") for t in keep}
+        removed = [t for t in summaries if t.get("id") not in keep_ids]
+
+        known_ids = {t.get("id") for t in summaries}
+        loose = {
+            trip_id: path for path in _trip_files(user_dir)
+            if (trip_id := _trip_id_of(path)) in known_ids
+        }
+        old_segments = _segment_files(user_dir)
+        segment_bytes = sum(p.stat().st_size for p in old_segments)
+        live_bytes = sum(t.get("length") or 0 for t in keep if t.get("segment") and t.get("id") not in loose)
+        rewrite = len(old_segments) > 1 or (
+            segment_bytes > 0 and segment_bytes - live_bytes > segment_bytes * max_garbage
+        )
+
+        # Trip trong segment bị retention bỏ: tombstone trước khi bỏ khỏi index
+        _add_tombstones(user_dir, [t.get("id") for t in removed if t.get("segment")], fsync)
+
+        if rewrite:
+            segment_name = f"{SEGMENT_PREFIX}{now_ms}{SEGMENT_SUFFIX}"
+            tmp_file = user_dir / f"{segment_name}.tmp"
+            with open(tmp_file, "wb") as out:
+                written = _append_blobs(out, user_dir, keep, loose, segment_name)
+                if fsync:
+                    out.flush()
+                    os.fsync(out.fileno())
+            if written:
+                os.replace(tmp_file, user_dir / segment_name)
+            else:
+                tmp_file.unlink()
+        else:
+            segment_path = old_segments[0] if old_segments else user_dir / f"{SEGMENT_PREFIX}{now_ms}{SEGMENT_SUFFIX}"
+            segment_name = segment_path.name
+            in_segment = [t for t in keep if t.get("segment") and t.get("id") not in loose]
+            to_append = [t for t in keep if t.get("id") in loose]
+            with open(segment_path, "ab") as out:
+                size = out.tell()
+                try:
+                    appended = _append_blobs(out, user_dir, to_append, loose, segment_name)
+                    if fsync:
+                        out.flush()
+                        os.fsync(out.fileno())
+                except Exception:
+                    out.truncate(size)   # không để đoạn ghi dở ở cuối segment
+                    raise
+            if size == 0 and not appended:
+                segment_path.unlink(missing_ok=True)
+            written = sorted(in_segment + appended, key=lambda t: t.get("id") or 0, reverse=True)
+
+        if fsync:
+            _fsync_dir(user_dir)
+        _write_index(user_dir, written)
+
+        for path in loose.values():
+            path.unlink(missing_ok=True)
+        if rewrite:
+            for segment in old_segments:
+                if segment.name != segment_name:
+                    segment.unlink(missing_ok=True)
+            # Segment mới chỉ chứa trip còn giữ => tombstone cũ không cần nữa
+            (user_dir / TOMBSTONE_FILE).unlink(missing_ok=True)
+
+    return {
+        "user_id": user_id,
+        "kept": len(written),
+        "removed": len(summaries) - len(written),
+        "merged_files": len(loose),
+        "segment": segment_name if written else None,
+        "rewritten": rewrite,
+    }
+
+
+def maybe_compact_user(user_id: int) -> Optional[Dict]:
+    """Compact nếu index cho thấy cần (gọi sau khi ghi trip, rẻ: chỉ đọc index.json)."""
+    summaries = _read_index(ensure_user_history_dir(user_id))
+    if summaries is None or not needs_compaction(summaries):
+        return None
+    return compact_user_history(user_id)
+
+
+def list_history_user_ids() -> List[int]:
+    root = Path(TRIP_HISTORY_DIR)
+    if not root.exists():
+        return []
+    with os.scandir(root) as entries:
+        return [int(e.name) for e in entries if e.is_dir() and e.name.isdigit()]
+
+
+def compact_all_users() -> List[Dict]:
+    """Chạy retention / compaction cho mọi user cần (job định kỳ + script)."""
+    results = []
+    for user_id in list_history_user_ids():
+        try:
+            result = maybe_compact_user(user_id)
+            if result is not None:
+                results.append(result)
+        except Exception as e:
+            print(f"❌ Error compacting trip history of user {user_id}: {e}")
+    return results
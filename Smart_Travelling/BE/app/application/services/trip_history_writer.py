@@ -0,0 +1,197 @@
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.application.services import trip_history_file_service
+from app.config.setting import (
+    TRIP_HISTORY_QUEUE_MAX,
+    TRIP_HISTORY_BATCH_MAX,
+    TRIP_HISTORY_PUT_TIMEOUT_SECONDS,
+)
+
+
+# Ghi lịch sử trip ở background để request tạo lịch trình không phải chờ đĩa:
+# request chỉ đưa (user_id, record) vào hàng đợi, 1 thread riêng gom theo lô rồi ghi
+# (trip_history_file_service.write_trip_files: file tạm + fsync + rename, index 1 lần / user).
+# Hàng đợi đầy => chờ 1 chút, vẫn đầy thì ghi luôn trên thread của request (không làm mất trip).
+# Sau mỗi lô, user nào có nhiều file trip lẻ / vượt giới hạn thì được compact luôn trên thread này.
+
+# Chỉ để đánh thức writer đang chờ get(), lệnh dừng thật là cờ _stopping
+_STOP = object()
+
+
+class TripHistoryWriter:
+    def __init__(
+        self,
+        maxsize: int = TRIP_HISTORY_QUEUE_MAX,
+        batch_max: int = TRIP_HISTORY_BATCH_MAX,
+        put_timeout: float = TRIP_HISTORY_PUT_TIMEOUT_SECONDS,
+    ):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._batch_max = batch_max
+        self._put_timeout = put_timeout
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "sync_fallbacks": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "last_batch_size": 0,
+            "last_batch_ms": 0.0,
+            "compactions": 0,
+        }
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="trip-history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Ghi nốt các trip còn trong hàng đợi rồi dừng thread.
+        Lệnh dừng là cờ (writer kiểm tra trước mỗi lần chờ hàng đợi) => không bao giờ bị mất
+        kể cả khi hàng đợi đầy. Writer chậm quá timeout thì thread gọi ghi nốt cùng
+        => lifespan không bị treo ở shutdown.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass    # hàng đợi còn trip => writer không nằm chờ get(), sẽ thấy cờ dừng
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._drain()
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _drain(self) -> None:
+        """Ghi hết những gì đang trong hàng đợi trên thread hiện tại (theo lô)."""
+        while True:
+            batch = []
+            while len(batch) < self._batch_max:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    batch.append(item)
+            if not batch:
+                return
+            self._write(batch)
+
+    def submit(self, user_id: int, trip_data: Dict) -> Dict:
+        """Đưa 1 trip vào hàng đợi, trả về record (đã có id / created_at)."""
+        record = trip_history_file_service.new_trip_record(trip_data)
+        try:
+            self._queue.put((user_id, record), timeout=self._put_timeout)
+        except queue.Full:
+            # Back-pressure: writer không theo kịp => request này tự ghi
+            self._bump("sync_fallbacks")
+            self._write([(user_id, record)])
+            return record
+
+        self._bump("enqueued")
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return record
+
+    def _write(self, batch: List[Tuple[int, Dict]]) -> None:
+        start = time.perf_counter()
+        try:
+            trip_history_file_service.write_trip_files(batch)
+            self._bump("written", len(batch))
+        except Exception as e:
+            self._bump("failed", len(batch))
+            print(f"❌ Error writing trip history batch: {e}")
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        for user_id in {user_id for user_id, _ in batch}:
+            try:
+                if trip_history_file_service.maybe_compact_user(user_id) is not None:
+                    self._bump("compactions")
+            except Exception as e:
+                print(f"❌ Error compacting trip history of user {user_id}: {e}")
+
+    def _run(self) -> None:
+        while True:
+            if self._stopping.is_set():
+                # Đã có lệnh dừng: ghi nốt những gì còn lại rồi thoát
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+            else:
+                item = self._queue.get()
+
+            batch = []
+            if item is not _STOP:
+                batch.append(item)
+
+            # Gom thêm những gì đang chờ sẵn (không đợi) để fsync / ghi index 1 lần cho cả lô
+            while len(batch) < self._batch_max:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    batch.append(item)
+
+            if batch:
+                self._write(batch)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            data = dict(self._stats)
+        data["queue_depth"] = self._queue.qsize()
+        data["queue_max"] = self._queue.maxsize
+        data["running"] = self._thread is not None and self._thread.is_alive()
+        return data
+
+
+# Writer dùng chung cho cả app, start / stop trong lifespan
+_writer: Optional[TripHistoryWriter] = None
+
+
+def start_writer() -> TripHistoryWriter:
+    global _writer
+    if _writer is None:
+        _writer = TripHistoryWriter()
+    _writer.start()
+    return _writer
+
+
+def stop_writer() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+def submit_trip(user_id: int, trip_data: Dict) -> bool:
+    """Lưu trip ở background; writer chưa chạy (script / test) thì ghi ngay."""
+    if _writer is None:
+        return trip_history_file_service.save_trip_to_file(user_id, trip_data)
+    _writer.submit(user_id, trip_data)
+    return True
+
+
+def get_stats() -> Optional[Dict]:
+    return _writer.stats() if _writer is not None else None
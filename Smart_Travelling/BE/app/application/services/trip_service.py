@@ -1,9 +1,12 @@
 from typing import Dict
 from app.application.itinerary.itineray_engine import build_trip_itinerary
+from app.application.itinerary.trip_variants import build_trip_variants
+from app.application.itinerary.trip_evaluator import rank_trips
 from app.api.schemas.itinerary_request import ItineraryRequest
 from app.adapters.repositories.food_repository import fetch_food_places_by_city
 from app.adapters.repositories.places_repository import fetch_place_lites_by_city
 from app.adapters.repositories.accommodation_repository import fetch_accommodations_by_city
+from app.application.services import catalog_service
 from app.domain.entities.itinerary_spot import place_lite_to_spot, food_place_to_spot, accommodation_to_spot
 
 
@@ -14,15 +17,23 @@ def get_trip_itinerary(req: ItineraryRequest):
     - Chuyển đổi dữ liệu thô sang ItinerarySpot
     - Gọi trip engine để xây dựng lịch trình
     """
-    #  Lấy dữ liệu từ DB
-    place_lites    =  fetch_place_lites_by_city(req.city)
-    food_places    =  fetch_food_places_by_city(req.city)
+    #  Lấy dữ liệu từ catalog trong bộ nhớ (snapshot / DB lúc khởi động),
+    #  catalog chưa được load thì query DB như cũ
+    place_lites    =  catalog_service.get_city_places(req.city)
+    if place_lites is None:
+        place_lites = fetch_place_lites_by_city(req.city)
+    food_places    =  catalog_service.get_city_foods(req.city)
+    if food_places is None:
+        food_places = fetch_food_places_by_city(req.city)
 
     # Convert sang ItinerarySpot
     visit_spots = [place_lite_to_spot(p) for p in place_lites]
     food_spots  = [food_place_to_spot(f) for f in food_places]
 
 
+    if req.variants > 1:
+        return _best_trip_variant(req, visit_spots, food_spots)
+
     # Gọi trip engine
     trip = build_trip_itinerary(
         req=req,
@@ -30,4 +41,19 @@ def get_trip_itinerary(req: ItineraryRequest):
         food_spots=food_spots,
     )
 
+    return trip
+
+
+def _best_trip_variant(req: ItineraryRequest, visit_spots, food_spots) -> Dict:
+    """
+    Build req.variants phương án (dùng chung spots / AI score / cụm theo ngày), chấm điểm và trả về
+    phương án tốt nhất; variants_mode = "all" thì các phương án còn lại nằm trong "alternatives".
+    """
+    trips = build_trip_variants(req, visit_spots, food_spots, req.variants)
+    ranked = rank_trips(trips, visit_spots, food_spots, req.preferred_tags)
+
+    best_score, best = ranked[0]
+    trip = {**best, "variant_score": best_score}
+    if req.variants_mode == "all":
+        trip["alternatives"] = [{**t, "variant_score": score} for score, t in ranked[1:]]
     return trip
\ No newline at end of file
@@ -0,0 +1,260 @@
+import gzip
+import json
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:     # Windows: không khóa giữa các process (chạy 1 worker)
+    fcntl = None
+
+from app.config.setting import TRIP_STATS_FILE, TRIP_STATS_TOP_MAX
+from app.utils.city_registry import canonical_city_key
+from app.utils.quantile_sketch import QuantileSketch
+
+
+# Thống kê cộng dồn trên các trip đã lưu, cập nhật ngay khi ghi trip (write_trip_files)
+# nên không phải đọc lại lịch sử JSON của từng user:
+# - số lần mỗi địa điểm / món ăn được xếp vào lịch trình theo city
+# - phân bố số ngày của trip theo city
+# - sketch phân vị tổng chi phí trip theo city
+# Lưu gọn ra 1 file JSON gzip (file tạm + rename), flush định kỳ trong lifespan.
+# Nhiều worker (process) dùng chung 1 file: mỗi worker chỉ giữ phần cộng thêm chưa ghi (_pending),
+# lúc ghi thì khóa file, đọc lại, cộng phần của mình vào rồi mới ghi => không đè số liệu của nhau,
+# thống kê trong bộ nhớ sau mỗi lần ghi = số liệu chung của mọi worker.
+
+COST_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class CityTripStats:
+    def __init__(self):
+        self.trips = 0
+        self.place_picks: Counter = Counter()
+        self.food_picks: Counter = Counter()
+        self.num_days: Counter = Counter()
+        self.cost = QuantileSketch()
+
+    def add(self, trip: Dict) -> None:
+        self.trips += 1
+        if trip.get("num_days"):
+            self.num_days[int(trip["num_days"])] += 1
+        if trip.get("total_cost") is not None:
+            self.cost.add(trip["total_cost"])
+        for day in (trip.get("trip_data") or {}).get("days") or []:
+            for items in (day.get("blocks") or {}).values():
+                for item in items or []:
+                    place_id = item.get("place_id")
+                    if place_id is None:
+                        continue
+                    if item.get("type") == "eat":
+                        self.food_picks[place_id] += 1
+                    else:
+                        self.place_picks[place_id] += 1
+
+    def merge(self, other: "CityTripStats") -> None:
+        self.trips += other.trips
+        self.place_picks.update(other.place_picks)
+        self.food_picks.update(other.food_picks)
+        self.num_days.update(other.num_days)
+        self.cost.merge(other.cost)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trips": self.trips,
+            "places": dict(self.place_picks),
+            "foods": dict(self.food_picks),
+            "days": dict(self.num_days),
+            "cost": self.cost.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CityTripStats":
+        stats = cls()
+        stats.trips = data.get("trips", 0)
+        stats.place_picks = Counter({int(k): v for k, v in (data.get("places") or {}).items()})
+        stats.food_picks = Counter({int(k): v for k, v in (data.get("foods") or {}).items()})
+        stats.num_days = Counter({int(k): v for k, v in (data.get("days") or {}).items()})
+        stats.cost = QuantileSketch.from_dict(data.get("cost") or {})
+        return stats
+
+    def summary(self, top: int) -> Dict:
+        return {
+            "trips": self.trips,
+            "top_places": [{"place_id": pid, "count": n} for pid, n in self.place_picks.most_common(top)],
+            "top_foods": [{"food_id": fid, "count": n} for fid, n in self.food_picks.most_common(top)],
+            "num_days": {str(d): n for d, n in sorted(self.num_days.items())},
+            "cost": {
+                "count": self.cost.count,
+                "min": self.cost.min,
+                "max": self.cost.max,
+                "mean": round(self.cost.mean()) if self.cost.count else None,
+                **{f"p{int(q * 100)}": _round(self.cost.quantile(q)) for q in COST_QUANTILES},
+            },
+        }
+
+
+def _round(value: Optional[float]) -> Optional[int]:
+    return round(value) if value is not None else None
+
+
+_lock = threading.Lock()
+_save_lock = threading.Lock()
+# Số liệu đang phục vụ (file lúc ghi / đọc gần nhất + phần cộng thêm của worker này)
+_cities: Dict[str, CityTripStats] = {}
+# Phần cộng thêm của worker này chưa ghi xuống file
+_pending: Dict[str, CityTripStats] = {}
+# reset() => lần ghi sau thay hẳn file (tính lại từ lịch sử) thay vì cộng dồn
+_replace = False
+
+
+def _add_to(cities: Dict[str, CityTripStats], city_key: str, trip: Dict) -> None:
+    stats = cities.get(city_key)
+    if stats is None:
+        stats = cities[city_key] = CityTripStats()
+    stats.add(trip)
+
+
+def record_trips(trips: Iterable[Dict]) -> None:
+    """Cộng các trip vừa lưu vào thống kê (O(số item của trip), không đọc đĩa)."""
+    with _lock:
+        for trip in trips:
+            city_key = canonical_city_key(trip.get("city"))
+            if not city_key:
+                continue
+            _add_to(_cities, city_key, trip)
+            _add_to(_pending, city_key, trip)
+
+
+def reset() -> None:
+    global _replace
+    with _lock:
+        _cities.clear()
+        _pending.clear()
+        _replace = True
+
+
+def get_overview(top: int = 10) -> Dict:
+    top = min(top, TRIP_STATS_TOP_MAX)
+    with _lock:
+        total = QuantileSketch()
+        num_days: Counter = Counter()
+        for stats in _cities.values():
+            total.merge(stats.cost)
+            num_days.update(stats.num_days)
+        cities = sorted(_cities.items(), key=lambda kv: kv[1].trips, reverse=True)
+        return {
+            "trips": sum(s.trips for _, s in cities),
+            "cities": [{"city": key, "trips": s.trips} for key, s in cities[:top]],
+            "num_days": {str(d): n for d, n in sorted(num_days.items())},
+            "cost": {f"p{int(q * 100)}": _round(total.quantile(q)) for q in COST_QUANTILES},
+        }
+
+
+def get_city_stats(city: str, top: int = 10) -> Optional[Dict]:
+    top = min(top, TRIP_STATS_TOP_MAX)
+    with _lock:
+        stats = _cities.get(canonical_city_key(city))
+        return stats.summary(top) if stats else None
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Khóa giữa các worker khi đọc - cộng - ghi file thống kê."""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(path.name + ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_file(path: Path) -> Dict[str, CityTripStats]:
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(gzip.decompress(f.read()))
+    except FileNotFoundError:
+        return {}
+    return {city: CityTripStats.from_dict(d) for city, d in data.items()}
+
+
+def save_stats(path: Path = TRIP_STATS_FILE, force: bool = False) -> bool:
+    """Cộng phần chưa ghi của worker này vào file (hoặc thay file sau reset), nếu có thay đổi."""
+    global _pending, _cities, _replace
+    path = Path(path)
+    with _save_lock:
+        with _lock:
+            if not (_pending or _replace or force):
+                return False
+            pending, _pending = _pending, {}
+            replace = _replace
+            snapshot = {city: stats.to_dict() for city, stats in _cities.items()} if replace else None
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(path):
+                if replace:
+                    merged = {city: CityTripStats.from_dict(d) for city, d in snapshot.items()}
+                else:
+                    merged = _read_file(path)
+                    for city, stats in pending.items():
+                        merged.setdefault(city, CityTripStats()).merge(stats)
+                payload = json.dumps(
+                    {city: stats.to_dict() for city, stats in merged.items()},
+                    ensure_ascii=False, separators=(",", ":"),
+                ).encode("utf-8")
+                tmp_file = path.with_name(path.name + ".tmp")
+                with open(tmp_file, "wb") as f:
+                    f.write(gzip.compress(payload, mtime=0))
+                os.replace(tmp_file, path)
+        except Exception:
+            # Ghi lỗi: phần chưa ghi trả lại hàng chờ (replace: _cities vẫn đủ, lần sau ghi lại)
+            if not replace:
+                with _lock:
+                    for city, stats in pending.items():
+                        _pending.setdefault(city, CityTripStats()).merge(stats)
+            raise
+
+        with _lock:
+            if replace:
+                _replace = False
+            # Số liệu chung vừa ghi + những gì worker này nhận thêm trong lúc ghi
+            for city, stats in _pending.items():
+                merged.setdefault(city, CityTripStats()).merge(stats)
+            _cities = merged
+    return True
+
+
+def load_stats(path: Path = TRIP_STATS_FILE) -> bool:
+    global _cities, _replace
+    path = Path(path)
+    if not path.exists():
+        return False
+    loaded = _read_file(path)
+    with _lock:
+        for city, stats in _pending.items():
+            loaded.setdefault(city, CityTripStats()).merge(stats)
+        _cities = loaded
+        _replace = False
+    return True
+
+
+def rebuild_from_history(trip_iter: Iterable[Dict]) -> int:
+    """Tính lại toàn bộ từ lịch sử (chỉ dùng 1 lần để khởi tạo / khi file thống kê bị mất)."""
+    reset()
+    count = 0
+    batch: List[Dict] = []
+    for trip in trip_iter:
+        batch.append(trip)
+        count += 1
+        if len(batch) >= 256:
+            record_trips(batch)
+            batch = []
+    record_trips(batch)
+    return count
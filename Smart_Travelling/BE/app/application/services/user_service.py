@@ -1,17 +1,21 @@
-from passlib.context import CryptContext
-from typing import Dict, Optional, List
+import asyncio
+import json
+from typing import Dict, Iterator, Optional, List, Tuple
 from app.adapters.repositories import user_repository      # chỉ import file thì nếu bên trong không có class thì dùng vâyj
 from app.domain.entities.user_entity import UserEntity      #import tận class
+from app.application.services import login_throttle, password_hasher
+from app.config.setting import ADMIN_USERS_PAGE_DEFAULT, ADMIN_USERS_PAGE_MAX, ADMIN_USERS_EXPORT_BATCH
 
 
 #Đăng kí tài khoản
-def register_user(data: Dict) -> bool:
+async def register_user(data: Dict) -> bool:
     
     # Đăng ký tài khoản mới chỉ cần username + password.
-    
+    # Truy vấn DB chạy trên threadpool, hash chạy trên executor riêng của password_hasher
+    # => không chặn event loop.
 
     # Kiểm tra username trùng
-    if user_repository.get_user_by_username(data["username"]):
+    if await asyncio.to_thread(user_repository.get_user_by_username, data["username"]):
         raise ValueError("Username đã tồn tại")
 
     # Tạo UserEntity — KHÔNG truyền toàn bộ data tránh lỗi
@@ -25,30 +29,39 @@ def register_user(data: Dict) -> bool:
         failed_attempts=0,
     )
 
-    # Hash password
-    entity.set_password(data["password"])
+    # Hash password (trên executor riêng của password_hasher)
+    entity.hashed_password = await password_hasher.hash_password_async(data["password"])
+    entity.touch()
 
     # Convert sang dict để lưu DB
     user_dict = entity.model_dump()
    
 
     # Lưu DB
-    return user_repository.create_user(user_dict)
+    return await asyncio.to_thread(user_repository.create_user, user_dict)
 
 #đăng nhập tài khoản
-def login(username: str, password: str) -> Dict:
+async def login(username: str, password: str) -> Dict:
     """
     Đăng nhập người dùng bằng username + password.
     - Nếu sai -> tăng failed_attempts
     - Nếu sai >= 5 -> khóa tài khoản
     - Nếu đúng -> reset failed_attempts và cập nhật updated_at
+
+    Chỉ 1 lần đọc DB; kiểm tra mật khẩu chạy trên executor riêng (password_hasher),
+    số lần sai / reset được login_throttle giữ trong bộ nhớ rồi ghi xuống DB theo lô.
     """
 
     # 1) Lấy user từ DB
-    user_db = user_repository.get_user_by_username(username)
+    user_db = await asyncio.to_thread(user_repository.get_user_by_username, username)
     if user_db is None:
         raise ValueError("Tài khoản không tồn tại.")
 
+    # Trạng thái chưa kịp ghi xuống DB (nếu có) mới là trạng thái đúng
+    failed_attempts, is_active = login_throttle.current_state(
+        user_db["id"], user_db["failed_attempts"], bool(user_db["is_active"])
+    )
+
     # 2) Tạo Entity từ DB để xử lý logic
     entity = UserEntity(
         id=user_db["id"],
@@ -57,8 +70,8 @@ def login(username: str, password: str) -> Dict:
         phone_number=user_db.get("phone_number"),
         hashed_password=user_db["hashed_password"],
         role=user_db["role"],
-        is_active=user_db["is_active"],
-        failed_attempts=user_db["failed_attempts"],
+        is_active=is_active,
+        failed_attempts=failed_attempts,
         created_at=user_db.get("created_at"),
         updated_at=user_db.get("updated_at"),
     )
@@ -68,25 +81,20 @@ def login(username: str, password: str) -> Dict:
         raise ValueError("Tài khoản đã bị khóa. Vui lòng liên hệ admin để mở khóa.")
 
     # 4) Xác thực mật khẩu 
+    ok = await password_hasher.verify_password_async(password, entity.hashed_password)
     try:
-        entity.verify_password(password)   # đúng thì return True, sai thì raise ValueError
+        entity.apply_login_result(ok)   # đúng thì return True, sai thì raise ValueError
 
     except ValueError as e:
-
-        # Trường hợp bị khóa do sai quá 5 lần
-        if not entity.is_active:
-            user_repository.deactivate_user(entity.id)
-
-        # Trường hợp chỉ sai < 5 lần → cập nhật failed_attempts
-        else:
-            user_repository.update_failed_attempts(entity.id, entity.failed_attempts)
-
+        # Sai < 5 lần: chờ ghi theo lô; sai quá 5 lần: khóa (login_throttle ghi ngay)
+        await asyncio.to_thread(login_throttle.record_failure, entity.id, not entity.is_active)
         raise e   # ném lỗi lên router hoặc API
 
     # xuống tới đây tức là nhập đúng rồi
 
-    # Reset số lần nhập sai
-    user_repository.reset_failed_attempts(entity.id)
+    # Reset số lần nhập sai (chỉ khi trước đó có sai, ghi theo lô)
+    if failed_attempts:
+        login_throttle.record_success(entity.id)
 
     # Trả dữ liệu an toàn
     return entity.to_safe_dict()
@@ -214,6 +222,7 @@ def admin_deactivate_user(user_id: int) -> bool:
         raise ValueError("User không tồn tại")
 
     # Gọi hàm có khóa lại trong repository
+    login_throttle.forget(user_id)
     return user_repository.deactivate_user(user_id)
 
 
@@ -228,7 +237,8 @@ def admin_activate_user(user_id: int) -> bool:
     if user_db is None:
         raise ValueError("User không tồn tại")
 
-    # 1) bật active = True
+    # 1) bật active = True (bỏ trạng thái đăng nhập sai chưa ghi để lô sau không khóa lại)
+    login_throttle.forget(user_id)
     result = user_repository.activate_user(user_id)
     
     # 2) reset số lần nhập sai
@@ -237,20 +247,47 @@ def admin_activate_user(user_id: int) -> bool:
     return result
 
 
+def check_user_columns(columns: Optional[List[str]]) -> None:
+    """Báo lỗi nếu có cột không nằm trong USER_LIST_COLUMNS (thay vì lặng lẽ bỏ qua)."""
+    invalid = [c for c in columns or [] if c not in user_repository.USER_LIST_COLUMNS]
+    if invalid:
+        raise ValueError(
+            f"Cột không hợp lệ: {', '.join(invalid)}. "
+            f"Cột cho phép: {', '.join(user_repository.USER_LIST_COLUMNS)}"
+        )
+
+
 # lấy ra danh sách của user
-def admin_list_all_users() -> List[Dict]:
+def admin_list_users(
+    after_id: int = 0,
+    limit: int = ADMIN_USERS_PAGE_DEFAULT,
+    columns: Optional[List[str]] = None,
+    is_active: Optional[bool] = None,
+    role: Optional[str] = "user",
+) -> Tuple[List[Dict], Optional[int]]:
     """
-    ADMIN – Xem danh sách user (không bao gồm admin).
-    Xoá hashed_password trước khi trả ra API.
+    ADMIN – Xem danh sách user theo trang (keyset theo id), mặc định không gồm admin.
+    Repository chỉ SELECT các cột cho phép (không có hashed_password).
+    Trả về (users, next_after): next_after = None khi đã hết.
     """
+    limit = max(1, min(limit, ADMIN_USERS_PAGE_MAX))
+    users = user_repository.list_users_page(after_id, limit + 1, columns, is_active, role)
+    next_after = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_after = users[-1]["id"]
+    return users, next_after
 
-    users = user_repository.get_all_users()
 
-    # Xoá mật khẩu hash để an toàn
-    for u in users:
-        u.pop("hashed_password", None)
+def admin_export_users_ndjson(
+    columns: Optional[List[str]] = None,
+    is_active: Optional[bool] = None,
+    role: Optional[str] = "user",
+) -> Iterator[bytes]:
+    """ADMIN – Xuất user dạng NDJSON (mỗi dòng 1 user), đọc theo lô nên bộ nhớ không tăng theo số user."""
+    for row in user_repository.iter_users(columns, is_active, role, ADMIN_USERS_EXPORT_BATCH):
+        yield (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
 
-    return users
 
 #xóa user
 def admin_delete_user(user_id: int) -> bool:
@@ -262,6 +299,7 @@ def admin_delete_user(user_id: int) -> bool:
     if user_db is None:
         raise ValueError("User không tồn tại")
 
+    login_throttle.forget(user_id)
     return user_repository.delete_user(user_id)
 
 
@@ -1,8 +1,37 @@
-from typing import List, Set, Optional, Tuple
+import heapq
+import secrets
+from dataclasses import dataclass
+from typing import Iterable, List, Set, Optional, Tuple
 
 from app.adapters.repositories.places_repository import fetch_place_lites_by_city
 from app.adapters.repositories import user_repository
+from app.application.services import catalog_service
+from app.config.setting import VISITOR_CURSOR_MAX, VISITOR_CURSOR_TTL_SECONDS
 from app.domain.entities.place_lite import PlaceLite
+from app.utils import tag_vocab
+from app.utils.city_registry import canonical_city_key
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass
+class VisitorCursor:
+    """
+    State của 1 cursor carousel, giữ ở server (client chỉ giữ token):
+    - index = vị trí trong list xếp hạng của city (catalog_service.get_city_ranked_places)
+    - seen: bitmap các index đã gợi ý, pos: vị trí kế tiếp trong thứ tự gợi ý
+    """
+    city_key: str
+    source: str        # version catalog lúc tạo cursor, catalog đổi thì index không còn đúng
+    user_mask: int     # tag sở thích lúc tạo cursor
+    pos: int = 0
+    seen: int = 0
+    seen_count: int = 0
+
+
+# token -> VisitorCursor
+_cursors = TTLCache(maxsize=VISITOR_CURSOR_MAX, ttl=VISITOR_CURSOR_TTL_SECONDS)
+# (source, city key, user_mask) -> thứ tự index gợi ý, dùng chung cho các cursor cùng sở thích
+_orders = TTLCache(maxsize=1024, ttl=VISITOR_CURSOR_TTL_SECONDS)
 
 
 def recommend_places_by_city(
@@ -17,7 +46,8 @@ def recommend_places_by_city(
     Logic:
         1. Lấy user tags (nếu có)
         2. Tính match_score cho mỗi place
-        3. Sort theo: match_score (cao → thấp), popularity (cao → thấp)
+        3. Chọn top k theo: match_score (cao → thấp), popularity (cao → thấp)
+           (heap trên list đã xếp sẵn theo popularity, không sort lại mỗi request)
         4. Lấy top k
         5. Cập nhật seen_ids, reset khi hết
     
@@ -31,69 +61,133 @@ def recommend_places_by_city(
         (list_place, new_seen_ids)
     """
 
-    # 1. Lấy data từ DB
-    places: List[PlaceLite] = fetch_place_lites_by_city(city)
+    # 1. Lấy danh sách đã xếp theo popularity từ catalog (tính sẵn lúc load),
+    #    catalog chưa load thì query DB rồi xếp tại chỗ
+    ranked: Optional[List[Tuple[PlaceLite, int]]] = catalog_service.get_city_ranked_places(city)
+    if ranked is None:
+        ranked = catalog_service.rank_by_popularity(fetch_place_lites_by_city(city))
 
-    if not places:
+    if not ranked:
         return [], (seen_ids or set())
 
     # 2. Chuẩn hoá seen_ids
     if seen_ids is None:
         seen_ids = set()
 
-    # 3. Lấy tags sở thích của user
-    user_tags: Set = set()
+    # 3. Lấy tags sở thích của user (bitset theo tag_vocab)
+    user_mask = 0
     if user_id is not None:
-        user_tags_list = user_repository.get_user_tags(user_id) or []
-        user_tags = set(user_tags_list)
+        user_mask = tag_vocab.lookup_mask(user_repository.get_user_tags(user_id) or [])
 
-    # 4. Lọc ra những địa điểm chưa từng gợi ý
-    remain: List[PlaceLite] = []
-    for p in places:
-        if p.id is None:
-            remain.append(p)
-        elif p.id not in seen_ids:
-            remain.append(p)
+    # 4. Lọc ra những địa điểm chưa từng gợi ý (vẫn giữ thứ tự popularity)
+    remain = [(p, mask) for p, mask in ranked if p.id is None or p.id not in seen_ids]
 
     # 5. Nếu số lượng còn lại < k => reset seen_ids
     if len(remain) < k:
         seen_ids.clear()
-        remain = places[:]
+        remain = ranked
 
     # ===== 6. LOGIC GỢI Ý =====
 
-    if user_tags and len(user_tags) > 0:
-        # CÓ USER TAGS: Tính score + sort theo score + popularity
-
-        place_scores = {}
-        # Tính match_score cho mỗi place
-        for place in remain:
-            place_tags = set(place.tags or [])
-            matching_tags = place_tags & user_tags
-            num_matching = len(matching_tags)
-            # match_score = số tag trùng / tổng số user tags
-            match_score = num_matching / len(user_tags)
-            place_scores[place.id] = match_score
-        
-        # SORT theo: match_score (cao → thấp), popularity (cao → thấp)
-        remain.sort(
-            key=lambda p: (
-                place_scores.get(p.id, 0),  # Match score từ dict
-                p.popularity or 0
-            ),
-            reverse=True
+    if user_mask:
+        # CÓ USER TAGS: top k theo (số tag trùng, popularity) bằng heap, không sort cả list
+        # (match_score = số tag trùng / số user tags => so số tag trùng là đủ)
+        top = heapq.nlargest(
+            k,
+            remain,
+            key=lambda pm: (tag_vocab.count_common(pm[1], user_mask), pm[0].popularity or 0),
         )
-
     else:
-        # KHÔNG CÓ USER TAGS: Lấy top k theo popularity
-        remain.sort(key=lambda p: p.popularity or 0, reverse=True)
+        # KHÔNG CÓ USER TAGS: danh sách đã xếp theo popularity => lấy k phần tử đầu
+        top = remain[:k]
 
     # 7. Lấy top k
-    picked: List[PlaceLite] = remain[:k]
+    picked: List[PlaceLite] = [p for p, _ in top]
 
     # 8. Cập nhật seen_ids
     for p in picked:
         if p.id is not None:
             seen_ids.add(p.id)
 
-    return picked, seen_ids
\ No newline at end of file
+    return picked, seen_ids
+
+
+def _ranked_for_city(city: str) -> Tuple[List[Tuple[PlaceLite, int]], str]:
+    ranked = catalog_service.get_city_ranked_places(city)
+    if ranked is not None:
+        return ranked, catalog_service.get_catalog_source()
+    return catalog_service.rank_by_popularity(fetch_place_lites_by_city(city)), "db"
+
+
+def _recommend_order(
+    ranked: List[Tuple[PlaceLite, int]],
+    source: str,
+    city_key: str,
+    user_mask: int,
+) -> Iterable[int]:
+    """Thứ tự gợi ý: (số tag trùng, popularity) giảm dần; không có tag thì chính là list xếp hạng."""
+    if not user_mask:
+        return range(len(ranked))
+
+    key = (source, city_key, user_mask)
+    order = _orders.get(key)
+    if order is None or len(order) != len(ranked):
+        # sorted ổn định => bằng điểm thì giữ thứ tự popularity, giống heapq.nlargest ở trên
+        order = sorted(
+            range(len(ranked)),
+            key=lambda i: (tag_vocab.count_common(ranked[i][1], user_mask), ranked[i][0].popularity or 0),
+            reverse=True,
+        )
+        _orders.set(key, order)
+    return order
+
+
+def recommend_with_cursor(
+    city: str,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    k: int = 5,
+) -> Tuple[List[PlaceLite], str]:
+    """
+    Gợi ý k địa điểm tiếp theo cho carousel dùng cursor thay cho seen_ids.
+
+    - cursor rỗng / hết hạn / khác city / catalog đã đổi => tạo cursor mới (bắt đầu lại từ đầu)
+    - mỗi lần gọi chỉ đi tiếp từ vị trí cũ trong thứ tự gợi ý (~O(k)), đánh dấu bitmap seen
+    - còn < k địa điểm chưa gợi ý => reset như recommend_places_by_city
+
+    Trả về:
+        (list_place, cursor_token)
+    """
+    ranked, source = _ranked_for_city(city)
+    city_key = canonical_city_key(city)
+
+    state: Optional[VisitorCursor] = _cursors.get(cursor) if cursor else None
+    if state is None or state.city_key != city_key or state.source != source:
+        user_mask = 0
+        if user_id is not None:
+            user_mask = tag_vocab.lookup_mask(user_repository.get_user_tags(user_id) or [])
+        state = VisitorCursor(city_key=city_key, source=source, user_mask=user_mask)
+        cursor = secrets.token_urlsafe(16)
+
+    n = len(ranked)
+    picked: List[PlaceLite] = []
+    if n:
+        order = _recommend_order(ranked, source, city_key, state.user_mask)
+        if n - state.seen_count < k:
+            state.pos, state.seen, state.seen_count = 0, 0, 0
+
+        pos = state.pos
+        while len(picked) < k and pos < n:
+            i = order[pos]
+            pos += 1
+            bit = 1 << i
+            if state.seen & bit:
+                continue
+            state.seen |= bit
+            state.seen_count += 1
+            picked.append(ranked[i][0])
+        state.pos = pos
+
+    # Ghi lại để gia hạn TTL
+    _cursors.set(cursor, state)
+    return picked, cursor
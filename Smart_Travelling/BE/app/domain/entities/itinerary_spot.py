@@ -9,6 +9,7 @@ from .place_lite import PlaceLite  # hoặc path tương ứng
 from .food_place import FoodPlace
 from .accommodation import Accommodation
 from app.utils.time_utils import time_str_to_minutes
+from app.utils import tag_vocab
 
 @dataclass
 class ItinerarySpot:
@@ -19,6 +20,7 @@ class ItinerarySpot:
     - open/close: phút trong ngày
     - price_vnd: giá vé / giá bữa / giá 1 đêm
     - dwell_min: thời lượng chơi/ăn gợi ý
+    - tag_mask: bitset của tags theo tag_vocab (tự tính nếu không truyền vào)
     """
     id: Optional[int]
     name: str
@@ -39,6 +41,11 @@ class ItinerarySpot:
 
     tags: Optional[list[str]] = None
     image_url: Optional[str] = None
+    tag_mask: int = 0
+
+    def __post_init__(self):
+        if not self.tag_mask and self.tags:
+            self.tag_mask = tag_vocab.tag_mask(self.tags)
 
 
 """ Hàm chuyển đổi từ các model khác sang ItinerarySpot"""
@@ -33,7 +33,14 @@ class UserEntity(User):
             Nếu sai >= 5: khóa tài khoản và raise lỗi       
         """
         
-        if not pwd_context.verify(password, self.hashed_password):
+        return self.apply_login_result(pwd_context.verify(password, self.hashed_password))
+
+    def apply_login_result(self, ok: bool) -> bool:
+        """
+        Cập nhật trạng thái sau khi đã kiểm tra mật khẩu (kiểm tra có thể chạy ở nơi khác,
+        vd executor riêng của password_hasher). Quy tắc giống verify_password.
+        """
+        if not ok:
             self.failed_attempts += 1
             self.touch()
             
@@ -0,0 +1,244 @@
+"""
+Snapshot nhị phân dạng cột của catalog (places / food / events).
+
+Cấu trúc thư mục:
+    <base_dir>/CURRENT                    -> tên version mới nhất (ghi atomic)
+    <base_dir>/<version>/manifest.json    -> số dòng + schema từng bảng
+    <base_dir>/<version>/<table>.<col>.npy          cột số (float64, NaN = NULL)
+    <base_dir>/<version>/<table>.<col>.idx.npy      cột chuỗi: (start, end) trong blob, start = -1 là NULL
+    <base_dir>/<version>/<table>.strings.npy        blob UTF-8 dùng chung cho mọi cột chuỗi của bảng
+
+Mỗi file là 1 .npy riêng nên đọc bằng np.load(mmap_mode="r") (không copy vào RAM).
+Các dòng đọc ra có cùng tên cột như kết quả SELECT của repository,
+nên dùng lại được row_to_place_lite / row_to_food_place / row_to_event.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SNAPSHOT_FORMAT = 1
+
+# (tên cột, kiểu): "int" | "float" | "str" | "datetime"
+SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "places": [
+        ("id", "int"), ("name", "str"), ("priceVND", "float"), ("summary", "str"),
+        ("description", "str"), ("openTime", "str"), ("closeTime", "str"), ("phone", "str"),
+        ("rating", "float"), ("reviewCount", "int"), ("popularity", "int"), ("image_url", "str"),
+        ("tags", "str"), ("dwell", "int"), ("category", "str"),
+        ("house_number", "str"), ("street", "str"), ("ward", "str"), ("district", "str"),
+        ("city", "str"), ("lat", "float"), ("lng", "float"),
+    ],
+    "food": [
+        ("id", "int"), ("name", "str"), ("priceVND", "float"), ("summary", "str"),
+        ("description", "str"), ("openTime", "str"), ("closeTime", "str"), ("phone", "str"),
+        ("rating", "float"), ("reviewCount", "int"), ("popularity", "int"), ("image_url", "str"),
+        ("tags", "str"), ("category", "str"), ("cuisine_type", "str"),
+        ("house_number", "str"), ("street", "str"), ("ward", "str"), ("district", "str"),
+        ("city", "str"), ("lat", "float"), ("lng", "float"),
+    ],
+    "events": [
+        ("id", "int"), ("external_id", "str"), ("name", "str"), ("city", "str"), ("region", "str"),
+        ("lat", "float"), ("lng", "float"), ("start_datetime", "datetime"), ("end_datetime", "datetime"),
+        ("session", "str"), ("summary", "str"), ("activities", "str"), ("image_url", "str"),
+        ("price_vnd", "int"), ("popularity", "float"),
+    ],
+}
+
+
+# ========================
+# Entity -> row (tên cột giống SELECT trong repository)
+# ========================
+def _address_row(address) -> Dict[str, Any]:
+    return {
+        "house_number": address.houseNumber if address else None,
+        "street": address.street if address else None,
+        "ward": address.ward if address else None,
+        "district": address.district if address else None,
+        "city": address.city if address else None,
+        "lat": address.lat if address else None,
+        "lng": address.lng if address else None,
+    }
+
+
+def place_to_row(p) -> Dict[str, Any]:
+    row = {
+        "id": p.id, "name": p.name, "priceVND": p.priceVND, "summary": p.summary,
+        "description": p.description, "openTime": p.openTime, "closeTime": p.closeTime,
+        "phone": p.phone, "rating": p.rating, "reviewCount": p.reviewCount,
+        "popularity": p.popularity, "image_url": p.image_url,
+        "tags": json.dumps(p.tags or [], ensure_ascii=False),
+        "dwell": p.dwell, "category": p.category,
+    }
+    row.update(_address_row(p.address))
+    return row
+
+
+def food_to_row(f) -> Dict[str, Any]:
+    row = {
+        "id": f.id, "name": f.name, "priceVND": f.priceVND, "summary": f.summary,
+        "description": f.description, "openTime": f.openTime, "closeTime": f.closeTime,
+        "phone": f.phone, "rating": f.rating, "reviewCount": f.reviewCount,
+        "popularity": f.popularity, "image_url": f.image_url,
+        "tags": json.dumps(f.tags or [], ensure_ascii=False),
+        "category": f.category, "cuisine_type": f.cuisine_type,
+    }
+    row.update(_address_row(f.address))
+    return row
+
+
+def event_to_row(e) -> Dict[str, Any]:
+    return {
+        "id": e.id, "external_id": e.external_id, "name": e.name, "city": e.city,
+        "region": e.region, "lat": e.lat, "lng": e.lng,
+        "start_datetime": e.start_datetime, "end_datetime": e.end_datetime,
+        "session": e.session, "summary": e.summary,
+        "activities": json.dumps(e.activities or [], ensure_ascii=False),
+        "image_url": e.image_url, "price_vnd": e.price_vnd, "popularity": e.popularity,
+    }
+
+
+# ========================
+# Ghi snapshot
+# ========================
+def _encode_table(out_dir: str, table: str, rows: List[Dict[str, Any]]) -> None:
+    blob = bytearray()
+
+    for col, kind in SCHEMAS[table]:
+        values = [row.get(col) for row in rows]
+
+        if kind in ("int", "float"):
+            arr = np.array(
+                [np.nan if v is None else float(v) for v in values],
+                dtype=np.float64,
+            )
+            np.save(os.path.join(out_dir, f"{table}.{col}.npy"), arr)
+            continue
+
+        idx = np.empty((len(values), 2), dtype=np.int64)
+        for i, v in enumerate(values):
+            if v is None:
+                idx[i] = (-1, -1)
+                continue
+            text = v.isoformat() if kind == "datetime" else str(v)
+            data = text.encode("utf-8")
+            idx[i] = (len(blob), len(blob) + len(data))
+            blob.extend(data)
+        np.save(os.path.join(out_dir, f"{table}.{col}.idx.npy"), idx)
+
+    np.save(os.path.join(out_dir, f"{table}.strings.npy"), np.frombuffer(bytes(blob), dtype=np.uint8))
+
+
+def write_snapshot(
+    base_dir: str,
+    tables: Dict[str, List[Dict[str, Any]]],
+    keep: int = 3,
+) -> str:
+    """
+    Ghi 1 version snapshot mới rồi trỏ CURRENT sang version đó, trả về tên version.
+    Ghi vào thư mục tạm trước, xong hết mới đổi tên => worker không bao giờ đọc snapshot dở dang.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tmp_dir = os.path.join(base_dir, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tables": {},
+    }
+    for table, rows in tables.items():
+        _encode_table(tmp_dir, table, rows)
+        manifest["tables"][table] = {"rows": len(rows), "columns": SCHEMAS[table]}
+
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    os.rename(tmp_dir, os.path.join(base_dir, version))
+
+    pointer_tmp = os.path.join(base_dir, "CURRENT.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(base_dir, "CURRENT"))
+
+    _prune_versions(base_dir, keep)
+    return version
+
+
+def _prune_versions(base_dir: str, keep: int) -> None:
+    """Chỉ giữ `keep` version mới nhất (worker cũ có thể vẫn đang mmap version trước đó)."""
+    versions = sorted(
+        name for name in os.listdir(base_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(base_dir, name))
+    )
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(base_dir, name), ignore_errors=True)
+
+
+# ========================
+# Đọc snapshot
+# ========================
+def current_version(base_dir: str) -> Optional[str]:
+    """Version mà CURRENT đang trỏ tới (None nếu chưa có snapshot)."""
+    try:
+        with open(os.path.join(base_dir, "CURRENT"), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    if not version or not os.path.isdir(os.path.join(base_dir, version)):
+        return None
+    return version
+
+
+def _decode_table(snap_dir: str, table: str, columns: List[List[str]], n_rows: int) -> List[Dict[str, Any]]:
+    blob = np.load(os.path.join(snap_dir, f"{table}.strings.npy"), mmap_mode="r")
+    blob_bytes = blob.tobytes() if blob.size else b""
+
+    decoded: Dict[str, List[Any]] = {}
+    for col, kind in columns:
+        if kind in ("int", "float"):
+            arr = np.load(os.path.join(snap_dir, f"{table}.{col}.npy"), mmap_mode="r")
+            if kind == "int":
+                decoded[col] = [None if np.isnan(v) else int(v) for v in arr]
+            else:
+                decoded[col] = [None if np.isnan(v) else float(v) for v in arr]
+            continue
+
+        idx = np.load(os.path.join(snap_dir, f"{table}.{col}.idx.npy"), mmap_mode="r")
+        values: List[Any] = []
+        for start, end in idx:
+            if start < 0:
+                values.append(None)
+                continue
+            text = blob_bytes[start:end].decode("utf-8")
+            values.append(datetime.fromisoformat(text) if kind == "datetime" else text)
+        decoded[col] = values
+
+    names = [col for col, _ in columns]
+    return [{name: decoded[name][i] for name in names} for i in range(n_rows)]
+
+
+def read_snapshot(base_dir: str, version: Optional[str] = None) -> Optional[Tuple[str, Dict[str, List[Dict[str, Any]]]]]:
+    """Đọc snapshot (mặc định version trong CURRENT), trả về (version, {table: [row, ...]})."""
+    version = version or current_version(base_dir)
+    if version is None:
+        return None
+
+    snap_dir = os.path.join(base_dir, version)
+    with open(os.path.join(snap_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+
+    tables = {
+        table: _decode_table(snap_dir, table, info["columns"], info["rows"])
+        for table, info in manifest["tables"].items()
+    }
+    return version, tables
@@ -1,13 +1,26 @@
+import os
+
 import mysql.connector
 from mysql.connector import Error
 
+from app.config.setting import DB_BACKEND
+
+
 def get_db():
     
+    # DB_BACKEND=sqlite: dùng SQLite (không cần MySQL), cùng cách dùng connection / cursor
+    if DB_BACKEND == "sqlite":
+        from app.infrastructure.database import sqlite_backend
+        return sqlite_backend.connect()
+
     try:
-        connection = mysql.connector.connect( host="localhost", user="root", password="Minh12345678!", database="travel")
+        connection = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", "Minh12345678!"),
+            database=os.getenv("DB_NAME", "travel"),
+        )
         return connection
     except Error as e:
         print("Lỗi kết nối MySQL:", e)
         return None
-
-
@@ -0,0 +1,232 @@
+"""
+Backend SQLite thay cho MySQL (DB_BACKEND=sqlite), dùng cho test / benchmark không cần MySQL.
+
+- connect() trả về object có cùng cách dùng với connection của mysql.connector
+  (cursor(dictionary=True), placeholder %s, commit(), close(), lastrowid, rowcount)
+  => repository giữ nguyên code, chỉ get_db() chọn backend.
+- Schema lấy từ DB/sqlite_schema.sql, dữ liệu seed từ Seed_data/places.tsv, food.tsv và DB/user_seed.sql
+  (dùng lại parse_line của các script import).
+- SQLITE_DB_PATH rỗng => DB trong bộ nhớ (shared cache), seed 1 lần cho cả process.
+"""
+
+import json
+import re
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config.setting import BASE_DIR, SQLITE_DB_PATH
+from app.utils.city_registry import canonical_city_key
+
+
+DB_DIR = BASE_DIR.parent / "DB"
+SEED_DIR = BASE_DIR / "Seed_data"
+SCHEMA_FILE = DB_DIR / "sqlite_schema.sql"
+USER_SEED_FILE = DB_DIR / "user_seed.sql"
+
+MEMORY_URI = "file:travel?mode=memory&cache=shared"
+
+_PARAM_RE = re.compile(r"%\((\w+)\)s|%s")
+
+_lock = threading.Lock()
+_ready = False
+_keeper: Optional[sqlite3.Connection] = None   # giữ DB trong bộ nhớ sống suốt process
+
+
+# DATETIME / TIMESTAMP <-> datetime giống mysql.connector
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(" "))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_converter("DATETIME", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+
+
+def _translate(sql: str) -> str:
+    """%s -> ?, %(name)s -> :name"""
+    return _PARAM_RE.sub(lambda m: f":{m.group(1)}" if m.group(1) else "?", sql)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def _row(self, row):
+        if row is None:
+            return None
+        if self._dictionary:
+            return {key: row[key] for key in row.keys()}
+        return tuple(row)
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None):
+        self._cursor.execute(_translate(sql), params if params is not None else ())
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._cursor.executemany(_translate(sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self) -> List:
+        return [self._row(r) for r in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self, dictionary: bool = False, **_) -> SQLiteCursor:
+        return SQLiteCursor(self._conn.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+    def is_connected(self) -> bool:
+        return True
+
+
+def _raw_connect(path: str) -> sqlite3.Connection:
+    if path:
+        conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(
+            MEMORY_URI, uri=True, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+        )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _sql_statements(path: Path) -> List[str]:
+    """Tách file .sql thành từng câu lệnh, bỏ comment và USE <db>."""
+    lines = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--") or stripped.upper().startswith("USE "):
+            continue
+        lines.append(line)
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def _load_parsers():
+    """Dùng lại parse_line của script import (Seed_data không phải package)."""
+    if str(SEED_DIR) not in sys.path:
+        sys.path.insert(0, str(SEED_DIR))
+    import import_places
+    import import_food
+    import bulk_import
+    return import_places, import_food, bulk_import
+
+
+def _insert_spots(conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]], external_key, columns) -> None:
+    seen = set()
+    for row in rows:
+        key = external_key(row)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        cur = conn.execute(
+            """
+            INSERT INTO addresses (external_key, house_number, street, ward, district, city, city_norm, lat, lng)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key, row.get("house_number"), row.get("street"), row.get("ward"),
+                row.get("district"), row.get("city"), canonical_city_key(row.get("city")) or None,
+                row.get("lat"), row.get("lng"),
+            ),
+        )
+        values = dict(row)
+        values["external_key"] = key
+        values["address_id"] = cur.lastrowid
+        values["tags"] = json.dumps(row.get("tags") or [], ensure_ascii=False)
+        values.setdefault("category", "eat" if table == "food" else "visit")
+
+        cols = [c for c in columns if c != "row_hash"]
+        conn.execute(
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+            tuple(values.get(c) for c in cols),
+        )
+
+
+def seed_database(conn: sqlite3.Connection) -> None:
+    """Tạo schema + nạp dữ liệu mẫu (bỏ qua nếu DB đã có dữ liệu)."""
+    for stmt in _sql_statements(SCHEMA_FILE):
+        conn.execute(stmt)
+
+    if conn.execute("SELECT COUNT(*) FROM places").fetchone()[0] > 0:
+        return
+
+    import_places, import_food, bulk_import = _load_parsers()
+
+    places = [
+        row for batch, _ in bulk_import.stream_batches(str(SEED_DIR / "places.tsv"), import_places.parse_line)
+        for row in batch
+    ]
+    foods = [
+        row for batch, _ in bulk_import.stream_batches(str(SEED_DIR / "food.tsv"), import_food.parse_line_bulk)
+        for row in batch
+    ]
+    _insert_spots(conn, "places", places, bulk_import.place_external_key, bulk_import.SPOT_COLUMNS["places"])
+    _insert_spots(conn, "food", foods, bulk_import.food_external_key, bulk_import.SPOT_COLUMNS["food"])
+
+    if USER_SEED_FILE.exists():
+        for stmt in _sql_statements(USER_SEED_FILE):
+            conn.execute(stmt)
+
+    conn.commit()
+
+
+def connect() -> SQLiteConnection:
+    """Mở 1 connection mới (lần đầu sẽ tạo schema + seed dữ liệu)."""
+    global _ready, _keeper
+
+    path = SQLITE_DB_PATH
+    if not _ready:
+        with _lock:
+            if not _ready:
+                conn = _raw_connect(path)
+                seed_database(conn)
+                if path:
+                    conn.close()
+                else:
+                    _keeper = conn
+                _ready = True
+
+    return SQLiteConnection(_raw_connect(path))
+
+
+def reset() -> None:
+    """Xóa DB trong bộ nhớ để lần connect() sau seed lại từ đầu (dùng trong test)."""
+    global _ready, _keeper
+    with _lock:
+        if _keeper is not None:
+            _keeper.close()
+            _keeper = None
+        _ready = False
@@ -0,0 +1,53 @@
+"""
+Điền cột city_norm = canonical key của city (xem app/utils/city_registry.py)
+cho bảng addresses và events.
+
+Chạy 1 lần (từ thư mục BE) sau DB/7_events_city_norm.sql + DB/8_addresses_city_norm.sql
+cho dữ liệu có sẵn (Seed_data/import_*.py đã tự ghi city_norm khi insert):
+    python -m app.scripts.backfill_city_norm
+"""
+
+from app.infrastructure.database.connectdb import get_db
+from app.utils.city_registry import canonical_city_key
+
+BATCH_SIZE = 1000
+TABLES = ("addresses", "events")
+
+
+def backfill_city_norm(table: str) -> int:
+    if table not in TABLES:
+        raise ValueError(f"Bảng không hợp lệ: {table}")
+
+    db = get_db()
+    if db is None:
+        return 0
+
+    cursor = db.cursor(dictionary=True)
+    cursor.execute(f"SELECT id, city, city_norm FROM {table}")
+    rows = cursor.fetchall()
+    cursor.close()
+
+    # Chỉ cập nhật những dòng có city_norm sai / còn trống
+    params = []
+    for row in rows:
+        city_norm = canonical_city_key(row["city"])
+        if row["city_norm"] != city_norm:
+            params.append((city_norm, row["id"]))
+
+    cursor = db.cursor()
+    for i in range(0, len(params), BATCH_SIZE):
+        cursor.executemany(
+            f"UPDATE {table} SET city_norm = %s WHERE id = %s",
+            params[i:i + BATCH_SIZE],
+        )
+    db.commit()
+
+    cursor.close()
+    db.close()
+    return len(params)
+
+
+if __name__ == "__main__":
+    for table in TABLES:
+        updated = backfill_city_norm(table)
+        print(f"Đã cập nhật city_norm cho {updated} dòng trong {table}")
@@ -0,0 +1,170 @@
+"""
+Benchmark engine tạo lịch trình trên backend SQLite (không cần MySQL).
+
+Script sẽ:
+    1. Bật DB_BACKEND=sqlite (DB trong bộ nhớ, seed từ Seed_data/*.tsv + DB/user_seed.sql)
+    2. Đo thời gian repository lấy dữ liệu theo city
+    3. Đo thời gian get_trip_itinerary (repo + engine) với random.seed cố định
+    4. So sánh tổng phút di chuyển khi bật / tắt tối ưu thứ tự (optimize_route) với cùng seed
+    5. Chấm chất lượng các trip bằng trip_evaluator (trung bình chỉ số + số trip đánh giá được / giây)
+    6. Ghi báo cáo JSON (p50 / p95 / max)
+
+Chạy (từ thư mục BE):
+    python -m app.scripts.benchmark_engine --city "Hồ Chí Minh" --days 3 --runs 30
+"""
+
+import os
+
+# Phải set trước khi import app.* (setting đọc env lúc import)
+os.environ.setdefault("DB_BACKEND", "sqlite")
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from app.adapters.repositories.places_repository import fetch_place_lites_by_city
+from app.adapters.repositories.food_repository import fetch_food_places_by_city
+from app.api.schemas.itinerary_request import ItineraryRequest, BlockTimeConfig
+from app.application.services.trip_service import get_trip_itinerary
+from app.application.itinerary.trip_evaluator import METRICS, TripEvaluator
+from app.domain.entities.itinerary_spot import place_lite_to_spot, food_place_to_spot
+from app.infrastructure.database import sqlite_backend
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def measure(fn: Callable[[], object], runs: int) -> Dict[str, float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def build_request(city: str, num_days: int, optimize_route=None) -> ItineraryRequest:
+    return ItineraryRequest(
+        city=city,
+        start_date=date.today() + timedelta(days=1),
+        num_days=num_days,
+        optimize_route=optimize_route,
+        morning=BlockTimeConfig(enabled=True, start="08:00:00", end="11:00:00"),
+        lunch=BlockTimeConfig(enabled=True, start="11:30:00", end="13:00:00"),
+        afternoon=BlockTimeConfig(enabled=True, start="13:30:00", end="17:00:00"),
+        dinner=BlockTimeConfig(enabled=True, start="18:00:00", end="19:30:00"),
+        evening=BlockTimeConfig(enabled=True, start="19:30:00", end="22:00:00"),
+    )
+
+
+def total_travel_min(trip: Dict) -> int:
+    return sum(
+        item["travel_from_prev_min"] or 0
+        for day in trip["days"]
+        for items in day["blocks"].values()
+        for item in items
+    )
+
+
+def compare_route_optimization(city: str, num_days: int, runs: int, seed: int) -> Dict[str, float]:
+    """Cùng seed => cùng địa điểm được chọn, chỉ khác thứ tự: đo phút di chuyển + thời gian chạy."""
+    report = {}
+    for label, enabled in (("greedy", False), ("optimized", True)):
+        req = build_request(city, num_days, optimize_route=enabled)
+        travel, samples = 0, []
+        for i in range(runs):
+            random.seed(seed + i)
+            start = time.perf_counter()
+            travel += total_travel_min(get_trip_itinerary(req))
+            samples.append((time.perf_counter() - start) * 1000)
+        report[label] = {"travel_min_per_trip": round(travel / runs, 1), **summarize(samples)}
+    return report
+
+
+def evaluate_quality(city: str, num_days: int, runs: int, seed: int) -> Dict[str, float]:
+    """Trung bình các chỉ số chất lượng trên runs trip (seed cố định) + tốc độ đánh giá theo lô."""
+    req = build_request(city, num_days)
+    trips = []
+    for i in range(runs):
+        random.seed(seed + i)
+        trips.append(get_trip_itinerary(req))
+
+    evaluator = TripEvaluator(
+        [place_lite_to_spot(p) for p in fetch_place_lites_by_city(city)],
+        [food_place_to_spot(f) for f in fetch_food_places_by_city(city)],
+        req.preferred_tags,
+    )
+    metrics = evaluator.evaluate(trips)
+    batch = trips * max(1, 2000 // len(trips))
+    start = time.perf_counter()
+    evaluator.scores(batch)
+    elapsed = time.perf_counter() - start
+    return {
+        **{name: round(float(metrics[name].mean()), 3) for name in METRICS},
+        "score": round(float(evaluator.scores(trips, metrics).mean()), 2),
+        "eval_trips_per_sec": round(len(batch) / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine lịch trình trên SQLite")
+    parser.add_argument("--city", default="Hồ Chí Minh")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=30, help="Số lần chạy mỗi phép đo")
+    parser.add_argument("--out", default="engine_benchmark.json", help="File báo cáo JSON")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sqlite_backend.connect().close()
+    print(f"Seed SQLite: {time.perf_counter() - start:.2f}s")
+
+    random.seed(args.seed)
+    req = build_request(args.city, args.days)
+
+    results = {
+        "fetch_places": measure(lambda: fetch_place_lites_by_city(args.city), args.runs),
+        "fetch_food": measure(lambda: fetch_food_places_by_city(args.city), args.runs),
+        "trip_itinerary": measure(lambda: get_trip_itinerary(req), args.runs),
+    }
+
+    print(f"\n{'phép đo':<16} {'p50':>10} {'p95':>10} {'max':>10}")
+    print("-" * 50)
+    for name, r in results.items():
+        print(f"{name:<16} {r['p50_ms']:>8.3f}ms {r['p95_ms']:>8.3f}ms {r['max_ms']:>8.3f}ms")
+
+    route = compare_route_optimization(args.city, args.days, args.runs, args.seed)
+    print()
+    for name, r in route.items():
+        print(f"route {name:<10} {r['travel_min_per_trip']:>8.1f} phút di chuyển / trip, p50 {r['p50_ms']:.3f}ms")
+
+    quality = evaluate_quality(args.city, args.days, args.runs, args.seed)
+    print()
+    for name, value in quality.items():
+        print(f"quality {name:<20} {value:>12}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "city": args.city, "days": args.days, "seed": args.seed,
+                "results": results, "route": route, "quality": quality,
+            },
+            f, ensure_ascii=False, indent=2,
+        )
+    print(f"\nĐã ghi báo cáo: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Benchmark index cho schema trong Smart_Travelling/DB.
+
+Script sẽ:
+    1. Tạo database riêng (mặc định travel_bench) từ DB/1..5 + user.sql
+    2. Seed dữ liệu phóng to từ Seed_data/*.tsv (nhân bản theo --scale)
+    3. Chạy các truy vấn nóng, ghi lại EXPLAIN + độ trễ (trước khi có index)
+    4. Áp dụng DB/6_indexes.sql, ANALYZE lại các bảng
+    5. Chạy lại và ghi báo cáo JSON (trước / sau)
+
+Chạy (từ thư mục BE):
+    python -m app.scripts.benchmark_indexes --scale 50 --runs 30
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BE_DIR = Path(__file__).resolve().parents[2]
+DB_DIR = BE_DIR.parent / "DB"
+SEED_DIR = BE_DIR / "Seed_data"
+
+SCHEMA_FILES = [
+    "1_addresses.sql",
+    "2_places.sql",
+    "3_events.sql",
+    "4_foodplace.sql",
+    "5_accommodation.sql",
+    "user.sql",
+]
+INDEX_FILE = "6_indexes.sql"
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 3306)),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "charset": "utf8mb4",
+}
+
+
+# Các truy vấn nóng (giữ giống câu SQL trong adapters/repositories)
+HOT_QUERIES: Dict[str, str] = {
+    "places_by_city": """
+        SELECT p.id, p.name, p.tags, p.category, a.city, a.lat, a.lng
+        FROM places p
+        JOIN addresses a ON p.address_id = a.id
+        WHERE a.city = %(city)s AND p.category = 'visit'
+    """,
+    "food_by_city": """
+        SELECT f.id, f.name, f.tags, f.category, a.city, a.lat, a.lng
+        FROM food f
+        JOIN addresses a ON f.address_id = a.id
+        WHERE a.city = %(city)s AND f.category = 'eat'
+    """,
+    "events_by_date": """
+        SELECT id, name, city, start_datetime, end_datetime, session
+        FROM events
+        WHERE start_datetime < %(end_of_day)s
+          AND end_datetime > %(start_of_day)s
+          AND (session = %(session)s OR session IS NULL)
+    """,
+    "user_by_username": "SELECT * FROM users WHERE username = %(username)s",
+    "user_by_email": "SELECT * FROM users WHERE email = %(email)s",
+    "user_by_phone": "SELECT * FROM users WHERE phone_number = %(phone)s",
+    "admin_list_users": "SELECT * FROM users WHERE role = 'user' ORDER BY id ASC LIMIT 50",
+}
+
+
+def split_sql(text: str) -> List[str]:
+    """Tách file .sql thành từng câu lệnh, bỏ comment và USE <db>."""
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            continue
+        lines.append(line)
+    statements = []
+    for stmt in "\n".join(lines).split(";"):
+        stmt = stmt.strip()
+        if not stmt or stmt.upper().startswith("USE "):
+            continue
+        statements.append(stmt)
+    return statements
+
+
+def run_sql_file(cursor, path: Path) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        for stmt in split_sql(f.read()):
+            cursor.execute(stmt)
+
+
+def read_tsv(path: Path) -> List[List[str]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        next(f, None)  # header
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 17 and parts[1].strip():
+                rows.append(parts)
+    return rows
+
+
+def _text(value: str) -> Optional[str]:
+    value = (value or "").strip()
+    return None if value in ("", "NULL", "x") else value
+
+
+def _num(value: str, cast=float) -> Optional[float]:
+    try:
+        return cast(value.replace(",", ".").strip())
+    except (ValueError, AttributeError):
+        return None
+
+
+def _coords(value: str):
+    try:
+        lat, lng = value.split(",")[:2]
+        return float(lat), float(lng)
+    except (ValueError, AttributeError):
+        return None, None
+
+
+def _hhmm(value: str) -> Optional[str]:
+    try:
+        hh, mm = value.strip().split(":")[:2]
+        return f"{int(hh):02d}:{int(mm):02d}"
+    except (ValueError, AttributeError):
+        return None
+
+
+def seed_scaled_data(conn, scale: int, rng: random.Random) -> Dict[str, int]:
+    """
+    Nhân bản dữ liệu seed `scale` lần.
+    Bản sao thứ k > 0 được gán sang thành phố giả "<city> #k" để số dòng
+    mỗi thành phố giữ nguyên còn tổng bảng lớn dần (giống dữ liệu toàn quốc).
+    """
+    cursor = conn.cursor()
+    counts = {"addresses": 0, "places": 0, "food": 0, "events": 0, "users": 0}
+    cities = set()
+
+    for table, tsv, category in (("places", "places.tsv", "visit"), ("food", "food.tsv", "eat")):
+        rows = read_tsv(SEED_DIR / tsv)
+        for k in range(scale):
+            addr_params = []
+            spot_rows = []
+            for parts in rows:
+                city = parts[15].strip() or "Hồ Chí Minh"
+                if k > 0:
+                    city = f"{city} #{k}"
+                cities.add(city)
+                lat, lng = _coords(parts[16])
+                addr_params.append((_text(parts[11]), _text(parts[12]), _text(parts[13]),
+                                    _text(parts[14]), city, lat, lng))
+                spot_rows.append(parts)
+
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM addresses")
+            first_id = cursor.fetchone()[0] + 1
+            cursor.executemany(
+                "INSERT INTO addresses (house_number, street, ward, district, city, lat, lng) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                addr_params,
+            )
+            spot_params = []
+            for offset, parts in enumerate(spot_rows):
+                rating = _num(parts[4])
+                popularity = _num(parts[6], int)
+                tags = [t.strip() for t in parts[7].split(",") if t.strip()]
+                spot_params.append((
+                    parts[1].strip()[:255],
+                    _num(parts[10], int),
+                    _hhmm(parts[8]),
+                    _hhmm(parts[9]),
+                    min(max(rating, 0), 5) if rating is not None else None,
+                    _num(parts[5], int) or 0,
+                    min(max(popularity or 0, 0), 100),
+                    json.dumps(tags, ensure_ascii=False),
+                    category,
+                    first_id + offset,
+                ))
+            cursor.executemany(
+                f"INSERT INTO {table} (name, priceVND, openTime, closeTime, rating, reviewCount, "
+                f"popularity, tags, category, address_id) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                spot_params,
+            )
+            counts["addresses"] += len(addr_params)
+            counts[table] += len(spot_params)
+        conn.commit()
+
+    # Events: rải đều trong 1 năm, mỗi thành phố vài chục sự kiện
+    city_list = sorted(cities)
+    base = datetime(2025, 1, 1)
+    sessions = ["morning", "afternoon", "evening", "full_day", None]
+    event_params = []
+    for i in range(len(city_list) * 40):
+        city = city_list[i % len(city_list)]
+        start = base + timedelta(days=rng.randint(0, 364), hours=rng.randint(6, 20))
+        end = start + timedelta(hours=rng.randint(2, 72))
+        event_params.append((f"bench-{i}", f"Sự kiện {i}", city, start, end, rng.choice(sessions)))
+    cursor.executemany(
+        "INSERT INTO events (external_id, name, city, start_datetime, end_datetime, session) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        event_params,
+    )
+    counts["events"] = len(event_params)
+
+    # Users
+    user_params = []
+    for i in range(scale * 200):
+        user_params.append((
+            f"bench_user_{i}",
+            f"bench_user_{i}@example.com",
+            f"09{i:08d}",
+            "$2b$12$benchmarkhashxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx",
+            "admin" if i % 100 == 0 else "user",
+        ))
+    cursor.executemany(
+        "INSERT INTO users (username, email, phone_number, hashed_password, role) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        user_params,
+    )
+    counts["users"] = len(user_params)
+
+    conn.commit()
+    cursor.close()
+    return counts
+
+
+def query_params(scale: int) -> Dict[str, Dict]:
+    day = datetime(2025, 6, 15)
+    last_user = scale * 200 - 1
+    return {
+        "places_by_city": {"city": "Hồ Chí Minh"},
+        "food_by_city": {"city": "Hồ Chí Minh"},
+        "events_by_date": {"start_of_day": day, "end_of_day": day + timedelta(days=1), "session": "evening"},
+        "user_by_username": {"username": f"bench_user_{last_user}"},
+        "user_by_email": {"email": f"bench_user_{last_user}@example.com"},
+        "user_by_phone": {"phone": f"09{last_user:08d}"},
+        "admin_list_users": {},
+    }
+
+
+def measure(conn, params_by_query: Dict[str, Dict], runs: int) -> Dict[str, Dict]:
+    """Chạy EXPLAIN + đo độ trễ cho từng truy vấn nóng."""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    report = {}
+    for name, sql in HOT_QUERIES.items():
+        params = params_by_query.get(name) or None
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = [{k: v for k, v in row.items()} for row in cursor.fetchall()]
+
+        timings = []
+        row_count = 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            row_count = len(cursor.fetchall())
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        report[name] = {
+            "rows": row_count,
+            "mean_ms": round(statistics.mean(timings), 3),
+            "p50_ms": round(timings[len(timings) // 2], 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            "explain": plan,
+        }
+    cursor.close()
+    return report
+
+
+def print_comparison(before: Dict[str, Dict], after: Dict[str, Dict]) -> None:
+    print(f"\n{'query':<20} {'rows':>7} {'p50 trước':>11} {'p50 sau':>9} {'type trước':>12} {'type sau':>10}")
+    print("-" * 76)
+    for name in HOT_QUERIES:
+        b, a = before[name], after[name]
+        b_type = ",".join(str(r.get("type")) for r in b["explain"])
+        a_type = ",".join(str(r.get("type")) for r in a["explain"])
+        print(f"{name:<20} {a['rows']:>7} {b['p50_ms']:>9.3f}ms {a['p50_ms']:>7.3f}ms {b_type:>12} {a_type:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index cho DB travel")
+    parser.add_argument("--db", default="travel_bench", help="Tên database tạm để benchmark (sẽ bị xóa và tạo lại)")
+    parser.add_argument("--scale", type=int, default=50, help="Số lần nhân bản dữ liệu seed")
+    parser.add_argument("--runs", type=int, default=30, help="Số lần chạy mỗi truy vấn")
+    parser.add_argument("--out", default="index_benchmark.json", help="File báo cáo JSON")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.db == os.getenv("DB_NAME", "travel"):
+        raise SystemExit("Không benchmark trên database chính, hãy dùng --db khác")
+
+    conn = pymysql.connect(**DB_CONFIG, autocommit=False)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.db}`")
+    cursor.execute(f"CREATE DATABASE `{args.db}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cursor.execute(f"USE `{args.db}`")
+    for name in SCHEMA_FILES:
+        run_sql_file(cursor, DB_DIR / name)
+    conn.commit()
+
+    print(f"Seeding x{args.scale} vào {args.db}...")
+    start = time.perf_counter()
+    counts = seed_scaled_data(conn, args.scale, random.Random(args.seed))
+    print(f"  {counts} ({time.perf_counter() - start:.1f}s)")
+
+    cursor.execute("ANALYZE TABLE addresses, places, food, events, users")
+    cursor.fetchall()
+    params = query_params(args.scale)
+    before = measure(conn, params, args.runs)
+
+    print(f"Áp dụng {INDEX_FILE}...")
+    run_sql_file(cursor, DB_DIR / INDEX_FILE)
+    cursor.execute("ANALYZE TABLE addresses, places, food, events, users")
+    cursor.fetchall()
+    conn.commit()
+    after = measure(conn, params, args.runs)
+
+    print_comparison(before, after)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(
+            {"scale": args.scale, "runs": args.runs, "counts": counts, "before": before, "after": after},
+            f, ensure_ascii=False, indent=2, default=str,
+        )
+    print(f"\nĐã ghi báo cáo: {args.out}")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Áp retention (TRIP_HISTORY_MAX_TRIPS_PER_USER / TRIP_HISTORY_MAX_AGE_DAYS, mặc định tắt) và gộp các file trip lẻ
+của mọi user vào segment (xem trip_history_file_service.compact_user_history).
+Server đang chạy cũng tự làm việc này định kỳ; script dùng khi cần dọn ngay.
+
+Chạy (từ thư mục BE):
+    python -m app.scripts.compact_trip_history
+"""
+
+from app.application.services import trip_history_file_service
+
+
+if __name__ == "__main__":
+    results = trip_history_file_service.compact_all_users()
+    for result in results:
+        print(result)
+    print(f"Đã compact lịch sử trip của {len(results)} user")
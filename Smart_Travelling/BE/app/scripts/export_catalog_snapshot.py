@@ -0,0 +1,15 @@
+"""
+Xuất toàn bộ catalog (places / food / events) từ DB ra snapshot nhị phân dạng cột
+(app/infrastructure/catalog_snapshot.py). Server đang chạy sẽ tự nhận version mới ở lần kiểm tra kế tiếp.
+
+Chạy (từ thư mục BE), sau mỗi lần import dữ liệu:
+    python -m app.scripts.export_catalog_snapshot
+"""
+
+from app.application.services import catalog_service
+from app.config.setting import CATALOG_SNAPSHOT_DIR
+
+
+if __name__ == "__main__":
+    version = catalog_service.export_snapshot()
+    print(f"Đã ghi catalog snapshot {version} vào {CATALOG_SNAPSHOT_DIR}")
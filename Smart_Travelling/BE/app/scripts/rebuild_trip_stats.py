@@ -0,0 +1,23 @@
+"""
+Tính lại thống kê trip (trip_stats_service) từ toàn bộ lịch sử trip đã lưu rồi ghi ra TRIP_STATS_FILE.
+Chỉ cần chạy 1 lần (lần đầu bật thống kê / file thống kê bị mất); sau đó server tự cộng dồn khi lưu trip.
+Nên chạy khi server đang tắt: server đang chạy cộng trip mới của nó vào file,
+trip lưu trong lúc đang tính lại có thể bị đếm 2 lần.
+
+Chạy (từ thư mục BE):
+    python -m app.scripts.rebuild_trip_stats
+"""
+
+from app.application.services import trip_history_file_service, trip_stats_service
+from app.config.setting import TRIP_STATS_FILE
+
+
+def iter_all_trips():
+    for user_id in trip_history_file_service.list_history_user_ids():
+        yield from trip_history_file_service.load_trip_history(user_id)
+
+
+if __name__ == "__main__":
+    count = trip_stats_service.rebuild_from_history(iter_all_trips())
+    trip_stats_service.save_stats(force=True)
+    print(f"Đã tính thống kê từ {count} trip, ghi vào {TRIP_STATS_FILE}")
@@ -0,0 +1,79 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+from app.utils.normalize_text import normalize_text
+
+
+# Khóa chuẩn (canonical key) của 1 thành phố = normalize_text(tên chuẩn),
+# đây cũng là giá trị được lưu ở cột city_norm (addresses / events)
+# => repository chỉ cần WHERE city_norm = %s (có index)
+
+# Tên chuẩn -> các cách viết / viết tắt hay gặp
+CITY_ALIASES: Dict[str, List[str]] = {
+    "Hồ Chí Minh": [
+        "TP.HCM", "TPHCM", "TP HCM", "HCM", "HCMC", "Sài Gòn", "Saigon",
+        "TP Hồ Chí Minh", "Thành phố Hồ Chí Minh", "Ho Chi Minh City",
+    ],
+    "Hà Nội": ["HN", "Hanoi", "TP Hà Nội", "Thành phố Hà Nội", "Thủ đô Hà Nội"],
+    "Đà Nẵng": ["Danang", "TP Đà Nẵng", "Thành phố Đà Nẵng"],
+    "Hải Phòng": ["Haiphong", "TP Hải Phòng", "Thành phố Hải Phòng"],
+    "Cần Thơ": ["Cantho", "TP Cần Thơ", "Thành phố Cần Thơ"],
+    "Huế": ["Hue", "Thừa Thiên Huế", "TP Huế", "Thành phố Huế"],
+    "Bà Rịa - Vũng Tàu": ["Vũng Tàu", "Vung Tau", "BRVT", "Bà Rịa Vũng Tàu"],
+}
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# alias_key (bỏ dấu, bỏ mọi ký tự không phải chữ/số) -> canonical key
+_aliases: Dict[str, str] = {}
+# canonical key -> tên hiển thị
+_display_names: Dict[str, str] = {}
+
+
+def _alias_key(name: Optional[str]) -> str:
+    """'TP.HCM' -> 'tphcm', 'Hà  Nội ' -> 'hanoi', 'Ha-Noi' -> 'hanoi'."""
+    return _NON_ALNUM_RE.sub("", normalize_text(name or ""))
+
+
+def canonical_city_key(name: Optional[str]) -> str:
+    """
+    Đổi tên thành phố người dùng nhập về canonical key (tra dict O(1)).
+    Không có trong registry thì trả về normalize_text(name).
+    """
+    if not name:
+        return ""
+    return _aliases.get(_alias_key(name)) or normalize_text(name)
+
+
+def city_display_name(key: str) -> Optional[str]:
+    """Tên hiển thị của 1 canonical key (None nếu chưa đăng ký)."""
+    return _display_names.get(key)
+
+
+def register_city(name: Optional[str], aliases: Iterable[str] = ()) -> str:
+    """Đăng ký 1 thành phố (và các alias của nó), trả về canonical key."""
+    key = canonical_city_key(name)
+    if not key:
+        return ""
+
+    _display_names.setdefault(key, (name or "").strip())
+    _aliases.setdefault(_alias_key(name), key)
+    for alias in aliases:
+        _aliases.setdefault(_alias_key(alias), key)
+    return key
+
+
+def register_cities(names: Iterable[Optional[str]]) -> int:
+    """Đăng ký các city đọc từ DB (lúc khởi động), trả về số city khác nhau."""
+    keys = {register_city(name) for name in names if name and name.strip()}
+    return len(keys)
+
+
+def list_cities() -> Dict[str, str]:
+    """canonical key -> tên hiển thị của toàn bộ thành phố đã đăng ký."""
+    return dict(_display_names)
+
+
+# Alias tĩnh luôn có sẵn, kể cả khi DB chưa kết nối được
+for _canonical, _city_aliases in CITY_ALIASES.items():
+    register_city(_canonical, _city_aliases)
@@ -0,0 +1,89 @@
+import math
+from typing import Dict, Optional
+
+
+class QuantileSketch:
+    """
+    Sketch phân vị dạng bucket log (kiểu DDSketch) cho giá trị >= 0 (chi phí VND):
+    - bucket i chứa các giá trị trong (gamma^(i-1), gamma^i], gamma = (1 + a) / (1 - a)
+      => phân vị trả về sai số tương đối <= relative_accuracy
+    - thêm 1 giá trị: O(1), bộ nhớ ~ số bucket (vài trăm cho dải 1k -> 1 tỷ VND)
+    - cộng dồn được (merge) và lưu ra dict gọn để ghi file
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, n: int = 1) -> None:
+        value = max(float(value), 0.0)
+        if value <= 0:
+            self.zero_count += n
+        else:
+            i = self._bucket(value)
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.count += n
+        self.total += value * n
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # Giữa bucket (gamma^(i-1), gamma^i] => sai số tương đối <= relative_accuracy
+                value = 2 * self._gamma ** i / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        for attr, pick in (("min", min), ("max", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+
+    def to_dict(self) -> Dict:
+        return {
+            "a": self.relative_accuracy,
+            "b": {str(i): n for i, n in self.buckets.items()},
+            "z": self.zero_count,
+            "n": self.count,
+            "s": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls(data.get("a", 0.01))
+        sketch.buckets = {int(i): n for i, n in (data.get("b") or {}).items()}
+        sketch.zero_count = data.get("z", 0)
+        sketch.count = data.get("n", 0)
+        sketch.total = data.get("s", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
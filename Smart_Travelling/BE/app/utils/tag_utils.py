@@ -1,18 +1,14 @@
 from typing import Optional
 from app.domain.entities.itinerary_spot import ItinerarySpot
 from app.application.itinerary.trip_context import UserPreferences
+from app.utils.tag_vocab import count_common
 
 """ Tính điểm tag cho 1 địa điểm dựa trên sở thích người dùng """
 def tag_score(spot: ItinerarySpot, prefs: Optional[UserPreferences]) -> int: 
     if prefs is None:
         return 0;
-    score = 0
-    for tag in spot.tags:
-        if tag in prefs.preferred_tags:
-            score += 1
-        if tag in prefs.avoid_tags:
-            score -= 1
-    return score
+    # Bitset: số tag thích - số tag tránh
+    return count_common(spot.tag_mask, prefs.preferred_mask) - count_common(spot.tag_mask, prefs.avoid_mask)
 
 """ Loại những tag mà người dùng không thích """
 def apply_tag_filter(
@@ -27,19 +23,13 @@ def apply_tag_filter(
 
     result = spots
 
-    if prefs.avoid_tags:
-        avoid = set(prefs.avoid_tags)
-        result = [
-            s for s in result
-            if (set(s.tags or []).isdisjoint(avoid))
-        ]
-
-    if prefs.preferred_tags:
-        preferred = set(prefs.preferred_tags)
-        with_preferred = [
-            s for s in result
-            if not preferred.isdisjoint(set(s.tags or []))
-        ]
+    if prefs.avoid_mask:
+        avoid = prefs.avoid_mask
+        result = [s for s in result if not (s.tag_mask & avoid)]
+
+    if prefs.preferred_mask:
+        preferred = prefs.preferred_mask
+        with_preferred = [s for s in result if s.tag_mask & preferred]
         # Nếu còn điểm match tag → dùng list này, ngược lại giữ nguyên result
         if with_preferred:
             result = with_preferred
@@ -0,0 +1,87 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+# Từ điển tag dùng chung: mỗi tag được gán 1 id (= vị trí bit) cố định
+# => tập tag của 1 spot là 1 số int (bitset), so khớp tag chỉ còn là phép AND + bit_count
+#    thay vì tạo set chuỗi tiếng Việt cho mỗi spot ở mỗi lần chấm điểm.
+# Vocab build lúc load catalog (register_tags), tag mới của spot được thêm dần khi gặp.
+
+_ids: Dict[str, int] = {}
+_tags: List[str] = []
+_lock = threading.Lock()
+
+
+def _clean(tag: Optional[str]) -> str:
+    return (tag or "").strip()
+
+
+def tag_id(tag: Optional[str]) -> Optional[int]:
+    """Id của tag, chưa có thì gán id mới (None nếu tag rỗng)."""
+    tag = _clean(tag)
+    if not tag:
+        return None
+    idx = _ids.get(tag)
+    if idx is None:
+        with _lock:
+            idx = _ids.get(tag)
+            if idx is None:
+                idx = len(_tags)
+                _tags.append(tag)
+                _ids[tag] = idx
+    return idx
+
+
+def register_tags(tags: Iterable[Optional[str]]) -> int:
+    """Đăng ký nhiều tag 1 lần (lúc load catalog), trả về kích thước vocab."""
+    for tag in tags:
+        tag_id(tag)
+    return len(_tags)
+
+
+def tag_mask(tags: Optional[Iterable[str]]) -> int:
+    """Bitset của 1 spot (tag chưa có trong vocab sẽ được thêm)."""
+    mask = 0
+    for tag in tags or ():
+        idx = tag_id(tag)
+        if idx is not None:
+            mask |= 1 << idx
+    return mask
+
+
+def lookup_mask(tags: Optional[Iterable[str]]) -> int:
+    """
+    Bitset cho tag người dùng gửi lên: chỉ tra, không thêm vào vocab
+    (tag không spot nào có thì đằng nào cũng không khớp).
+    """
+    mask = 0
+    for tag in tags or ():
+        idx = _ids.get(_clean(tag))
+        if idx is not None:
+            mask |= 1 << idx
+    return mask
+
+
+def count_common(mask_a: int, mask_b: int) -> int:
+    """Số tag chung của 2 bitset."""
+    return (mask_a & mask_b).bit_count()
+
+
+def mask_to_tags(mask: int) -> List[str]:
+    """Bitset -> danh sách tag (theo thứ tự id)."""
+    result = []
+    while mask:
+        low = mask & -mask
+        result.append(_tags[low.bit_length() - 1])
+        mask ^= low
+    return result
+
+
+def vocab_size() -> int:
+    return len(_tags)
+
+
+def snapshot() -> List[str]:
+    """Danh sách tag theo id (gửi sang process khác, register_tags bên đó để có cùng id)."""
+    with _lock:
+        return list(_tags)
@@ -11,6 +11,7 @@ from app.api.v0.router.trip_router import router as trip_router
 from app.api.v0.router.visitor_router import router as visitor_router
 from app.api.v0.router.event_router import router as events_router 
 from app.api.v0.router.tag_router import router as tag_router
+from app.api.v0.router.search_router import router as search_router
 
 from app.application.services.lifespan import lifespan
 
@@ -43,6 +44,8 @@ app.include_router(visitor_router, prefix="/api/v0")
 
 app.include_router(tag_router, prefix="/api/v0")
 
+app.include_router(search_router, prefix="/api/v0")
+
 
 
 # 5) Serve Frontend (nếu bạn muốn chạy chung BE + FE)
@@ -0,0 +1,129 @@
+"""
+Test day_clustering: chia địa điểm theo ngày bằng k-means cân bằng trên dữ liệu dựng tay.
+
+Chạy test:
+    pytest tests/test_day_clustering.py -v
+"""
+
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.application.itinerary.day_clustering import balanced_kmeans, plan_day_pools
+from app.domain.entities.itinerary_spot import ItinerarySpot
+
+
+# 3 khu cách nhau ~5-10 km trong 1 thành phố
+CENTERS = [(10.770, 106.700), (10.800, 106.740), (10.740, 106.760)]
+
+
+def _spots(category, groups, start_id=1, seed=1):
+    """groups: [(tâm, số điểm)], rải đều trong bán kính ~500 m quanh tâm."""
+    rng = random.Random(seed)
+    spots = []
+    for (lat, lng), count in groups:
+        for _ in range(count):
+            spots.append(ItinerarySpot(
+                id=start_id + len(spots), name=f"{category}-{start_id + len(spots)}", category=category,
+                lat=lat + rng.uniform(-0.004, 0.004), lng=lng + rng.uniform(-0.004, 0.004),
+            ))
+    return spots
+
+
+def _ids(spots):
+    return {s.id for s in spots}
+
+
+def test_balanced_kmeans_respects_capacity_and_labels_every_point():
+    rng = random.Random(3)
+    points = [(rng.random(), rng.random()) for _ in range(30)]
+
+    labels, centers = balanced_kmeans(points, 4)
+
+    assert len(labels) == len(points) and len(centers) == 4
+    sizes = Counter(labels)
+    assert set(sizes) <= set(range(4))
+    assert max(sizes.values()) <= math.ceil(30 / 4 * 1.2)
+    assert sum(sizes.values()) == 30
+
+
+def test_balanced_kmeans_more_clusters_than_points():
+    points = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)]
+
+    labels, centers = balanced_kmeans(points, 5)
+
+    assert len(centers) == 3
+    assert sorted(labels) == [0, 1, 2]
+
+
+def test_plan_day_pools_splits_by_area_and_covers_every_spot():
+    visits = _spots("visit", [(c, 10) for c in CENTERS])
+    foods = _spots("eat", [(c, 4) for c in CENTERS], start_id=1000)
+
+    pools = plan_day_pools(visits, foods, num_days=3, min_visit_pool=5, min_food_pool=3)
+
+    assert pools is not None and len(pools) == 3
+    assert set().union(*(_ids(v) for v, _ in pools)) == _ids(visits)
+    assert set().union(*(_ids(f) for _, f in pools)) == _ids(foods)
+    # Mỗi khu thành đúng 1 ngày
+    areas = sorted(sorted(s.id for s in v) for v, _ in pools)
+    assert areas == [list(range(1, 11)), list(range(11, 21)), list(range(21, 31))]
+
+
+def test_outliers_and_unlocated_spots_kept_every_day():
+    visits = _spots("visit", [(c, 10) for c in CENTERS])
+    island = ItinerarySpot(id=90, name="Đảo", category="visit", lat=10.300, lng=107.100)
+    no_coords = ItinerarySpot(id=91, name="Không toạ độ", category="visit", lat=None, lng=None)
+    foods = _spots("eat", [(c, 4) for c in CENTERS], start_id=1000)
+
+    pools = plan_day_pools(visits + [island, no_coords], foods, num_days=3, min_visit_pool=5, min_food_pool=3)
+
+    assert pools is not None
+    for day_visits, _ in pools:
+        assert {90, 91} <= _ids(day_visits)
+    # Điểm ngoại lai không kéo lệch cụm: mỗi ngày vẫn gọn trong 1 khu
+    core = sorted(sorted(s.id for s in v if s.id < 90) for v, _ in pools)
+    assert core == [list(range(1, 11)), list(range(11, 21)), list(range(21, 31))]
+
+
+def _strip(category, count, lng_from, lng_to, start_id):
+    """count điểm cách đều trên 1 đoạn đường ngang (lat cố định)."""
+    return [
+        ItinerarySpot(
+            id=start_id + i, name=f"{category}-{start_id + i}", category=category,
+            lat=10.770, lng=lng_from + (lng_to - lng_from) * i / max(count - 1, 1),
+        )
+        for i in range(count)
+    ]
+
+
+def test_small_pools_topped_up_near_center():
+    # 18 điểm phía tây, 6 điểm phía đông => sức chứa 15 / cụm, cụm phía đông chỉ có 9
+    visits = _strip("visit", 18, 106.700, 106.720, 1) + _strip("visit", 6, 106.725, 106.735, 19)
+    foods = _strip("eat", 6, 106.700, 106.710, 1000) + _strip("eat", 1, 106.735, 106.735, 1006)
+
+    pools = plan_day_pools(visits, foods, num_days=2, min_visit_pool=12, min_food_pool=4)
+
+    assert pools is not None
+    west, east = sorted(pools, key=lambda pool: min(_ids(pool[0])))
+    assert _ids(west[0]) == set(range(1, 16))
+    # 9 điểm của cụm + 3 điểm gần tâm cụm nhất
+    assert _ids(east[0]) == set(range(13, 25))
+    assert len(west[1]) == 6
+    assert len(east[1]) == 4 and 1006 in _ids(east[1])
+
+
+def test_not_enough_spots_to_split():
+    visits = _spots("visit", [(c, 4) for c in CENTERS])
+    foods = _spots("eat", [(CENTERS[0], 3)], start_id=1000)
+
+    assert plan_day_pools(visits, foods, num_days=1, min_visit_pool=1, min_food_pool=1) is None
+    # 12 điểm < 3 ngày x 5
+    assert plan_day_pools(visits, foods, num_days=3, min_visit_pool=5, min_food_pool=1) is None
+    # Nhiều ngày hơn số điểm
+    assert plan_day_pools(visits, foods, num_days=20, min_visit_pool=1, min_food_pool=1) is None
+    assert plan_day_pools([], foods, num_days=3, min_visit_pool=1, min_food_pool=1) is None
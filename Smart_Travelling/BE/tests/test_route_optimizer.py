@@ -0,0 +1,141 @@
+"""
+Test route_optimizer: sắp lại thứ tự tham quan trong block trên dữ liệu dựng tay.
+
+Chạy test:
+    pytest tests/test_route_optimizer.py -v
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.application.itinerary.itineray_engine import BlockItem
+from app.application.itinerary.route_optimizer import MAX_WAIT_MIN, optimize_day_route
+from app.utils.geo_utils import estimate_travel_minutes, haversine_km
+
+
+LUNCH_END = 12 * 60 + 30
+BLOCK_START, BLOCK_END = 13 * 60, 18 * 60
+DINNER_START = 18 * 60 + 30
+
+
+def _item(type_, place_id, lat, lng, start=0, dwell=40, order=1):
+    return BlockItem(
+        order=order, type=type_, name=f"{type_}-{place_id}", place_id=place_id,
+        start_min=start, end_min=start + dwell, dwell_min=dwell,
+        distance_from_prev_km=0.0, travel_from_prev_min=0,
+        price_vnd=None, image_url=None, lat=lat, lng=lng,
+    )
+
+
+def _day(visit_coords, dwell=40):
+    """Ăn trưa -> chiều tham quan (theo thứ tự truyền vào) -> ăn tối, cùng 1 trục ~ 10.77."""
+    lunch = _item("eat", 100, 10.770, 106.700, start=LUNCH_END - 60, dwell=60)
+    visits = [
+        _item("visit", i, lat, lng, start=BLOCK_START + (i - 1) * 60, dwell=dwell, order=i)
+        for i, (lat, lng) in enumerate(visit_coords, start=1)
+    ]
+    dinner = _item("eat", 200, 10.770, 106.740, start=DINNER_START, dwell=60)
+    blocks = [
+        ("lunch", [lunch], 11 * 60, None),
+        ("afternoon", visits, BLOCK_START, BLOCK_END),
+        ("dinner", [dinner], DINNER_START, None),
+    ]
+    return blocks, lunch, visits, dinner
+
+
+def _route_km(points):
+    return sum(haversine_km(a.lat, a.lng, b.lat, b.lng) for a, b in zip(points, points[1:]))
+
+
+def _assert_feasible(visits, lunch, dinner, windows):
+    """Giờ đi / đến khớp khoảng cách, trong giờ mở cửa, trong block, không lấn giờ ăn tối."""
+    t, prev = lunch.end_min, lunch
+    for order, item in enumerate(visits, start=1):
+        travel = estimate_travel_minutes(haversine_km(prev.lat, prev.lng, item.lat, item.lng))
+        open_min, close_min = windows.get(item.place_id, (0, 1439))
+        assert item.order == order
+        assert item.start_min >= max(t + travel, open_min)
+        assert item.start_min - (t + travel) <= MAX_WAIT_MIN
+        assert item.end_min == item.start_min + item.dwell_min
+        assert item.end_min <= min(close_min, BLOCK_END)
+        t, prev = item.end_min, item
+    last_leg = estimate_travel_minutes(haversine_km(prev.lat, prev.lng, dinner.lat, dinner.lng))
+    assert t + last_leg <= dinner.start_min
+
+
+# Trên trục lng 106.70 -> 106.74, thứ tự truyền vào đi tới đi lui
+ZIGZAG = [(10.770, 106.730), (10.770, 106.705), (10.770, 106.720), (10.770, 106.710)]
+
+
+def test_reorders_to_shorter_route_and_keeps_anchors():
+    blocks, lunch, visits, dinner = _day(ZIGZAG)
+    original_ids = {v.place_id for v in visits}
+
+    result = optimize_day_route(blocks, {}, budget_ms=1000)
+
+    assert result["km_after"] < result["km_before"]
+    # Đi 1 chiều từ quán trưa tới quán tối
+    assert [v.place_id for v in visits] == [2, 4, 3, 1]
+    assert result["km_after"] == round(_route_km([lunch, *visits, dinner]), 3)
+    # 2 đầu không đổi, vẫn cùng các địa điểm
+    assert blocks[0][1] == [lunch] and blocks[2][1] == [dinner]
+    assert lunch.end_min == LUNCH_END and dinner.start_min == DINNER_START
+    assert {v.place_id for v in visits} == original_ids
+    _assert_feasible(visits, lunch, dinner, {})
+    # Khoảng cách tới quán tối tính lại từ điểm cuối mới
+    assert dinner.distance_from_prev_km == round(haversine_km(visits[-1].lat, visits[-1].lng, dinner.lat, dinner.lng), 2)
+
+
+def test_opening_hours_constrain_order():
+    # Điểm gần quán tối nhất (1) đóng cửa sớm => bắt buộc đi đầu tiên
+    windows = {1: (8 * 60, 14 * 60)}
+    blocks, lunch, visits, dinner = _day(ZIGZAG)
+
+    result = optimize_day_route(blocks, windows, budget_ms=1000)
+
+    assert result["km_after"] <= result["km_before"]
+    assert visits[0].place_id == 1
+    _assert_feasible(visits, lunch, dinner, windows)
+
+
+def test_block_end_rejects_longer_schedules():
+    # Ở lâu mỗi điểm: chỉ còn rất ít thời gian thừa trước BLOCK_END
+    blocks, lunch, visits, dinner = _day(ZIGZAG[:3], dwell=75)
+
+    result = optimize_day_route(blocks, {}, budget_ms=1000)
+
+    assert result["km_after"] <= result["km_before"]
+    _assert_feasible(visits, lunch, dinner, {})
+
+
+def test_zero_budget_leaves_day_untouched():
+    blocks, lunch, visits, dinner = _day(ZIGZAG)
+    before = [(v.place_id, v.order, v.start_min, v.end_min) for v in visits]
+
+    result = optimize_day_route(blocks, {}, budget_ms=0)
+
+    assert result["km_after"] == result["km_before"]
+    assert [(v.place_id, v.order, v.start_min, v.end_min) for v in visits] == before
+
+
+def test_random_days_never_get_longer():
+    rng = random.Random(7)
+    for _ in range(50):
+        coords = [(10.76 + rng.random() * 0.02, 106.70 + rng.random() * 0.04) for _ in range(rng.randint(2, 5))]
+        windows = {
+            i: (rng.choice([0, 13 * 60, 14 * 60]), rng.choice([1439, 16 * 60, 17 * 60]))
+            for i in range(1, len(coords) + 1)
+        }
+        blocks, lunch, visits, dinner = _day(coords, dwell=rng.choice([20, 30, 40]))
+        before_km = _route_km([lunch, *visits, dinner])
+
+        result = optimize_day_route(blocks, windows, budget_ms=50)
+
+        assert result["km_after"] <= result["km_before"] + 1e-9
+        assert result["km_before"] == round(before_km, 3)
+        if result["km_after"] < result["km_before"]:
+            # Chỉ sửa khi thứ tự mới hợp lệ
+            _assert_feasible(visits, lunch, dinner, windows)
@@ -0,0 +1,118 @@
+"""
+Test trip_evaluator: chỉ số chất lượng tính theo lô trên trip dựng tay.
+
+Chạy test:
+    pytest tests/test_trip_evaluator.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.application.itinerary.trip_evaluator import TripEvaluator, rank_trips
+from app.domain.entities.itinerary_spot import ItinerarySpot
+
+
+VISITS = [
+    ItinerarySpot(id=1, name="Bảo tàng", category="visit", lat=10.7769, lng=106.7009,
+                  open_time_min=8 * 60, close_time_min=17 * 60, rating=4.8, tags=["Lịch sử"]),
+    ItinerarySpot(id=2, name="Chợ", category="visit", lat=10.7725, lng=106.6980,
+                  open_time_min=6 * 60, close_time_min=18 * 60, rating=3.5, tags=["Mua sắm"]),
+    ItinerarySpot(id=3, name="Công viên", category="visit", lat=10.8500, lng=106.7700,
+                  rating=4.2, tags=["Thiên nhiên"]),
+]
+FOODS = [
+    ItinerarySpot(id=1, name="Quán phở", category="eat", lat=10.7760, lng=106.7000,
+                  open_time_min=6 * 60, close_time_min=14 * 60, rating=4.0),
+]
+
+
+def _item(type_, place_id, start, end, travel=0, km=0.0, lat=None, lng=None):
+    return {
+        "type": type_, "place_id": place_id, "start": start, "end": end,
+        "travel_from_prev_min": travel, "distance_from_prev_km": km, "lat": lat, "lng": lng,
+    }
+
+
+def _day(morning, lunch=(), afternoon=(), cost=100_000):
+    return {
+        "blocks": {"morning": list(morning), "lunch": list(lunch), "afternoon": list(afternoon),
+                   "dinner": [], "evening": []},
+        "cost_summary": {"total_attraction_cost_vnd": cost, "total_trip_cost_vnd": cost},
+    }
+
+
+def _trip(*days):
+    return {"days": list(days)}
+
+
+@pytest.fixture
+def evaluator():
+    return TripEvaluator(VISITS, FOODS, preferred_tags=["Lịch sử", "Thiên nhiên"])
+
+
+def test_evaluate_basic_metrics(evaluator):
+    trip = _trip(
+        _day(
+            morning=[
+                _item("visit", 1, "08:00", "09:30", lat=10.7769, lng=106.7009),
+                _item("visit", 2, "09:50", "10:30", travel=10, km=0.6, lat=10.7725, lng=106.6980),
+            ],
+            lunch=[_item("eat", 1, "11:00", "12:00", travel=5, km=0.4)],
+        ),
+        _day(
+            # Chợ đã đóng cửa lúc 18:00, cùng ô lưới với ngày 1 (Bảo tàng)
+            morning=[_item("visit", 2, "17:30", "18:30", lat=10.7770, lng=106.7005)],
+            cost=50_000,
+        ),
+    )
+    m = evaluator.evaluate([trip])
+
+    assert m["visits"][0] == 3
+    assert m["meals"][0] == 1
+    assert m["travel_min"][0] == 15
+    assert m["travel_km"][0] == pytest.approx(1.0)
+    # 09:30 -> 09:50 đi 10 phút => chờ 10; 10:30 -> 11:00 đi 5 phút => chờ 25; ngày mới không tính
+    assert m["idle_min"][0] == 35
+    assert m["hour_violations"][0] == 1
+    assert m["rating_mean"][0] == pytest.approx((4.8 + 3.5 + 3.5) / 3)
+    assert m["low_rating_ratio"][0] == pytest.approx(2 / 3)
+    # Chỉ khớp "Lịch sử" trong 2 tag
+    assert m["tag_hits"][0] == 1
+    assert m["tag_coverage"][0] == pytest.approx(0.5)
+    assert m["cost_vnd"][0] == 150_000
+    assert m["repeated_area_ratio"][0] == pytest.approx(1 / 3)
+
+
+def test_batch_matches_single_and_ranks_best_first(evaluator):
+    good = _trip(_day(morning=[
+        _item("visit", 1, "08:00", "09:30", lat=10.7769, lng=106.7009),
+        _item("visit", 3, "10:00", "11:00", travel=30, km=10.0, lat=10.85, lng=106.77),
+    ]))
+    poor = _trip(_day(morning=[
+        _item("visit", 2, "07:00", "08:00", lat=10.7725, lng=106.6980),
+    ]))
+    empty = _trip(_day(morning=[]))
+
+    batch = evaluator.evaluate([good, poor, empty])
+    for i, trip in enumerate([good, poor, empty]):
+        single = evaluator.evaluate([trip])
+        for name, values in batch.items():
+            assert values[i] == pytest.approx(single[name][0])
+
+    assert batch["visits"][2] == 0 and batch["repeated_area_ratio"][2] == 0
+    # Chợ mở cửa từ 06:00 => 07:00 không vi phạm
+    assert batch["hour_violations"][1] == 0
+
+    ranked = rank_trips([poor, empty, good], VISITS, FOODS, ["Lịch sử", "Thiên nhiên"])
+    assert [t for _, t in ranked] == [good, poor, empty]
+    assert ranked[0][0] > ranked[1][0] > ranked[2][0]
+
+
+def test_without_preferred_tags_coverage_is_full():
+    m = TripEvaluator(VISITS, FOODS).evaluate([_trip(_day(morning=[_item("visit", 1, "08:00", "09:00")]))])
+    assert m["tag_coverage"][0] == 1.0
+    assert m["tag_hits"][0] == 0
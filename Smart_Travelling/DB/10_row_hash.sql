@@ -0,0 +1,11 @@
+-- Hash nội dung (đã chuẩn hóa) của dòng TSV tạo ra spot, dùng cho import theo diff
+-- Import so hash trong file với row_hash đang lưu => chỉ ghi dòng thêm mới / thay đổi / bị xóa
+-- (xem BE/Seed_data/bulk_import.py)
+
+USE travel;
+
+ALTER TABLE places
+  ADD COLUMN row_hash CHAR(40) NULL AFTER external_key;
+
+ALTER TABLE food
+  ADD COLUMN row_hash CHAR(40) NULL AFTER external_key;
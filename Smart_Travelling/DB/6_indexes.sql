@@ -0,0 +1,22 @@
+-- Bổ sung index cho các truy vấn nóng của BE
+-- Chạy sau 1_addresses.sql ... 5_accommodation.sql và user.sql
+
+USE travel;
+
+-- places / food / accommodation: JOIN addresses theo address_id rồi lọc category
+-- addresses(city) đã có idx_addresses_city (InnoDB tự gắn thêm id vào cuối index)
+-- => MySQL lấy danh sách address id theo city, rồi tra (address_id, category) ở bảng spot
+CREATE INDEX idx_places_address_category ON places(address_id, category);
+CREATE INDEX idx_food_address_category ON food(address_id, category);
+CREATE INDEX idx_accommodation_address_category ON accommodation(address_id, category);
+
+-- events: lọc theo khoảng thời gian (start_datetime < cuối ngày AND end_datetime > đầu ngày)
+-- có thêm session để điều kiện session được kiểm tra ngay trên index
+CREATE INDEX idx_events_date_range ON events(start_datetime, end_datetime, session);
+
+-- users: tra cứu theo email / số điện thoại khi kiểm tra trùng
+CREATE INDEX idx_users_email ON users(email);
+CREATE INDEX idx_users_phone ON users(phone_number);
+
+-- users: admin liệt kê user (WHERE role = 'user' ORDER BY id) không cần filesort
+CREATE INDEX idx_users_role_id ON users(role, id);
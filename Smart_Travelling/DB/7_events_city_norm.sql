@@ -0,0 +1,10 @@
+-- Thêm cột city_norm cho events (tên thành phố đã chuẩn hóa: bỏ dấu, chữ thường, gom khoảng trắng)
+-- => lọc theo thành phố ngay trong SQL bằng index thay vì normalize từng dòng ở Python
+-- Sau khi chạy file này, chạy backfill (từ thư mục BE):
+--     python -m app.scripts.backfill_city_norm
+
+USE travel;
+
+ALTER TABLE events
+  ADD COLUMN city_norm VARCHAR(100) NULL AFTER region,
+  ADD INDEX idx_events_citynorm_date (city_norm, start_datetime, end_datetime);
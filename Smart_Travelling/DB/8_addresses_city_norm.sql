@@ -0,0 +1,12 @@
+-- Thêm cột city_norm cho addresses (canonical key của thành phố, xem BE/app/utils/city_registry.py)
+-- "Hồ Chí Minh", "Hồ Chí Minh ", "TP.HCM", "Sài Gòn" => cùng city_norm = 'ho chi minh'
+-- => places / food / accommodation lọc theo thành phố bằng 1 phép so sánh bằng có index
+-- Seed_data/import_places.py / import_food.py (cả 2 chế độ thường và --bulk) tự ghi city_norm lúc insert.
+-- Sau khi chạy file này, chạy backfill 1 lần cho dữ liệu đã có (từ thư mục BE):
+--     python -m app.scripts.backfill_city_norm
+
+USE travel;
+
+ALTER TABLE addresses
+  ADD COLUMN city_norm VARCHAR(100) NULL AFTER city,
+  ADD INDEX idx_addresses_city_norm (city_norm);
@@ -0,0 +1,20 @@
+-- Khóa ngoài ổn định (external_key) cho dữ liệu seed, dùng để upsert khi import lại
+--   places    : 'place:<hash(tên, city, đường, số nhà)>'  (cột id trong places.tsv bị trùng, id do DB cấp)
+--   food      : 'food:<hash(tên, city, đường, số nhà)>'   (cột id trong food.tsv bị trùng)
+--   addresses : cùng key với spot sở hữu địa chỉ đó
+-- Import bulk (Seed_data/bulk_import.py) dùng INSERT ... ON DUPLICATE KEY UPDATE trên các UNIQUE KEY này
+-- => chạy lại import không sinh dòng trùng, id của spot giữ nguyên
+
+USE travel;
+
+ALTER TABLE addresses
+  ADD COLUMN external_key VARCHAR(64) NULL AFTER id,
+  ADD UNIQUE KEY uq_addresses_external_key (external_key);
+
+ALTER TABLE places
+  ADD COLUMN external_key VARCHAR(64) NULL AFTER id,
+  ADD UNIQUE KEY uq_places_external_key (external_key);
+
+ALTER TABLE food
+  ADD COLUMN external_key VARCHAR(64) NULL AFTER id,
+  ADD UNIQUE KEY uq_food_external_key (external_key);
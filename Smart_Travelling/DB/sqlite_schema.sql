@@ -0,0 +1,128 @@
+-- Schema SQLite tương đương DB/1..10 + user.sql (dùng cho DB_BACKEND=sqlite: test / benchmark không cần MySQL)
+-- Khi sửa schema MySQL nhớ sửa file này theo
+-- ENUM -> TEXT + CHECK, JSON -> TEXT, AUTO_INCREMENT -> INTEGER PRIMARY KEY AUTOINCREMENT
+
+CREATE TABLE IF NOT EXISTS addresses (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  external_key VARCHAR(64) UNIQUE,
+  house_number VARCHAR(50),
+  street VARCHAR(255),
+  ward VARCHAR(100),
+  district VARCHAR(100),
+  city VARCHAR(100),
+  city_norm VARCHAR(100),
+  lat DOUBLE,
+  lng DOUBLE,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_addresses_city ON addresses(city);
+CREATE INDEX IF NOT EXISTS idx_addresses_city_norm ON addresses(city_norm);
+CREATE INDEX IF NOT EXISTS idx_addresses_lat_lng ON addresses(lat, lng);
+
+CREATE TABLE IF NOT EXISTS places (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  external_key VARCHAR(64) UNIQUE,
+  row_hash CHAR(40),
+  name VARCHAR(255) NOT NULL,
+  priceVND BIGINT,
+  summary VARCHAR(160),
+  description TEXT,
+  openTime CHAR(5),
+  closeTime CHAR(5),
+  phone VARCHAR(50),
+  rating DECIMAL(3,2),
+  reviewCount INT DEFAULT 0,
+  popularity INT DEFAULT 0,
+  image_url VARCHAR(500),
+  tags TEXT,
+  category TEXT NOT NULL DEFAULT 'visit' CHECK (category IN ('visit','eat','hotel')),
+  dwell INT,
+  address_id BIGINT REFERENCES addresses(id) ON DELETE SET NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_places_address_category ON places(address_id, category);
+
+CREATE TABLE IF NOT EXISTS food (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  external_key VARCHAR(64) UNIQUE,
+  row_hash CHAR(40),
+  name VARCHAR(255) NOT NULL,
+  priceVND BIGINT,
+  summary VARCHAR(160),
+  description TEXT,
+  openTime CHAR(5),
+  closeTime CHAR(5),
+  phone VARCHAR(50),
+  rating DECIMAL(3,2),
+  reviewCount INT DEFAULT 0,
+  popularity INT DEFAULT 0,
+  image_url VARCHAR(500),
+  tags TEXT,
+  category TEXT NOT NULL DEFAULT 'eat' CHECK (category IN ('visit','eat','hotel')),
+  cuisine_type VARCHAR(100),
+  menu_url VARCHAR(500),
+  address_id BIGINT REFERENCES addresses(id) ON DELETE SET NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_food_address_category ON food(address_id, category);
+
+CREATE TABLE IF NOT EXISTS accommodation (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  priceVND BIGINT,
+  summary VARCHAR(160),
+  description TEXT,
+  rating DECIMAL(3,2),
+  reviewCount INT DEFAULT 0,
+  popularity INT DEFAULT 0,
+  image_url VARCHAR(500),
+  phone VARCHAR(50),
+  tags TEXT,
+  category TEXT NOT NULL DEFAULT 'hotel' CHECK (category IN ('visit','eat','hotel')),
+  capacity INT,
+  num_guest INT,
+  address_id BIGINT REFERENCES addresses(id) ON DELETE SET NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_accommodation_address_category ON accommodation(address_id, category);
+
+CREATE TABLE IF NOT EXISTS events (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  external_id VARCHAR(255) NOT NULL UNIQUE,
+  name VARCHAR(255) NOT NULL,
+  city VARCHAR(100) NOT NULL,
+  region VARCHAR(100),
+  city_norm VARCHAR(100),
+  lat DOUBLE,
+  lng DOUBLE,
+  start_datetime DATETIME NOT NULL,
+  end_datetime DATETIME NOT NULL,
+  session TEXT CHECK (session IS NULL OR session IN ('morning','afternoon','evening','full_day')),
+  summary TEXT,
+  activities TEXT,
+  image_url VARCHAR(500),
+  price_vnd BIGINT,
+  popularity INT DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_events_citynorm_date ON events(city_norm, start_datetime, end_datetime);
+
+CREATE TABLE IF NOT EXISTS users (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username VARCHAR(30) NOT NULL UNIQUE,
+  email VARCHAR(255),
+  phone_number VARCHAR(15),
+  hashed_password VARCHAR(255) NOT NULL,
+  role TEXT DEFAULT 'user' CHECK (role IN ('user','admin')),
+  is_active BOOLEAN DEFAULT 1,
+  failed_attempts INT DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME,
+  tags TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_users_phone ON users(phone_number);
+CREATE INDEX IF NOT EXISTS idx_users_role_id ON users(role, id);
@@ -4,11 +4,15 @@
 import { request } from "./request.js";
 
 /**
- * ADMIN XEM DANH SÁCH USER
- * GET /admin/users
+ * ADMIN XEM DANH SÁCH USER (theo trang)
+ * GET /admin/users?after=&limit=&active=&role=
+ * Trả về { users, next_after }: gọi lại với after = next_after để lấy trang kế tiếp (null = hết)
  */
-export async function adminListUsers() {
-  const result = await request("/admin/users", "GET");
+export async function adminListUsers({ after = 0, limit = 50, active, role } = {}) {
+  const params = new URLSearchParams({ after, limit });
+  if (active !== undefined) params.set("active", active);
+  if (role) params.set("role", role);
+  const result = await request(`/admin/users?${params}`, "GET");
   return result.data;
 }
 
@@ -0,0 +1,21 @@
+// suggestApi.js
+// Gợi ý typeahead (GET /suggest) cho các ô nhập city / địa điểm / sự kiện
+
+import { request } from "./request.js";
+
+/**
+ * GỢI Ý THEO TIỀN TỐ ĐANG GÕ
+ * GET /suggest?q=...&kind=...&limit=...
+ * kind: "city" | "place" | "food" | "event" (bỏ trống = tất cả)
+ */
+export async function suggest(q, kind = null, limit = 8) {
+  if (!q || !q.trim()) {
+    return [];
+  }
+
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  if (kind) params.append("kind", kind);
+
+  const result = await request(`/suggest?${params.toString()}`, "GET");
+  return Array.isArray(result.data) ? result.data : [];
+}
@@ -7,14 +7,14 @@ import { request } from "./request.js";
  * Gọi API gợi ý địa điểm theo thành phố.
  *
  * @param {string} city - Tên thành phố (VD: "Hồ Chí Minh")
- * @param {number[]} seenIds - Danh sách id đã gợi ý trước đó
+ * @param {string|null} cursor - Token server trả về lần trước (null ở lần đầu)
  * @param {number} k - Số lượng địa điểm muốn gợi ý (default 5)
  * @param {number|null} userId - ID người dùng (để lấy tags sở thích)
  */
-export async function recommendPlaces(city, seenIds = [], k = 5, userId = null) {
+export async function recommendPlaces(city, cursor = null, k = 5, userId = null) {
   const body = {
     city,
-    seen_ids: seenIds,
+    cursor,
     k,
   };
 
@@ -1,5 +1,5 @@
 // FE/js/pages/recommend.js
-// Logic recommend: gọi API, quản lý seen_ids, render bằng <template>
+// Logic recommend: gọi API, quản lý cursor gợi ý, render bằng <template>
 
 import { recommendPlaces } from "../api/visitorApi.js";
 
@@ -17,30 +17,25 @@ const placeCardTemplate = document.getElementById("placeCardTemplate");
 
 // ------- LocalStorage helpers -------
 
-function getSeenKey(city) {
-  return `visitor_seen_ids_${city.trim().toLowerCase()}`;
+// Server giữ danh sách đã gợi ý, FE chỉ lưu cursor (token) theo từng thành phố
+function getCursorKey(city) {
+  return `visitor_cursor_${city.trim().toLowerCase()}`;
 }
 
-function loadSeenIds(city) {
-  const key = getSeenKey(city);
-  const raw = localStorage.getItem(key);
-  if (!raw) return [];
-  try {
-    const parsed = JSON.parse(raw);
-    return Array.isArray(parsed) ? parsed : [];
-  } catch {
-    return [];
-  }
+function loadCursor(city) {
+  return localStorage.getItem(getCursorKey(city));
 }
 
-function saveSeenIds(city, ids) {
-  const key = getSeenKey(city);
-  localStorage.setItem(key, JSON.stringify(ids));
+function saveCursor(city, cursor) {
+  if (cursor) {
+    localStorage.setItem(getCursorKey(city), cursor);
+  }
 }
 
-function clearSeenIds(city) {
-  const key = getSeenKey(city);
-  localStorage.removeItem(key);
+function clearCursor(city) {
+  localStorage.removeItem(getCursorKey(city));
+  // dọn key cũ (trước đây lưu cả danh sách seen_ids)
+  localStorage.removeItem(`visitor_seen_ids_${city.trim().toLowerCase()}`);
 }
 
 // ------- UI helpers -------
@@ -201,13 +196,13 @@ async function handleRecommendClick() {
   setStatus("");
 
   try {
-    const currentSeen = loadSeenIds(city);
+    const cursor = loadCursor(city);
 
-    const data = await recommendPlaces(city, currentSeen, 5, userId);
-    // data: { city, places, seen_ids }
+    const data = await recommendPlaces(city, cursor, 5, userId);
+    // data: { city, places, cursor }
 
     renderPlaces(data.places);
-    saveSeenIds(city, data.seen_ids || []);
+    saveCursor(city, data.cursor);
 
     if (!data.places || data.places.length === 0) {
       setStatus("Không tìm thấy địa điểm nào cho thành phố này.", "error");
@@ -234,7 +229,7 @@ function handleResetSeen() {
   }
 
   if (confirm(`Xóa lịch sử gợi ý cho thành phố "${city}"?`)) {
-    clearSeenIds(city);
+    clearCursor(city);
     setStatus("Đã xóa lịch sử gợi ý cho thành phố này.", "success");
   }
 }